@@ -0,0 +1,140 @@
+use std::borrow::Cow;
+use std::fs::File;
+use std::path::PathBuf;
+
+use memmap2::Mmap;
+use pyo3::buffer::PyBuffer;
+use pyo3::exceptions::{PyTypeError, PyValueError};
+use pyo3::prelude::*;
+use pyo3::types::{PyBytes, PyString};
+use pyo3::IntoPyObject;
+
+use crate::columnar::{buffers_to_py, build_buffers};
+use crate::{build_record, parse_raw, pool, templates, ProcessedRecord};
+
+
+/// newline delimited input, read in place except for writable buffers
+enum BulkSource<'py> {
+    Bytes(Bound<'py, PyBytes>),
+    Buffer(PyBuffer<u8>),
+    Copied(Vec<u8>),
+    Mapped(Mmap),
+    Empty,
+}
+
+impl<'py> BulkSource<'py> {
+    /// GIL-bound resolution of a `bytes`, buffer (e.g. `memoryview`) or file path argument
+    fn from_py(source: &Bound<'py, PyAny>) -> PyResult<Self> {
+        if let Ok(bytes) = source.cast::<PyBytes>() {
+            return Ok(BulkSource::Bytes(bytes.clone()));
+        }
+
+        // file path (str or os.PathLike) -> memory map
+        if source.is_instance_of::<PyString>() || source.hasattr("__fspath__")? {
+            let path: PathBuf = source.extract()?;
+            let file = File::open(&path)?;
+            if file.metadata()?.len() == 0 {
+                return Ok(BulkSource::Empty);
+            }
+            // SAFETY: the file is only read, callers must not truncate it while parsing
+            let mmap = unsafe { Mmap::map(&file)? };
+            return Ok(BulkSource::Mapped(mmap));
+        }
+
+        let buffer = PyBuffer::<u8>::get(source)
+            .map_err(|_| PyTypeError::new_err("source must be bytes, a bytes-like buffer or a file path"))?;
+        if !buffer.is_c_contiguous() {
+            return Err(PyValueError::new_err("source buffer must be C contiguous"));
+        }
+        // writable exporters (bytearray, writable memoryview...) can change while the parse runs
+        // without the GIL, so they are copied first
+        if !buffer.readonly() {
+            return Ok(BulkSource::Copied(buffer.to_vec(source.py())?));
+        }
+        Ok(BulkSource::Buffer(buffer))
+    }
+
+    fn as_bytes(&self) -> &[u8] {
+        match self {
+            BulkSource::Bytes(bytes) => bytes.as_bytes(),
+            // SAFETY: read-only contiguous u8 buffer, kept alive (and exported/locked) by `PyBuffer`
+            BulkSource::Buffer(buffer) => unsafe {
+                std::slice::from_raw_parts(buffer.buf_ptr() as *const u8, buffer.len_bytes())
+            },
+            BulkSource::Copied(data) => data,
+            BulkSource::Mapped(mmap) => &mmap[..],
+            BulkSource::Empty => &[],
+        }
+    }
+}
+
+
+/// split on `\n` (dropping a trailing `\r`) and skip blank lines, slices are borrowed
+/// unless a line is not valid utf-8 (replacement characters are inserted then)
+fn split_records(data: &[u8]) -> Vec<Cow<'_, str>> {
+    data.split(|b| *b == b'\n')
+        .map(|line| line.strip_suffix(b"\r").unwrap_or(line))
+        .filter(|line| !line.iter().all(u8::is_ascii_whitespace))
+        .map(String::from_utf8_lossy)
+        .collect()
+}
+
+
+/// rayon parallel parsing of borrowed records (call without holding the GIL)
+fn process_records(records: &[Cow<'_, str>], infer_types: bool) -> Vec<ProcessedRecord> {
+    let mut processed: Vec<ProcessedRecord> =
+        pool::map_slice(records, |raw| parse_raw(raw, infer_types));
+    templates::learn(processed.iter_mut().filter_map(|record| record.learned_template.take()));
+    processed
+}
+
+
+/// Parse newline delimited records straight from `bytes`, a buffer or a (memory mapped) file.
+///
+/// Records are split and parsed from borrowed slices in rust, so no python `str` is created
+/// per input record. `output="tuples"` matches `smart_parse_batch`, `output="columnar"`
+/// matches `smart_parse_batch_columnar`.
+#[pyfunction]
+#[pyo3(signature = (source, output="tuples", infer_types=false))]
+pub fn smart_parse_bytes(
+    py: Python<'_>,
+    source: &Bound<'_, PyAny>,
+    output: &str,
+    infer_types: bool,
+) -> PyResult<Py<PyAny>> {
+    if output != "tuples" && output != "columnar" {
+        return Err(PyValueError::new_err(format!(
+            "output must be 'tuples' or 'columnar', got '{output}'"
+        )));
+    }
+    if output == "columnar" && infer_types {
+        return Err(PyValueError::new_err("infer_types is not supported with columnar output"));
+    }
+
+    let bulk_source = BulkSource::from_py(source)?;
+    let data = bulk_source.as_bytes();
+
+    if output == "columnar" {
+        let buffers = py.detach(|| {
+            let records = split_records(data);
+            build_buffers(process_records(&records, false), Some(records.as_slice()))
+        });
+        return Ok(buffers_to_py(py, buffers)?.into_any());
+    }
+
+    // rayon parallel processing
+    let (records, processed_data) = py.detach(|| {
+        let records = split_records(data);
+        let processed = process_records(&records, infer_types);
+        (records, processed)
+    });
+
+    // python reconstruction (Back on the Main Thread/GIL)
+    let mut results = Vec::with_capacity(processed_data.len());
+    for (raw, record) in records.iter().zip(processed_data) {
+        let (_, final_dict) = build_record(py, record);
+        let log_tuple = (PyString::new(py, raw), final_dict).into_pyobject(py)?;
+        results.push(log_tuple.into_any().unbind());
+    }
+    Ok(results.into_pyobject(py)?.into_any().unbind())
+}
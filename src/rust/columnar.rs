@@ -0,0 +1,129 @@
+use std::collections::HashMap;
+
+use pyo3::prelude::*;
+use pyo3::types::{PyBytes, PyDict};
+
+use crate::{process_batch, to_input, InputType, ProcessedRecord};
+
+
+/// flat, arrow style buffers for a whole parsed batch
+///
+/// * record `i` owns pairs `record_offsets[i]..record_offsets[i + 1]`
+/// * pair `j` has key `keys[key_ids[j]]` and value `values[value_offsets[j]..value_offsets[j + 1]]`
+/// * record `i` raw string is `raw[raw_offsets[i]..raw_offsets[i + 1]]`
+pub(crate) struct ColumnarBuffers {
+    keys: Vec<String>,
+    raw: Vec<u8>,
+    raw_offsets: Vec<i64>,
+    raw_lengths: Vec<i64>,
+    record_offsets: Vec<i64>,
+    key_ids: Vec<u32>,
+    values: Vec<u8>,
+    value_offsets: Vec<i64>,
+}
+
+impl ColumnarBuffers {
+    fn with_capacity(n_records: usize) -> Self {
+        let mut raw_offsets = Vec::with_capacity(n_records + 1);
+        raw_offsets.push(0);
+        let mut record_offsets = Vec::with_capacity(n_records + 1);
+        record_offsets.push(0);
+        ColumnarBuffers {
+            keys: Vec::new(),
+            raw: Vec::new(),
+            raw_offsets,
+            raw_lengths: Vec::with_capacity(n_records),
+            record_offsets,
+            key_ids: Vec::new(),
+            values: Vec::new(),
+            value_offsets: vec![0],
+        }
+    }
+}
+
+
+fn i64_le_bytes(values: &[i64]) -> Vec<u8> {
+    values.iter().flat_map(|v| v.to_le_bytes()).collect()
+}
+
+
+fn u32_le_bytes(values: &[u32]) -> Vec<u8> {
+    values.iter().flat_map(|v| v.to_le_bytes()).collect()
+}
+
+
+/// sequential pass that interns keys and appends every record into the flat buffers
+///
+/// `sources` overrides the raw strings of records parsed from borrowed input (see `bulk.rs`).
+pub(crate) fn build_buffers<S: AsRef<str>>(records: Vec<ProcessedRecord>, sources: Option<&[S]>) -> ColumnarBuffers {
+    let mut buffers = ColumnarBuffers::with_capacity(records.len());
+    let mut key_table: HashMap<String, u32> = HashMap::new();
+
+    for (i, record) in records.into_iter().enumerate() {
+        let source = match sources {
+            Some(sources) => sources[i].as_ref(),
+            None => record.source.as_str(),
+        };
+        buffers.raw.extend_from_slice(source.as_bytes());
+        buffers.raw_offsets.push(buffers.raw.len() as i64);
+        buffers.raw_lengths.push(source.chars().count() as i64);
+
+        let unparsed = (!record.unparsed.is_empty())
+            .then(|| ("_unparsed".to_string(), record.unparsed.join(" ")));
+
+        for (k, v) in record.pairs.into_iter().chain(unparsed) {
+            let next_id = buffers.keys.len() as u32;
+            let key_id = *key_table.entry(k).or_insert_with_key(|key| {
+                buffers.keys.push(key.clone());
+                next_id
+            });
+            buffers.key_ids.push(key_id);
+            buffers.values.extend_from_slice(v.as_bytes());
+            buffers.value_offsets.push(buffers.values.len() as i64);
+        }
+        buffers.record_offsets.push(buffers.key_ids.len() as i64);
+    }
+
+    buffers
+}
+
+
+/// Columnar output mode of `smart_parse_batch`.
+///
+/// Instead of one dict + tuple per record, the whole batch comes back as a handful of
+/// `bytes` buffers (little endian int64 offsets / uint32 key ids, utf-8 data) plus one
+/// interned key table. Dict inputs are handled as their JSON serialization.
+#[pyfunction]
+pub fn smart_parse_batch_columnar(py: Python<'_>, logs: Vec<Py<PyAny>>) -> PyResult<Py<PyDict>> {
+    // GIL-bound preprocessing
+    let inputs: Vec<InputType> = logs
+        .iter()
+        .map(|item| match to_input(item.bind(py)) {
+            InputType::AlreadyParsed(json_val, _) => {
+                InputType::Raw(serde_json::to_string(&json_val).unwrap_or_else(|_| "{}".to_string()))
+            }
+            raw => raw,
+        })
+        .collect();
+
+    // rayon parallel processing + buffer assembly, all without the GIL
+    let buffers = py.detach(|| build_buffers::<&str>(process_batch(inputs, false), None));
+
+    buffers_to_py(py, buffers)
+}
+
+
+/// python dict of `bytes` buffers (Back on the Main Thread/GIL)
+pub(crate) fn buffers_to_py(py: Python<'_>, buffers: ColumnarBuffers) -> PyResult<Py<PyDict>> {
+    let out = PyDict::new(py);
+    out.set_item("keys", buffers.keys)?;
+    out.set_item("raw", PyBytes::new(py, &buffers.raw))?;
+    out.set_item("raw_offsets", PyBytes::new(py, &i64_le_bytes(&buffers.raw_offsets)))?;
+    out.set_item("raw_lengths", PyBytes::new(py, &i64_le_bytes(&buffers.raw_lengths)))?;
+    out.set_item("record_offsets", PyBytes::new(py, &i64_le_bytes(&buffers.record_offsets)))?;
+    out.set_item("key_ids", PyBytes::new(py, &u32_le_bytes(&buffers.key_ids)))?;
+    out.set_item("values", PyBytes::new(py, &buffers.values))?;
+    out.set_item("value_offsets", PyBytes::new(py, &i64_le_bytes(&buffers.value_offsets)))?;
+
+    Ok(out.unbind())
+}
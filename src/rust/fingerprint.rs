@@ -0,0 +1,341 @@
+use indexmap::IndexMap;
+use pyo3::prelude::*;
+use pyo3::types::{PyDict, PyList};
+use pyo3::IntoPyObject;
+use serde_json::{Map, Value};
+
+use crate::inference::TypedValue;
+use crate::{build_record, pool, process_input, templates, to_input, InputType, ProcessedRecord};
+
+
+/// rust side equivalent of the `Fingerprint` TypedDict in `structure_analyzer.py`
+pub(crate) struct RecordFingerprint {
+    hash: String,
+    signature: IndexMap<String, String>,
+    score: f64,
+    full_str: String,
+}
+
+
+/// python `type(value).__name__` of a JSON value
+fn json_type_name(value: &Value) -> String {
+    match value {
+        Value::Null => "NoneType".to_string(),
+        Value::Bool(_) => "bool".to_string(),
+        Value::Number(n) if n.is_f64() => "float".to_string(),
+        Value::Number(_) => "int".to_string(),
+        Value::String(_) => "str".to_string(),
+        Value::Array(_) => "list".to_string(),
+        Value::Object(_) => "dict".to_string(),
+    }
+}
+
+
+/// mirror of `StructuralAnalyzer.flatten_and_type()` over a JSON object
+fn flatten_json_map(
+    map: &Map<String, Value>,
+    prefix: &str,
+    ignore_unparsed: bool,
+    items: &mut IndexMap<String, String>,
+) {
+    for (k, v) in map {
+        let k_lower = k.to_lowercase();
+
+        // handle ignore_unparsed
+        if ignore_unparsed && k_lower == "_unparsed" {
+            continue;
+        }
+
+        let key_path = if prefix.is_empty() { k_lower } else { format!("{prefix}.{k_lower}") };
+
+        match v {
+            // nested dict
+            Value::Object(inner) => flatten_json_map(inner, &key_path, ignore_unparsed, items),
+            // list
+            Value::Array(arr) => match arr.first() {
+                Some(Value::Object(first)) => {
+                    flatten_json_map(first, &format!("{key_path}[]"), ignore_unparsed, items)
+                }
+                Some(first) => {
+                    items.insert(key_path, format!("list[{}]", json_type_name(first)));
+                }
+                // empty list
+                None => {
+                    items.insert(key_path, "list[empty_null]".to_string());
+                }
+            },
+            // primitive dtypes
+            _ => {
+                items.insert(key_path, json_type_name(v));
+            }
+        }
+    }
+}
+
+
+/// flatten a record that came out of the raw string parser (all values are strings)
+fn flatten_pairs(
+    pairs: &[(String, String)],
+    unparsed: &[String],
+    ignore_unparsed: bool,
+) -> IndexMap<String, String> {
+    let mut items = IndexMap::with_capacity(pairs.len() + 1);
+    let unparsed_key = (!unparsed.is_empty()).then_some("_unparsed");
+    for k in pairs.iter().map(|(k, _)| k.as_str()).chain(unparsed_key) {
+        let k_lower = k.to_lowercase();
+        if ignore_unparsed && k_lower == "_unparsed" {
+            continue;
+        }
+        items.insert(k_lower, "str".to_string());
+    }
+    items
+}
+
+
+/// flatten a record with inferred values (nested JSON values are drilled into)
+fn flatten_typed(
+    pairs: &[(String, String)],
+    typed: &[TypedValue],
+    unparsed: &[String],
+    ignore_unparsed: bool,
+) -> IndexMap<String, String> {
+    let mut items = IndexMap::with_capacity(pairs.len() + 1);
+    for ((k, _), value) in pairs.iter().zip(typed) {
+        let k_lower = k.to_lowercase();
+        if ignore_unparsed && k_lower == "_unparsed" {
+            continue;
+        }
+        match value {
+            TypedValue::Json(v @ (Value::Object(_) | Value::Array(_))) => {
+                let mut wrapper = Map::new();
+                wrapper.insert(k_lower, v.clone());
+                flatten_json_map(&wrapper, "", ignore_unparsed, &mut items);
+            }
+            _ => {
+                items.insert(k_lower, value.type_name().to_string());
+            }
+        }
+    }
+    if !unparsed.is_empty() && !ignore_unparsed {
+        items.insert("_unparsed".to_string(), "str".to_string());
+    }
+    items
+}
+
+
+/// python `repr()` of a float (always keeps a decimal point)
+fn py_float_repr(value: f64) -> String {
+    let repr = value.to_string();
+    if repr.contains('.') || repr.contains('e') || !value.is_finite() {
+        repr
+    } else {
+        format!("{repr}.0")
+    }
+}
+
+
+/// mirror of `StructuralAnalyzer.build_blueprint()` + `get_parseability()`
+pub(crate) fn finish_fingerprint(raw_str: &str, typed_map: IndexMap<String, String>) -> RecordFingerprint {
+    // blueprint structure string
+    let mut sorted_keys: Vec<&String> = typed_map.keys().collect();
+    sorted_keys.sort();
+    let blueprint_str = sorted_keys
+        .iter()
+        .map(|k| format!("{}:{}", k, typed_map[k.as_str()]))
+        .collect::<Vec<_>>()
+        .join("|");
+
+    // structure hash
+    let struct_hash = format!("{:x}", md5::compute(blueprint_str.as_bytes()));
+
+    // parseability (python len() counts characters, round() is half-to-even)
+    let structured_len: usize = typed_map.values().map(|t| t.chars().count()).sum();
+    let total_len = raw_str.chars().count();
+    let score = if total_len == 0 {
+        0.0
+    } else {
+        let ratio = (structured_len as f64 / total_len as f64).min(1.0);
+        format!("{ratio:.2}").parse::<f64>().unwrap_or(ratio)
+    };
+
+    let full_str = format!("{blueprint_str}|parse_score:{}", py_float_repr(score));
+
+    RecordFingerprint {
+        hash: struct_hash,
+        signature: typed_map,
+        score,
+        full_str,
+    }
+}
+
+
+/// python `type(value).__name__`
+fn py_type_name(value: &Bound<'_, PyAny>) -> PyResult<String> {
+    Ok(value.get_type().name()?.to_string())
+}
+
+
+/// mirror of `StructuralAnalyzer.flatten_and_type()` over a python dict (GIL-bound).
+///
+/// Typed from the python objects rather than their JSON conversion, so ints outside i64,
+/// tuples, datetimes, Decimals... keep the type names the python analyzer gives them.
+fn flatten_py_dict(
+    dict: &Bound<'_, PyDict>,
+    prefix: &str,
+    ignore_unparsed: bool,
+    items: &mut IndexMap<String, String>,
+) -> PyResult<()> {
+    for (k, v) in dict {
+        let k_lower = k.to_string().to_lowercase();
+
+        // handle ignore_unparsed
+        if ignore_unparsed && k_lower == "_unparsed" {
+            continue;
+        }
+
+        let key_path = if prefix.is_empty() { k_lower } else { format!("{prefix}.{k_lower}") };
+
+        if let Ok(inner) = v.cast::<PyDict>() {
+            // nested dict
+            flatten_py_dict(inner, &key_path, ignore_unparsed, items)?;
+        } else if let Ok(list) = v.cast::<PyList>() {
+            match list.iter().next() {
+                Some(first) => match first.cast::<PyDict>() {
+                    Ok(first) => flatten_py_dict(first, &format!("{key_path}[]"), ignore_unparsed, items)?,
+                    Err(_) => {
+                        items.insert(key_path, format!("list[{}]", py_type_name(&first)?));
+                    }
+                },
+                // empty list
+                None => {
+                    items.insert(key_path, "list[empty_null]".to_string());
+                }
+            }
+        } else {
+            // primitive dtypes
+            items.insert(key_path, py_type_name(&v)?);
+        }
+    }
+    Ok(())
+}
+
+
+/// typed map of an already parsed (dict) record
+fn flatten_dict(dict: &Bound<'_, PyDict>, ignore_unparsed: bool) -> PyResult<IndexMap<String, String>> {
+    let mut typed_map = IndexMap::new();
+    flatten_py_dict(dict, "", ignore_unparsed, &mut typed_map)?;
+    Ok(typed_map)
+}
+
+
+/// GIL-free parsing + fingerprinting of a single input record
+/// (`dict_typed` is the typed map of a dict input, computed under the GIL)
+fn process_fingerprinted(
+    input: InputType,
+    dict_typed: Option<IndexMap<String, String>>,
+    ignore_unparsed: bool,
+    infer_types: bool,
+) -> (ProcessedRecord, RecordFingerprint) {
+    let record = process_input(input, infer_types);
+    let typed_map = dict_typed.unwrap_or_else(|| {
+        if record.typed.is_empty() {
+            flatten_pairs(&record.pairs, &record.unparsed, ignore_unparsed)
+        } else {
+            flatten_typed(&record.pairs, &record.typed, &record.unparsed, ignore_unparsed)
+        }
+    });
+    let fingerprint = finish_fingerprint(&record.source, typed_map);
+
+    (record, fingerprint)
+}
+
+
+/// python Fingerprint dict (every record gets its own signature dict, like the python analyzer)
+fn fingerprint_to_py<'py>(py: Python<'py>, fingerprint: RecordFingerprint) -> PyResult<Bound<'py, PyDict>> {
+    let signature = PyDict::new(py);
+    for (k, t) in fingerprint.signature {
+        signature.set_item(k, t)?;
+    }
+
+    let out = PyDict::new(py);
+    out.set_item("hash", fingerprint.hash)?;
+    out.set_item("signature", signature)?;
+    out.set_item("score", fingerprint.score)?;
+    out.set_item("full_str", fingerprint.full_str)?;
+    Ok(out)
+}
+
+
+/// Parse and fingerprint a batch in a single rayon pass.
+///
+/// Returns `(raw, parsed, fingerprint)` tuples where `fingerprint` matches
+/// `StructuralAnalyzer.generate_fingerprint(raw, parsed, store_in_map=False)`.
+#[pyfunction]
+#[pyo3(signature = (logs, ignore_unparsed=false, infer_types=false))]
+pub fn smart_parse_fingerprint_batch(
+    py: Python<'_>,
+    logs: Vec<Py<PyAny>>,
+    ignore_unparsed: bool,
+    infer_types: bool,
+) -> PyResult<Vec<Py<PyAny>>> {
+    // GIL-bound preprocessing (dict inputs are typed from their python values)
+    let inputs: Vec<(InputType, Option<IndexMap<String, String>>)> = logs
+        .iter()
+        .map(|item| -> PyResult<_> {
+            let item = item.bind(py);
+            let dict_typed = match item.cast::<PyDict>() {
+                Ok(dict) => Some(flatten_dict(dict, ignore_unparsed)?),
+                Err(_) => None,
+            };
+            Ok((to_input(item), dict_typed))
+        })
+        .collect::<PyResult<_>>()?;
+
+    // rayon parallel parsing + fingerprinting
+    let processed_data: Vec<(ProcessedRecord, RecordFingerprint)> = py.detach(|| {
+        let mut processed: Vec<(ProcessedRecord, RecordFingerprint)> =
+            pool::map_batch(inputs, |(input, dict_typed)| {
+                process_fingerprinted(input, dict_typed, ignore_unparsed, infer_types)
+            });
+        templates::learn(processed.iter_mut().filter_map(|(record, _)| record.learned_template.take()));
+        processed
+    });
+
+    // python reconstruction (Back on the Main Thread/GIL)
+    let mut results = Vec::with_capacity(processed_data.len());
+    for (record, fingerprint) in processed_data {
+        let (source_str, final_dict) = build_record(py, record);
+        let fingerprint_dict = fingerprint_to_py(py, fingerprint)?;
+        let log_tuple = (source_str, final_dict, fingerprint_dict).into_pyobject(py)?;
+        results.push(log_tuple.into_any().unbind());
+    }
+
+    Ok(results)
+}
+
+
+/// Fingerprint already parsed `(raw, parsed)` pairs in parallel.
+///
+/// Output matches `StructuralAnalyzer.generate_fingerprint(raw, parsed, store_in_map=False)`.
+#[pyfunction]
+#[pyo3(signature = (pairs, ignore_unparsed=false))]
+pub fn fingerprint_batch(
+    py: Python<'_>,
+    pairs: Vec<(String, Py<PyDict>)>,
+    ignore_unparsed: bool,
+) -> PyResult<Vec<Py<PyAny>>> {
+    // GIL-bound preprocessing (typed from the python values, see `flatten_py_dict()`)
+    let inputs: Vec<(String, IndexMap<String, String>)> = pairs
+        .into_iter()
+        .map(|(raw, parsed)| -> PyResult<_> { Ok((raw, flatten_dict(parsed.bind(py), ignore_unparsed)?)) })
+        .collect::<PyResult<_>>()?;
+
+    let fingerprints: Vec<RecordFingerprint> = py.detach(|| {
+        pool::map_batch(inputs, |(raw, typed_map)| finish_fingerprint(&raw, typed_map))
+    });
+
+    fingerprints
+        .into_iter()
+        .map(|fingerprint| -> PyResult<Py<PyAny>> { Ok(fingerprint_to_py(py, fingerprint)?.into_any().unbind()) })
+        .collect()
+}
@@ -0,0 +1,23 @@
+use pyo3::prelude::*;
+use pyo3::types::PyString;
+use xxhash_rust::xxh3::xxh3_64;
+
+use crate::pool;
+
+
+/// fast content hash of a raw record
+pub(crate) fn record_hash(raw: &str) -> u64 {
+    xxh3_64(raw.as_bytes())
+}
+
+
+/// Hash a batch of raw strings (xxh3 64 bit) in parallel.
+///
+/// Strings are borrowed from python, nothing is copied before hashing.
+#[pyfunction]
+pub fn hash_batch<'py>(py: Python<'py>, logs: Vec<Bound<'py, PyString>>) -> PyResult<Vec<u64>> {
+    // GIL-bound borrow of the utf-8 data
+    let raw_strs: Vec<&str> = logs.iter().map(|s| s.to_str()).collect::<PyResult<_>>()?;
+
+    Ok(py.detach(|| pool::map_slice(&raw_strs, |raw| record_hash(raw))))
+}
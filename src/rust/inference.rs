@@ -0,0 +1,301 @@
+use pyo3::prelude::*;
+use pyo3::sync::PyOnceLock;
+use pyo3::types::{PyDict, PyList, PyType};
+use pyo3::IntoPyObject;
+use serde_json::Value;
+
+static DECIMAL: PyOnceLock<Py<PyType>> = PyOnceLock::new();
+static DATE: PyOnceLock<Py<PyType>> = PyOnceLock::new();
+static DATETIME: PyOnceLock<Py<PyType>> = PyOnceLock::new();
+
+
+/// inferred value of a parsed field, mirror of `swirl.ingestion.type_inference.infer_value()`
+pub(crate) enum TypedValue {
+    Str(String),
+    Int(i64),
+    Float(f64),
+    Bool(bool),
+    Null,
+    // normalized amount without currency symbol / thousands separators
+    Decimal(String),
+    Date(String),
+    DateTime(String),
+    // native (non string) JSON value
+    Json(Value),
+}
+
+
+fn is_digits(s: &str) -> bool {
+    !s.is_empty() && s.bytes().all(|b| b.is_ascii_digit())
+}
+
+
+/// `[+-]?(0|[1-9]\d*)` that fits an i64 (leading zeros stay strings, e.g. zip codes)
+fn parse_int(s: &str) -> Option<i64> {
+    let digits = s.strip_prefix(['+', '-']).unwrap_or(s);
+    if !is_digits(digits) || (digits.len() > 1 && digits.starts_with('0')) {
+        return None;
+    }
+    s.parse::<i64>().ok()
+}
+
+
+/// `[+-]?(\d+\.\d*|\.\d+|\d+(?=[eE]))([eE][+-]?\d+)?`, finite values only
+fn parse_float(s: &str) -> Option<f64> {
+    let body = s.strip_prefix(['+', '-']).unwrap_or(s);
+    let (mantissa, exponent) = match body.find(['e', 'E']) {
+        Some(i) => (&body[..i], Some(&body[i + 1..])),
+        None => (body, None),
+    };
+    if let Some(exp) = exponent {
+        if !is_digits(exp.strip_prefix(['+', '-']).unwrap_or(exp)) {
+            return None;
+        }
+    }
+
+    let valid = match mantissa.split_once('.') {
+        Some((int_part, frac)) => {
+            (int_part.is_empty() || is_digits(int_part))
+                && (frac.is_empty() || is_digits(frac))
+                && !(int_part.is_empty() && frac.is_empty())
+        }
+        None => exponent.is_some() && is_digits(mantissa),
+    };
+    if !valid {
+        return None;
+    }
+    s.parse::<f64>().ok().filter(|f| f.is_finite())
+}
+
+
+/// `-?[$€£](\d+|\d{1,3}(,\d{3})+)(\.\d+)?` -> normalized amount string
+fn parse_currency(s: &str) -> Option<String> {
+    let (sign, rest) = match s.strip_prefix('-') {
+        Some(rest) => ("-", rest),
+        None => ("", s),
+    };
+    let amount = rest.strip_prefix(['$', '€', '£'])?;
+    let (whole, frac) = match amount.split_once('.') {
+        Some((whole, frac)) => (whole, Some(frac)),
+        None => (amount, None),
+    };
+    if frac.is_some_and(|f| !is_digits(f)) {
+        return None;
+    }
+
+    let mut groups = whole.split(',');
+    let first = groups.next()?;
+    let grouped: Vec<&str> = groups.collect();
+    let whole_ok = if grouped.is_empty() {
+        is_digits(first)
+    } else {
+        is_digits(first) && first.len() <= 3 && grouped.iter().all(|g| g.len() == 3 && is_digits(g))
+    };
+    if !whole_ok {
+        return None;
+    }
+
+    let digits = whole.replace(',', "");
+    Some(match frac {
+        Some(frac) => format!("{sign}{digits}.{frac}"),
+        None => format!("{sign}{digits}"),
+    })
+}
+
+
+fn days_in_month(year: u32, month: u32) -> u32 {
+    match month {
+        1 | 3 | 5 | 7 | 8 | 10 | 12 => 31,
+        4 | 6 | 9 | 11 => 30,
+        _ if (year % 4 == 0 && year % 100 != 0) || year % 400 == 0 => 29,
+        _ => 28,
+    }
+}
+
+
+fn two_digits(s: &str) -> Option<u32> {
+    (s.len() == 2 && is_digits(s)).then(|| s.parse().ok()).flatten()
+}
+
+
+/// `YYYY-MM-DD` accepted by `date.fromisoformat()`
+fn is_date(s: &str) -> bool {
+    let b = s.as_bytes();
+    if !s.is_ascii() || b.len() != 10 || b[4] != b'-' || b[7] != b'-' || !is_digits(&s[0..4]) {
+        return false;
+    }
+    let year: u32 = s[0..4].parse().unwrap_or(0);
+    match (two_digits(&s[5..7]), two_digits(&s[8..10])) {
+        (Some(month), Some(day)) => {
+            year >= 1 && (1..=12).contains(&month) && day >= 1 && day <= days_in_month(year, month)
+        }
+        _ => false,
+    }
+}
+
+
+/// `HH:MM[:SS[.f+]]`
+fn is_time(s: &str) -> bool {
+    let (hms, frac) = match s.split_once('.') {
+        Some((hms, frac)) => (hms, Some(frac)),
+        None => (s, None),
+    };
+    let parts: Vec<&str> = hms.split(':').collect();
+    if !(parts.len() == 3 || (parts.len() == 2 && frac.is_none())) || frac.is_some_and(|f| !is_digits(f)) {
+        return false;
+    }
+    let limits = [24, 60, 60];
+    parts.iter().zip(limits).all(|(part, limit)| two_digits(part).is_some_and(|v| v < limit))
+}
+
+
+/// `Z` or `[+-]HH[:]MM`
+fn is_offset(s: &str) -> bool {
+    if s == "Z" {
+        return true;
+    }
+    let Some(offset) = s.strip_prefix(['+', '-']) else {
+        return false;
+    };
+    let (hours, minutes) = match offset.split_once(':') {
+        Some(split) => split,
+        None if offset.len() == 4 => offset.split_at(2),
+        None => return false,
+    };
+    two_digits(hours).is_some_and(|h| h < 24) && two_digits(minutes).is_some_and(|m| m < 60)
+}
+
+
+/// `YYYY-MM-DD[T ]HH:MM[:SS[.f+]][Z|+HH:MM]` accepted by `datetime.fromisoformat()`
+fn is_datetime(s: &str) -> bool {
+    if !s.is_ascii() || s.len() < 16 {
+        return false;
+    }
+    let (date, rest) = s.split_at(10);
+    let Some(rest) = rest.strip_prefix(['T', ' ']) else {
+        return false;
+    };
+    let (time, offset) = match rest.find(['Z', '+', '-']) {
+        Some(i) => rest.split_at(i),
+        None => (rest, ""),
+    };
+    is_date(date) && is_time(time) && (offset.is_empty() || is_offset(offset))
+}
+
+
+/// typed value of a parsed string
+pub(crate) fn infer_str(value: &str) -> TypedValue {
+    match value {
+        "None" | "null" | "" => return TypedValue::Null,
+        _ if value.eq_ignore_ascii_case("true") => return TypedValue::Bool(true),
+        _ if value.eq_ignore_ascii_case("false") => return TypedValue::Bool(false),
+        _ => {}
+    }
+
+    // cheap first byte dispatch before trying the number / date shapes
+    let first = value.as_bytes()[0];
+    if first.is_ascii_digit() || matches!(first, b'+' | b'-' | b'.') {
+        if let Some(i) = parse_int(value) {
+            return TypedValue::Int(i);
+        }
+        if let Some(f) = parse_float(value) {
+            return TypedValue::Float(f);
+        }
+        if is_date(value) {
+            return TypedValue::Date(value.to_string());
+        }
+        if is_datetime(value) {
+            return TypedValue::DateTime(value.to_string());
+        }
+    }
+    if let Some(amount) = parse_currency(value) {
+        return TypedValue::Decimal(amount);
+    }
+    TypedValue::Str(value.to_string())
+}
+
+
+/// typed value of a top level JSON value (nested structures are kept as is)
+pub(crate) fn infer_json(value: &Value) -> TypedValue {
+    match value {
+        Value::String(s) => infer_str(s),
+        Value::Null => TypedValue::Null,
+        Value::Bool(b) => TypedValue::Bool(*b),
+        Value::Number(n) => match n.as_i64() {
+            Some(i) => TypedValue::Int(i),
+            None if n.is_f64() => TypedValue::Float(n.as_f64().unwrap_or(f64::NAN)),
+            None => TypedValue::Json(value.clone()),
+        },
+        _ => TypedValue::Json(value.clone()),
+    }
+}
+
+
+impl TypedValue {
+    /// python `type(value).__name__` of the converted value
+    pub(crate) fn type_name(&self) -> &'static str {
+        match self {
+            TypedValue::Str(_) => "str",
+            TypedValue::Int(_) => "int",
+            TypedValue::Float(_) => "float",
+            TypedValue::Bool(_) => "bool",
+            TypedValue::Null => "NoneType",
+            TypedValue::Decimal(_) => "Decimal",
+            TypedValue::Date(_) => "date",
+            TypedValue::DateTime(_) => "datetime",
+            TypedValue::Json(Value::Number(_)) => "int",
+            TypedValue::Json(Value::Array(_)) => "list",
+            TypedValue::Json(_) => "dict",
+        }
+    }
+
+    /// python object conversion (Back on the Main Thread/GIL)
+    pub(crate) fn to_py<'py>(&self, py: Python<'py>) -> PyResult<Bound<'py, PyAny>> {
+        Ok(match self {
+            TypedValue::Str(s) => s.as_str().into_pyobject(py)?.into_any(),
+            TypedValue::Int(i) => i.into_pyobject(py)?.into_any(),
+            TypedValue::Float(f) => f.into_pyobject(py)?.into_any(),
+            TypedValue::Bool(b) => b.into_pyobject(py)?.to_owned().into_any(),
+            TypedValue::Null => py.None().into_bound(py),
+            TypedValue::Decimal(s) => DECIMAL.import(py, "decimal", "Decimal")?.call1((s.as_str(),))?,
+            TypedValue::Date(s) => DATE.import(py, "datetime", "date")?.call_method1("fromisoformat", (s.as_str(),))?,
+            TypedValue::DateTime(s) => {
+                DATETIME.import(py, "datetime", "datetime")?.call_method1("fromisoformat", (s.as_str(),))?
+            }
+            TypedValue::Json(v) => json_to_py(py, v)?,
+        })
+    }
+}
+
+
+/// recursive function to help convert json to python objects
+pub(crate) fn json_to_py<'py>(py: Python<'py>, value: &Value) -> PyResult<Bound<'py, PyAny>> {
+    Ok(match value {
+        Value::Null => py.None().into_bound(py),
+        Value::Bool(b) => b.into_pyobject(py)?.to_owned().into_any(),
+        Value::Number(n) => {
+            if let Some(i) = n.as_i64() {
+                i.into_pyobject(py)?.into_any()
+            } else if let Some(u) = n.as_u64() {
+                u.into_pyobject(py)?.into_any()
+            } else {
+                n.as_f64().unwrap_or(f64::NAN).into_pyobject(py)?.into_any()
+            }
+        }
+        Value::String(s) => s.into_pyobject(py)?.into_any(),
+        Value::Array(arr) => {
+            let list = PyList::empty(py);
+            for item in arr {
+                list.append(json_to_py(py, item)?)?;
+            }
+            list.into_any()
+        }
+        Value::Object(map) => {
+            let dict = PyDict::new(py);
+            for (k, v) in map {
+                dict.set_item(k, json_to_py(py, v)?)?;
+            }
+            dict.into_any()
+        }
+    })
+}
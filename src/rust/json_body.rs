@@ -0,0 +1,129 @@
+use std::collections::{HashMap, HashSet};
+
+use pyo3::exceptions::PyValueError;
+use pyo3::prelude::*;
+use pyo3::types::PyBytes;
+use serde_json::value::RawValue;
+use serde_json::Value;
+
+use crate::{build_results, pool, process_batch, InputType};
+
+
+/// split a JSON pointer ("/data/items") or a plain top level key ("data") into unescaped tokens
+fn pointer_tokens(pointer: &str) -> Vec<String> {
+    match pointer.strip_prefix('/') {
+        Some(path) => path.split('/').map(|token| token.replace("~1", "/").replace("~0", "~")).collect(),
+        None if pointer.is_empty() => Vec::new(),
+        None => vec![pointer.to_string()],
+    }
+}
+
+
+/// walk down to the array at `tokens`, only the containers on the path are deserialized
+/// (one level at a time, every other value stays an unparsed borrowed slice)
+fn find_array<'a>(body: &'a [u8], tokens: &[String]) -> Result<Vec<&'a RawValue>, String> {
+    let mut current: &'a RawValue =
+        serde_json::from_slice(body).map_err(|e| format!("invalid JSON body: {e}"))?;
+
+    for token in tokens {
+        let text: &'a str = current.get();
+        let next = if text.starts_with('{') {
+            let mut object: HashMap<String, &'a RawValue> =
+                serde_json::from_str(text).map_err(|e| format!("invalid JSON object: {e}"))?;
+            object.remove(token)
+        } else if text.starts_with('[') {
+            let array: Vec<&'a RawValue> =
+                serde_json::from_str(text).map_err(|e| format!("invalid JSON array: {e}"))?;
+            token.parse::<usize>().ok().and_then(|i| array.get(i).copied())
+        } else {
+            None
+        };
+        current = next.ok_or_else(|| format!("'{token}' not found in JSON body"))?;
+    }
+
+    if !current.get().starts_with('[') {
+        return Err("JSON pointer does not resolve to an array".to_string());
+    }
+    serde_json::from_str(current.get()).map_err(|e| format!("invalid JSON array: {e}"))
+}
+
+
+/// record string of an array element: strings are unescaped, anything else is
+/// serialized as compact JSON (same as dict inputs of `smart_parse_batch`)
+fn element_to_record(element: &RawValue) -> String {
+    let text = element.get();
+    if text.starts_with('"') {
+        serde_json::from_str::<String>(text).unwrap_or_else(|_| text.to_string())
+    } else {
+        serde_json::from_str::<Value>(text)
+            .map(|value| value.to_string())
+            .unwrap_or_else(|_| text.to_string())
+    }
+}
+
+
+/// GIL-free extraction of the array records of every body, deduplicated by content
+/// (first occurrence wins, in body order)
+fn extract_records(bodies: &[&[u8]], tokens: &[String], strict: bool) -> Result<Vec<String>, String> {
+    let per_body: Vec<Vec<String>> = pool::map_slice(bodies, |body| match find_array(body, tokens) {
+        Ok(elements) => Ok(elements.into_iter().map(element_to_record).collect()),
+        Err(_) if !strict => Ok(Vec::new()),
+        Err(e) => Err(e),
+    })
+    .into_iter()
+    .collect::<Result<_, String>>()?;
+
+    // full string comparison, a hash collision must not drop a distinct record
+    let records: Vec<String> = per_body.into_iter().flatten().collect();
+    let mut seen = HashSet::with_capacity(records.len());
+    let first_seen: Vec<bool> = records.iter().map(|record| seen.insert(record.as_str())).collect();
+    Ok(records.into_iter().zip(first_seen).filter_map(|(record, first)| first.then_some(record)).collect())
+}
+
+
+/// Extract the records of the array at `pointer` from raw JSON response bodies.
+///
+/// `pointer` is a JSON pointer (e.g. "/data/items") or a plain top level key. Bodies are
+/// read in place and records are deduplicated across all bodies by their content.
+#[pyfunction]
+#[pyo3(signature = (bodies, pointer, strict=true))]
+pub fn extract_json_records<'py>(
+    py: Python<'py>,
+    bodies: Vec<Bound<'py, PyBytes>>,
+    pointer: &str,
+    strict: bool,
+) -> PyResult<Vec<String>> {
+    let slices: Vec<&[u8]> = bodies.iter().map(|body| body.as_bytes()).collect();
+    let tokens = pointer_tokens(pointer);
+
+    py.detach(|| extract_records(&slices, &tokens, strict)).map_err(PyValueError::new_err)
+}
+
+
+/// One pass variant of `extract_json_records` + `smart_parse_batch`.
+///
+/// Records are extracted, deduplicated and parsed in rust, the only python objects
+/// created are the output (raw, dict) tuples.
+#[pyfunction]
+#[pyo3(signature = (bodies, pointer, infer_types=false, strict=true))]
+pub fn smart_parse_json_bodies<'py>(
+    py: Python<'py>,
+    bodies: Vec<Bound<'py, PyBytes>>,
+    pointer: &str,
+    infer_types: bool,
+    strict: bool,
+) -> PyResult<Vec<Py<PyAny>>> {
+    let slices: Vec<&[u8]> = bodies.iter().map(|body| body.as_bytes()).collect();
+    let tokens = pointer_tokens(pointer);
+
+    // rayon parallel extraction + parsing
+    let processed_data = py
+        .detach(|| {
+            extract_records(&slices, &tokens, strict).map(|records| {
+                process_batch(records.into_iter().map(InputType::Raw).collect(), infer_types)
+            })
+        })
+        .map_err(PyValueError::new_err)?;
+
+    build_results(py, processed_data)
+}
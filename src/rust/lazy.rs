@@ -0,0 +1,155 @@
+use pyo3::exceptions::PyKeyError;
+use pyo3::prelude::*;
+use pyo3::types::{PyDict, PyIterator, PyList, PyString};
+use pyo3::IntoPyObject;
+
+use crate::inference::TypedValue;
+use crate::ProcessedRecord;
+
+
+/// single parsed field, kept in native memory until python asks for it
+struct LazyEntry {
+    key: String,
+    raw: String,
+    // inferred value, `None` unless `infer_types` was requested
+    typed: Option<TypedValue>,
+}
+
+
+/// Read-only `Mapping` over a parsed record, returned by `smart_parse_batch(lazy=True)`.
+///
+/// Parsed pairs stay in rust owned memory and python keys / values are only created
+/// when they are accessed. Registered as a `collections.abc.Mapping` at module init.
+#[pyclass(module = "swirl.ingestion.rust_ingestion", mapping, frozen)]
+pub struct LazyRecord {
+    entries: Vec<LazyEntry>,
+}
+
+impl LazyRecord {
+    /// moves the pairs of a parsed record over, with the same key semantics as the eager dict
+    /// (a repeated key keeps its first position and its last value)
+    fn from_record(pairs: Vec<(String, String)>, unparsed: Vec<String>, typed: Vec<TypedValue>) -> Self {
+        let mut entries: Vec<LazyEntry> = Vec::with_capacity(pairs.len() + 1);
+        let mut typed_iter = typed.into_iter();
+
+        let unparsed = (!unparsed.is_empty()).then(|| ("_unparsed".to_string(), unparsed.join(" ")));
+        for (key, raw) in pairs.into_iter().chain(unparsed) {
+            // `typed` is aligned with `pairs`, so `_unparsed` (always last) is never typed
+            let typed = typed_iter.next();
+            match entries.iter_mut().find(|entry| entry.key == key) {
+                Some(entry) => {
+                    entry.raw = raw;
+                    entry.typed = typed;
+                }
+                None => entries.push(LazyEntry { key, raw, typed }),
+            }
+        }
+
+        LazyRecord { entries }
+    }
+
+    fn find(&self, key: &Bound<'_, PyAny>) -> Option<&LazyEntry> {
+        let key = key.cast::<PyString>().ok()?.to_str().ok()?;
+        self.entries.iter().find(|entry| entry.key == key)
+    }
+
+    /// python value of a field (falls back to the raw string if python rejects the inferred value)
+    fn value<'py>(&self, py: Python<'py>, entry: &LazyEntry) -> PyResult<Bound<'py, PyAny>> {
+        if let Some(typed) = &entry.typed {
+            if let Ok(value) = typed.to_py(py) {
+                return Ok(value);
+            }
+        }
+        Ok(entry.raw.as_str().into_pyobject(py)?.into_any())
+    }
+}
+
+#[pymethods]
+impl LazyRecord {
+    fn __len__(&self) -> usize {
+        self.entries.len()
+    }
+
+    fn __getitem__<'py>(&self, py: Python<'py>, key: &Bound<'py, PyAny>) -> PyResult<Bound<'py, PyAny>> {
+        match self.find(key) {
+            Some(entry) => self.value(py, entry),
+            None => Err(PyKeyError::new_err(key.clone().unbind())),
+        }
+    }
+
+    fn __contains__(&self, key: &Bound<'_, PyAny>) -> bool {
+        self.find(key).is_some()
+    }
+
+    fn __iter__<'py>(&self, py: Python<'py>) -> PyResult<Bound<'py, PyIterator>> {
+        self.keys(py)?.try_iter()
+    }
+
+    fn __eq__(&self, py: Python<'_>, other: &Bound<'_, PyAny>) -> PyResult<bool> {
+        self.to_dict(py)?.eq(other)
+    }
+
+    fn __repr__(&self, py: Python<'_>) -> PyResult<String> {
+        Ok(format!("LazyRecord({})", self.to_dict(py)?.repr()?))
+    }
+
+    #[pyo3(signature = (key, default=None))]
+    fn get<'py>(
+        &self,
+        py: Python<'py>,
+        key: &Bound<'py, PyAny>,
+        default: Option<Bound<'py, PyAny>>,
+    ) -> PyResult<Bound<'py, PyAny>> {
+        match self.find(key) {
+            Some(entry) => self.value(py, entry),
+            None => Ok(default.unwrap_or_else(|| py.None().into_bound(py))),
+        }
+    }
+
+    fn keys<'py>(&self, py: Python<'py>) -> PyResult<Bound<'py, PyList>> {
+        PyList::new(py, self.entries.iter().map(|entry| entry.key.as_str()))
+    }
+
+    fn values<'py>(&self, py: Python<'py>) -> PyResult<Bound<'py, PyList>> {
+        let values = PyList::empty(py);
+        for entry in &self.entries {
+            values.append(self.value(py, entry)?)?;
+        }
+        Ok(values)
+    }
+
+    fn items<'py>(&self, py: Python<'py>) -> PyResult<Bound<'py, PyList>> {
+        let items = PyList::empty(py);
+        for entry in &self.entries {
+            items.append((entry.key.as_str(), self.value(py, entry)?))?;
+        }
+        Ok(items)
+    }
+
+    /// materialize the record as a regular python dict (same output as `lazy=False`)
+    fn to_dict<'py>(&self, py: Python<'py>) -> PyResult<Bound<'py, PyDict>> {
+        let dict = PyDict::new(py);
+        for entry in &self.entries {
+            dict.set_item(entry.key.as_str(), self.value(py, entry)?)?;
+        }
+        Ok(dict)
+    }
+}
+
+
+/// python (raw, LazyRecord) tuple reconstruction (Back on the Main Thread/GIL)
+///
+/// Dict inputs are returned as the same dict objects, like `build_results()`.
+pub(crate) fn build_lazy_results(py: Python<'_>, processed_data: Vec<ProcessedRecord>) -> PyResult<Vec<Py<PyAny>>> {
+    let mut results = Vec::with_capacity(processed_data.len());
+    for record in processed_data {
+        let mapping = match record.existing {
+            Some(py_dict_ref) => py_dict_ref.into_any(),
+            None => Py::new(py, LazyRecord::from_record(record.pairs, record.unparsed, record.typed))?.into_any(),
+        };
+        let log_tuple = (record.source, mapping).into_pyobject(py)?;
+        results.push(log_tuple.into_any().unbind());
+    }
+
+    Ok(results)
+}
@@ -1,13 +1,23 @@
 use pyo3::prelude::*;
-use pyo3::types::{PyDict, PyString, PyList};
+use pyo3::types::{PyDict, PyInt, PyList, PyString};
 use pyo3::IntoPyObject; 
 use pest::Parser;
 use pest_derive::Parser;
-use rayon::prelude::*;
 use regex::Regex;
 use std::sync::OnceLock;
 use serde_json::{Value, Map};
 
+mod bulk;
+mod columnar;
+mod fingerprint;
+mod hashing;
+mod inference;
+mod json_body;
+mod lazy;
+mod pool;
+mod streaming;
+mod templates;
+
 #[derive(Parser)]
 #[grammar = "rust/grammar.pest"]
 pub struct KVParser;
@@ -17,7 +27,7 @@ static SPLIT_PATTERN: OnceLock<Regex> = OnceLock::new();
 
 
 // recursive function to help convert python dictionary to json
-fn py_to_json_recursive(obj: &Bound<'_, PyAny>) -> Value {
+pub(crate) fn py_to_json_recursive(obj: &Bound<'_, PyAny>) -> Value {
     if let Ok(dict) = obj.cast::<PyDict>() {
         let mut map = Map::new();
         for (k, v) in dict {
@@ -30,6 +40,9 @@ fn py_to_json_recursive(obj: &Bound<'_, PyAny>) -> Value {
         Value::Array(vec)
     } else if let Ok(b) = obj.extract::<bool>(){
         Value::Bool(b)
+    } else if let Some(n) = obj.cast::<PyInt>().ok().and_then(|i| i.extract::<i64>().ok()) {
+        // keep ints as ints (extracting as f64 first would turn 4 into 4.0)
+        Value::Number(n.into())
     } else if let Ok(n) = obj.extract::<f64>() {
         serde_json::Number::from_f64(n).map_or(Value::Null, Value::Number)
     } else if let Ok(s) = obj.extract::<String>() {
@@ -45,7 +58,7 @@ fn py_to_json_recursive(obj: &Bound<'_, PyAny>) -> Value {
 
 
 /// helper function to handle the JSON Fast Path
-fn try_parse_json(trimmed: &str) -> Option<Vec<(String, String)>> {
+fn try_parse_json(trimmed: &str) -> Option<Vec<(String, Value)>> {
     // quick exit if it doesn't look like JSON
     if !((trimmed.starts_with('{') && trimmed.ends_with('}')) || 
          (trimmed.starts_with('[') && trimmed.ends_with(']'))) {
@@ -57,139 +70,270 @@ fn try_parse_json(trimmed: &str) -> Option<Vec<(String, String)>> {
 
     match json_val {
         Value::Object(map) => {
-            let extracted = map.into_iter().map(|(k, v)| {
-                let v_str = match v {
-                    Value::String(s) => s,
-                    _ => v.to_string(),
-                };
-                (k.to_lowercase(), v_str)
-            }).collect();
+            let extracted = map.into_iter().map(|(k, v)| (k.to_lowercase(), v)).collect();
             Some(extracted)
         },
         Value::Array(_) => {
             // treat the whole array as a single entry to keep KV structure
-            Some(vec![("json_data".to_string(), trimmed.to_string())])
+            Some(vec![("json_data".to_string(), Value::String(trimmed.to_string()))])
         },
         _ => None,
     }
 }
 
-enum InputType {
+
+/// string representation of a JSON value (strings are not quoted)
+fn json_value_to_string(value: Value) -> String {
+    match value {
+        Value::String(s) => s,
+        _ => value.to_string(),
+    }
+}
+
+pub(crate) enum InputType {
     Raw(String),
     AlreadyParsed(Value, Py<PyDict>),
 }
 
+/// parsed representation of a single input record, built off the GIL
+pub(crate) struct ProcessedRecord {
+    source: String,
+    pairs: Vec<(String, String)>,
+    unparsed: Vec<String>,
+    existing: Option<Py<PyDict>>,
+    // inferred values aligned with `pairs`, empty unless `infer_types` is requested
+    typed: Vec<inference::TypedValue>,
+    // layout learned from this record, handed to the template store after the batch
+    learned_template: Option<templates::Template>,
+}
 
-#[pyfunction]
-pub fn smart_parse_batch(py: Python<'_>, logs: Vec<Py<PyAny>>) -> PyResult<Vec<Py<PyAny>>> {
+
+/// GIL-bound conversion of a python batch item into a rust owned input
+pub(crate) fn to_input(item: &Bound<'_, PyAny>) -> InputType {
+    if let Ok(dict) = item.cast::<PyDict>() {
+        let json_val = py_to_json_recursive(dict.as_any());
+        InputType::AlreadyParsed(json_val, dict.clone().unbind())
+    } else if let Ok(py_str) = item.cast::<PyString>() {
+        InputType::Raw(py_str.to_string())
+    } else {
+        InputType::Raw(item.to_string())
+    }
+}
+
+
+/// pest parse of a single trimmed segment into a lowercase (key, value) pair
+pub(crate) fn parse_segment(seg_trimmed: &str) -> Option<(String, String)> {
+    let mut pairs = KVParser::parse(Rule::pair_segment, seg_trimmed).ok()?;
+    let pair = pairs.next()?;
+    let mut inner = pair.into_inner();
+    let k = inner.next()?.as_str().to_lowercase();
+    let _delim = inner.next();
+
+    let v = inner.next()
+        .map(|val| {
+            let s = val.as_str().trim();
+            s.strip_suffix(',').unwrap_or(s).trim().to_string()
+        })
+        .filter(|s| !s.is_empty())
+        .unwrap_or_else(|| "None".to_string());
+
+    Some((k, v))
+}
+
+
+/// key value pair parsing of a single raw (non JSON) string
+///
+/// Also returns a template candidate when the record went through the full pest path.
+fn parse_kv(raw_str: &str) -> (Vec<(String, String)>, Vec<String>, Option<templates::Template>) {
     let header_fix = HEADER_FIX.get_or_init(|| {
         Regex::new(r"(?P<name>[a-zA-Z]+)\s+(?P<id>\d+):\s*").unwrap()
     });
-    
+
     let split_pattern = SPLIT_PATTERN.get_or_init(|| {
         Regex::new(r"(?:,\s*|\s+)[a-zA-Z_]\w*\s*[:=]").unwrap()
     });
 
-    // GIL-bound preprocessing
-    let inputs: Vec<InputType> = logs.into_iter().map(|item| {
-        let bound_item = item.into_bound(py);
-        if let Ok(dict) = bound_item.cast::<PyDict>() {
-            let json_val = py_to_json_recursive(dict.as_any());
-            InputType::AlreadyParsed(json_val, dict.clone().unbind())
-        } else if let Ok(py_str) = bound_item.cast::<PyString>() {
-            InputType::Raw(py_str.to_string())
-        } else {
-            InputType::Raw(bound_item.to_string())
+    let content = header_fix.replace_all(raw_str, "$name-$id, ");
+
+    // --- learned template fast path ---
+    if let Some((extracted, unparsed_segments)) = templates::try_templates(&content) {
+        return (extracted, unparsed_segments, None);
+    }
+
+    let mut extracted = Vec::new();
+    let mut unparsed_segments = Vec::new();
+
+    let mut segments = Vec::new();
+    let mut split_points = Vec::new();
+    let mut last = 0;
+    for mat in split_pattern.find_iter(&content) {
+        segments.push(&content[last..mat.start()]);
+        let match_str = mat.as_str();
+        let key_start_offset = match_str.find(|c: char| c.is_alphanumeric() || c == '_').unwrap_or(0);
+        last = mat.start() + key_start_offset;
+        split_points.push((mat.start(), last));
+    }
+    segments.push(&content[last..]);
+
+    for seg in segments {
+        let seg_trimmed = seg.trim();
+        if seg_trimmed.is_empty() { continue; }
+
+        match parse_segment(seg_trimmed) {
+            Some(pair) => extracted.push(pair),
+            None => unparsed_segments.push(seg_trimmed.to_string()),
         }
-    }).collect(); 
+    }
 
-    // rayon parallel processing
-    let processed_data: Vec<(String, Vec<(String, String)>, Vec<String>, Option<Py<PyDict>>)> = py.detach(|| {
-        inputs.into_par_iter()
-            .map(|input| {
-                match input {
-                    InputType::AlreadyParsed(rust_val, dict_handle) => {
-                        // serialization (but maintain key order)
-                        let json_str = serde_json::to_string(&rust_val).unwrap_or_else(|_| "{}".to_string());
-                        (json_str, Vec::new(), Vec::new(), Some(dict_handle))
-                    },
-                    InputType::Raw(raw_str) => {
-                        let trimmed = raw_str.trim();
-                        // --- JSON PATH ---
-                        if let Some(extracted) = try_parse_json(trimmed) {
-                            return (raw_str, extracted, Vec::new(), None);
-                        }
-                        
-                        // --- Key Value Pair PATH (fallback) ---
-                        let mut extracted = Vec::new();
-                        let mut unparsed_segments = Vec::new();
-                        let content = header_fix.replace_all(&raw_str, "$name-$id, ").to_string();
-
-                        let mut segments = Vec::new();
-                        let mut last = 0;
-                        for mat in split_pattern.find_iter(&content) {
-                            segments.push(&content[last..mat.start()]);
-                            let match_str = mat.as_str();
-                            let key_start_offset = match_str.find(|c: char| c.is_alphanumeric() || c == '_').unwrap_or(0);
-                            last = mat.start() + key_start_offset;
-                        }
-                        segments.push(&content[last..]);
-
-                        for seg in segments {
-                            let seg_trimmed = seg.trim();
-                            if seg_trimmed.is_empty() { continue; }
-
-                            if let Ok(mut pairs) = KVParser::parse(Rule::pair_segment, seg_trimmed) {
-                                let pair = pairs.next().unwrap();
-                                let mut inner = pair.into_inner();
-                                let k = inner.next().unwrap().as_str().to_lowercase();
-                                let _delim = inner.next().unwrap();
-                                
-                                let v = inner.next()
-                                    .map(|val| {
-                                        let s = val.as_str().trim();
-                                        s.strip_suffix(',').unwrap_or(s).trim().to_string()
-                                    })
-                                    .filter(|s| !s.is_empty())
-                                    .unwrap_or_else(|| "None".to_string());
-                                
-                                extracted.push((k, v));
-                            } else {
-                                unparsed_segments.push(seg_trimmed.to_string());
-                            }
-                        }
-                        (raw_str, extracted, unparsed_segments, None)
-                    } 
-                }
-            })
-            .collect()
-    });
+    let candidate = templates::derive(&content, &split_points, &extracted, &unparsed_segments);
+    (extracted, unparsed_segments, candidate)
+}
 
-    // python dict reconstruction (Back on the Main Thread/GIL)
-    let mut results = Vec::with_capacity(processed_data.len());
-    for (source_str, pairs, unparsed, existing_dict) in processed_data {
-        let final_dict = if let Some(py_dict_ref) = existing_dict {
-            py_dict_ref.into_bound(py)
+
+/// GIL-free parsing of a single input record
+pub(crate) fn process_input(input: InputType, infer_types: bool) -> ProcessedRecord {
+    match input {
+        InputType::AlreadyParsed(rust_val, dict_handle) => {
+            // serialization (but maintain key order)
+            let json_str = serde_json::to_string(&rust_val).unwrap_or_else(|_| "{}".to_string());
+            ProcessedRecord {
+                source: json_str,
+                pairs: Vec::new(),
+                unparsed: Vec::new(),
+                existing: Some(dict_handle),
+                typed: Vec::new(),
+                learned_template: None,
+            }
+        },
+        InputType::Raw(raw_str) => {
+            let mut record = parse_raw(&raw_str, infer_types);
+            record.source = raw_str;
+            record
+        }
+    }
+}
+
+
+/// GIL-free parsing of a borrowed raw string (`source` is left empty for the caller to fill)
+pub(crate) fn parse_raw(raw_str: &str, infer_types: bool) -> ProcessedRecord {
+    // --- JSON PATH ---
+    if let Some(extracted) = try_parse_json(raw_str.trim()) {
+        let typed = if infer_types {
+            extracted.iter().map(|(_, v)| inference::infer_json(v)).collect()
         } else {
-            let dict = PyDict::new(py);
-            for (k, v) in pairs {
+            Vec::new()
+        };
+        let pairs = extracted.into_iter().map(|(k, v)| (k, json_value_to_string(v))).collect();
+        return ProcessedRecord {
+            source: String::new(),
+            pairs,
+            unparsed: Vec::new(),
+            existing: None,
+            typed,
+            learned_template: None,
+        };
+    }
+
+    // --- Key Value Pair PATH (fallback) ---
+    let (extracted, unparsed, learned_template) = parse_kv(raw_str);
+    let typed = if infer_types {
+        extracted.iter().map(|(_, v)| inference::infer_str(v)).collect()
+    } else {
+        Vec::new()
+    };
+    ProcessedRecord { source: String::new(), pairs: extracted, unparsed, existing: None, typed, learned_template }
+}
+
+
+/// rayon parallel processing of a batch, sequential below the cutoff (call without holding the GIL)
+pub(crate) fn process_batch(inputs: Vec<InputType>, infer_types: bool) -> Vec<ProcessedRecord> {
+    let mut records: Vec<ProcessedRecord> =
+        pool::map_batch(inputs, |input| process_input(input, infer_types));
+    templates::learn(records.iter_mut().filter_map(|record| record.learned_template.take()));
+    records
+}
+
+
+/// python dict reconstruction of a single record (Back on the Main Thread/GIL)
+pub(crate) fn build_record(py: Python<'_>, record: ProcessedRecord) -> (String, Bound<'_, PyDict>) {
+    let final_dict = if let Some(py_dict_ref) = record.existing {
+        py_dict_ref.into_bound(py)
+    } else {
+        let dict = PyDict::new(py);
+        if record.typed.is_empty() {
+            for (k, v) in record.pairs {
                 let _ = dict.set_item(k, v);
             }
-            if !unparsed.is_empty() {
-                let _ = dict.set_item("_unparsed", unparsed.join(" "));
+        } else {
+            for ((k, v), typed) in record.pairs.into_iter().zip(record.typed) {
+                // fall back to the raw string if python rejects the inferred value
+                match typed.to_py(py) {
+                    Ok(value) => { let _ = dict.set_item(k, value); },
+                    Err(_) => { let _ = dict.set_item(k, v); },
+                }
             }
-            dict
-        };
+        }
+        if !record.unparsed.is_empty() {
+            let _ = dict.set_item("_unparsed", record.unparsed.join(" "));
+        }
+        dict
+    };
+    (record.source, final_dict)
+}
 
-        let log_tuple = (source_str, final_dict).into_pyobject(py)?;
+
+/// python (raw, dict) tuple reconstruction (Back on the Main Thread/GIL)
+pub(crate) fn build_results(py: Python<'_>, processed_data: Vec<ProcessedRecord>) -> PyResult<Vec<Py<PyAny>>> {
+    let mut results = Vec::with_capacity(processed_data.len());
+    for record in processed_data {
+        let log_tuple = build_record(py, record).into_pyobject(py)?;
         results.push(log_tuple.into_any().unbind());
     }
 
     Ok(results)
 }
 
+
+#[pyfunction]
+#[pyo3(signature = (logs, infer_types=false, lazy=false))]
+pub fn smart_parse_batch(
+    py: Python<'_>,
+    logs: Vec<Py<PyAny>>,
+    infer_types: bool,
+    lazy: bool,
+) -> PyResult<Vec<Py<PyAny>>> {
+    // GIL-bound preprocessing
+    let inputs: Vec<InputType> = logs.iter().map(|item| to_input(item.bind(py))).collect();
+
+    // rayon parallel processing
+    let processed_data = py.detach(|| process_batch(inputs, infer_types));
+
+    if lazy {
+        return lazy::build_lazy_results(py, processed_data);
+    }
+    build_results(py, processed_data)
+}
+
 #[pymodule]
 fn rust_ingestion(m: &Bound<'_, PyModule>) -> PyResult<()> {
     m.add_function(wrap_pyfunction!(smart_parse_batch, m)?)?;
+    m.add_function(wrap_pyfunction!(columnar::smart_parse_batch_columnar, m)?)?;
+    m.add_function(wrap_pyfunction!(bulk::smart_parse_bytes, m)?)?;
+    m.add_function(wrap_pyfunction!(fingerprint::smart_parse_fingerprint_batch, m)?)?;
+    m.add_function(wrap_pyfunction!(fingerprint::fingerprint_batch, m)?)?;
+    m.add_function(wrap_pyfunction!(hashing::hash_batch, m)?)?;
+    m.add_function(wrap_pyfunction!(json_body::extract_json_records, m)?)?;
+    m.add_function(wrap_pyfunction!(json_body::smart_parse_json_bodies, m)?)?;
+    m.add_function(wrap_pyfunction!(templates::configure_templates, m)?)?;
+    m.add_function(wrap_pyfunction!(templates::template_stats, m)?)?;
+    m.add_function(wrap_pyfunction!(templates::clear_templates, m)?)?;
+    m.add_function(wrap_pyfunction!(pool::configure_parallelism, m)?)?;
+    m.add_function(wrap_pyfunction!(pool::parallelism_stats, m)?)?;
+    m.add_class::<streaming::SmartParser>()?;
+    m.add_class::<lazy::LazyRecord>()?;
+
+    // lazy records are read-only mappings
+    let mapping_abc = m.py().import("collections.abc")?.getattr("Mapping")?;
+    mapping_abc.call_method1("register", (m.getattr("LazyRecord")?,))?;
     Ok(())
-}
\ No newline at end of file
+}
@@ -0,0 +1,130 @@
+use std::sync::atomic::{AtomicU64, AtomicUsize, Ordering};
+use std::sync::{Arc, OnceLock, RwLock};
+
+use pyo3::exceptions::{PyRuntimeError, PyValueError};
+use pyo3::prelude::*;
+use pyo3::types::PyDict;
+use rayon::prelude::*;
+use rayon::{ThreadPool, ThreadPoolBuilder};
+
+// batches smaller than this skip rayon's fork/join entirely
+const DEFAULT_SEQUENTIAL_CUTOFF: usize = 64;
+
+static SEQUENTIAL_CUTOFF: AtomicUsize = AtomicUsize::new(DEFAULT_SEQUENTIAL_CUTOFF);
+
+// counters
+static PARALLEL_BATCHES: AtomicU64 = AtomicU64::new(0);
+static PARALLEL_RECORDS: AtomicU64 = AtomicU64::new(0);
+static SEQUENTIAL_BATCHES: AtomicU64 = AtomicU64::new(0);
+static SEQUENTIAL_RECORDS: AtomicU64 = AtomicU64::new(0);
+
+// dedicated pool of this process, `None` runs on rayon's global pool
+static POOL: OnceLock<RwLock<Option<Arc<ThreadPool>>>> = OnceLock::new();
+
+
+fn pool_slot() -> &'static RwLock<Option<Arc<ThreadPool>>> {
+    POOL.get_or_init(|| RwLock::new(None))
+}
+
+
+fn build_pool(num_threads: usize) -> Result<ThreadPool, rayon::ThreadPoolBuildError> {
+    ThreadPoolBuilder::new()
+        .num_threads(num_threads)
+        .thread_name(|i| format!("swirl-rayon-{i}"))
+        .build()
+}
+
+
+/// true (and counted) when a batch of `len` items should run in parallel
+fn use_parallel(len: usize) -> bool {
+    if len < SEQUENTIAL_CUTOFF.load(Ordering::Relaxed) {
+        SEQUENTIAL_BATCHES.fetch_add(1, Ordering::Relaxed);
+        SEQUENTIAL_RECORDS.fetch_add(len as u64, Ordering::Relaxed);
+        return false;
+    }
+    PARALLEL_BATCHES.fetch_add(1, Ordering::Relaxed);
+    PARALLEL_RECORDS.fetch_add(len as u64, Ordering::Relaxed);
+    true
+}
+
+
+/// run `op` on the dedicated pool if one is configured, on the global pool otherwise
+fn install<R: Send>(op: impl FnOnce() -> R + Send) -> R {
+    let pool = pool_slot().read().ok().and_then(|slot| slot.clone());
+    match pool {
+        Some(pool) => pool.install(op),
+        None => op(),
+    }
+}
+
+
+/// map an owned batch, sequentially below the cutoff and on the configured pool otherwise
+/// (call without holding the GIL)
+pub(crate) fn map_batch<T, R, F>(items: Vec<T>, f: F) -> Vec<R>
+where
+    T: Send,
+    R: Send,
+    F: Fn(T) -> R + Send + Sync,
+{
+    if !use_parallel(items.len()) {
+        return items.into_iter().map(f).collect();
+    }
+    install(|| items.into_par_iter().map(f).collect())
+}
+
+
+/// borrowed variant of `map_batch`
+pub(crate) fn map_slice<T, R, F>(items: &[T], f: F) -> Vec<R>
+where
+    T: Sync,
+    R: Send,
+    F: Fn(&T) -> R + Send + Sync,
+{
+    if !use_parallel(items.len()) {
+        return items.iter().map(f).collect();
+    }
+    install(|| items.par_iter().map(f).collect())
+}
+
+
+/// Configure the threads used by every batch function of this process.
+///
+/// `num_threads` builds a dedicated pool for the process (None goes back to rayon's
+/// global pool, sized by `RAYON_NUM_THREADS` or the core count). Batches with fewer than
+/// `sequential_cutoff` records are parsed on the calling thread.
+#[pyfunction]
+#[pyo3(signature = (num_threads=None, sequential_cutoff=DEFAULT_SEQUENTIAL_CUTOFF))]
+pub fn configure_parallelism(num_threads: Option<usize>, sequential_cutoff: usize) -> PyResult<()> {
+    let pool = match num_threads {
+        Some(0) => return Err(PyValueError::new_err("num_threads must be greater than 0")),
+        Some(n) => Some(Arc::new(build_pool(n).map_err(|e| PyRuntimeError::new_err(e.to_string()))?)),
+        None => None,
+    };
+
+    SEQUENTIAL_CUTOFF.store(sequential_cutoff, Ordering::Relaxed);
+    // batches already running keep their `Arc` to the old pool
+    if let Ok(mut slot) = pool_slot().write() {
+        *slot = pool;
+    }
+    Ok(())
+}
+
+
+/// Pool settings and counters of the sequential / parallel batch paths.
+#[pyfunction]
+pub fn parallelism_stats(py: Python<'_>) -> PyResult<Py<PyDict>> {
+    let pool = pool_slot().read().ok().and_then(|slot| slot.clone());
+
+    let out = PyDict::new(py);
+    out.set_item("dedicated_pool", pool.is_some())?;
+    out.set_item(
+        "num_threads",
+        pool.map_or_else(rayon::current_num_threads, |pool| pool.current_num_threads()),
+    )?;
+    out.set_item("sequential_cutoff", SEQUENTIAL_CUTOFF.load(Ordering::Relaxed))?;
+    out.set_item("parallel_batches", PARALLEL_BATCHES.load(Ordering::Relaxed))?;
+    out.set_item("parallel_records", PARALLEL_RECORDS.load(Ordering::Relaxed))?;
+    out.set_item("sequential_batches", SEQUENTIAL_BATCHES.load(Ordering::Relaxed))?;
+    out.set_item("sequential_records", SEQUENTIAL_RECORDS.load(Ordering::Relaxed))?;
+    Ok(out.unbind())
+}
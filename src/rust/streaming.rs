@@ -0,0 +1,102 @@
+use std::collections::VecDeque;
+use std::thread::JoinHandle;
+
+use pyo3::exceptions::{PyRuntimeError, PyValueError};
+use pyo3::prelude::*;
+use pyo3::types::PyIterator;
+
+use crate::{build_results, process_batch, to_input, InputType, ProcessedRecord};
+
+const DEFAULT_CHUNK_SIZE: usize = 10_000;
+
+
+/// Streaming counterpart of `smart_parse_batch`.
+///
+/// Records are pulled from the fed iterables `chunk_size` at a time. While a
+/// chunk is being parsed (rayon, GIL released) the next one is already read
+/// from python, so at most two chunks are in flight and memory stays flat
+/// regardless of the total input size.
+#[pyclass(module = "swirl.ingestion.rust_ingestion")]
+pub struct SmartParser {
+    chunk_size: usize,
+    infer_types: bool,
+    sources: VecDeque<Py<PyIterator>>,
+    pending: Option<JoinHandle<Vec<ProcessedRecord>>>,
+}
+
+impl SmartParser {
+    /// GIL-bound read of up to `chunk_size` records across the fed sources
+    fn read_chunk(&mut self, py: Python<'_>) -> PyResult<Vec<InputType>> {
+        let mut chunk = Vec::with_capacity(self.chunk_size);
+        while chunk.len() < self.chunk_size {
+            let Some(source) = self.sources.front() else {
+                break;
+            };
+            let mut iter = source.bind(py).clone();
+            match iter.next() {
+                Some(item) => chunk.push(to_input(&item?)),
+                // source exhausted, move on to the next one
+                None => {
+                    self.sources.pop_front();
+                }
+            }
+        }
+        Ok(chunk)
+    }
+}
+
+#[pymethods]
+impl SmartParser {
+    #[new]
+    #[pyo3(signature = (records=None, chunk_size=DEFAULT_CHUNK_SIZE, infer_types=false))]
+    fn new(records: Option<&Bound<'_, PyAny>>, chunk_size: usize, infer_types: bool) -> PyResult<Self> {
+        if chunk_size == 0 {
+            return Err(PyValueError::new_err("chunk_size must be greater than 0"));
+        }
+        let mut parser = SmartParser {
+            chunk_size,
+            infer_types,
+            sources: VecDeque::new(),
+            pending: None,
+        };
+        if let Some(records) = records {
+            parser.feed(records)?;
+        }
+        Ok(parser)
+    }
+
+    /// Queue an iterable of records (str or dict) to be parsed
+    fn feed(&mut self, records: &Bound<'_, PyAny>) -> PyResult<()> {
+        self.sources.push_back(records.try_iter()?.unbind());
+        Ok(())
+    }
+
+    fn __iter__(slf: PyRef<'_, Self>) -> PyRef<'_, Self> {
+        slf
+    }
+
+    fn __next__(&mut self, py: Python<'_>) -> PyResult<Option<Vec<Py<PyAny>>>> {
+        loop {
+            // read the next chunk while the previous one is still being parsed
+            let inputs = self.read_chunk(py)?;
+            let previous = self.pending.take();
+            if !inputs.is_empty() {
+                let infer_types = self.infer_types;
+                self.pending = Some(std::thread::spawn(move || process_batch(inputs, infer_types)));
+            }
+
+            match previous {
+                Some(handle) => {
+                    let processed = py
+                        .detach(|| handle.join())
+                        .map_err(|_| PyRuntimeError::new_err("smart parser worker panicked"))?;
+                    return build_results(py, processed).map(Some);
+                }
+                // nothing in flight and nothing left to read
+                None if self.pending.is_none() => return Ok(None),
+                // first chunk was just submitted, prime the pipeline with the next one
+                None => continue,
+            }
+        }
+    }
+}
@@ -0,0 +1,367 @@
+use std::collections::{HashMap, HashSet};
+use std::sync::atomic::{AtomicBool, AtomicU64, AtomicUsize, Ordering};
+use std::sync::{Arc, OnceLock, RwLock};
+
+use pyo3::prelude::*;
+use pyo3::types::PyDict;
+
+use crate::parse_segment;
+
+// templates have to be seen this many times before they are used
+static MIN_SUPPORT: AtomicUsize = AtomicUsize::new(3);
+static MAX_TEMPLATES: AtomicUsize = AtomicUsize::new(256);
+static ENABLED: AtomicBool = AtomicBool::new(true);
+
+// counters
+static TEMPLATE_HITS: AtomicU64 = AtomicU64::new(0);
+static TEMPLATE_MISSES: AtomicU64 = AtomicU64::new(0);
+static TEMPLATES_LEARNED: AtomicU64 = AtomicU64::new(0);
+static TEMPLATES_EVICTED: AtomicU64 = AtomicU64::new(0);
+// logical clock of template promotions / hits, drives the least recently used eviction
+static CLOCK: AtomicU64 = AtomicU64::new(0);
+
+static STORE: OnceLock<RwLock<TemplateStore>> = OnceLock::new();
+
+// bound on layouts that are tracked but not frequent enough (yet) to become templates
+const MAX_CANDIDATES: usize = 4096;
+
+
+/// Learned extraction template of a key value layout (Drain style).
+///
+/// A layout is the ordered list of split anchors, i.e. the literal `<sep><key><delim>`
+/// text in front of every value, e.g. `", Buyer="`. Matching a record is a series of
+/// substring searches instead of the splitter regex + one pest parse per segment.
+pub(crate) struct Template {
+    // literal `<key><delim>` at the very start of the content (e.g. "Order=")
+    head: Option<(String, String)>,
+    // literal `<sep><key><delim>` anchors with their lowercase key
+    anchors: Vec<(String, String)>,
+    // CLOCK tick of the promotion / latest hit
+    last_used: AtomicU64,
+}
+
+
+fn is_delim(c: char) -> bool {
+    c == ':' || c == '='
+}
+
+
+/// A value can't hide or shift a split point of the splitter regex when it has no
+/// delimiter of its own and doesn't end in something the separator could absorb.
+fn is_safe_gap(gap: &str) -> bool {
+    !gap.contains(is_delim) && !gap.ends_with(|c: char| c.is_whitespace() || c == ',')
+}
+
+
+/// same value cleanup the pest path applies
+fn clean_value(raw_value: &str) -> String {
+    let s = raw_value.trim();
+    let s = s.strip_suffix(',').unwrap_or(s).trim();
+    if s.is_empty() { "None".to_string() } else { s.to_string() }
+}
+
+
+/// pest `key ~ delimiter` starting at `key_start`, returns the lowercase key and the value start
+fn key_value_start(content: &str, key_start: usize) -> Option<(String, usize)> {
+    let bytes = content.as_bytes();
+    let first = *bytes.get(key_start)?;
+    if !(first.is_ascii_alphabetic() || first == b'_') {
+        return None;
+    }
+
+    let mut i = key_start + 1;
+    while i < bytes.len() && (bytes[i].is_ascii_alphanumeric() || bytes[i] == b'_') {
+        i += 1;
+    }
+    let key = content[key_start..i].to_lowercase();
+
+    while i < bytes.len() && (bytes[i] == b' ' || bytes[i] == b'\t') {
+        i += 1;
+    }
+    if i >= bytes.len() || !(bytes[i] == b':' || bytes[i] == b'=') {
+        return None;
+    }
+    i += 1;
+    while i < bytes.len() && (bytes[i] == b' ' || bytes[i] == b'\t') {
+        i += 1;
+    }
+    Some((key, i))
+}
+
+
+impl Template {
+    fn n_delims(&self) -> usize {
+        self.anchors.len() + usize::from(self.head.is_some())
+    }
+
+    fn identity(&self) -> String {
+        let head = self.head.as_ref().map(|(literal, _)| literal.as_str()).unwrap_or("");
+        let anchors: Vec<&str> = self.anchors.iter().map(|(literal, _)| literal.as_str()).collect();
+        format!("{head}\u{1f}{}", anchors.join("\u{1f}"))
+    }
+
+    /// extract (pairs, unparsed segments) from header-fixed content, None if the layout differs
+    fn apply(&self, content: &str) -> Option<(Vec<(String, String)>, Vec<String>)> {
+        let mut pairs = Vec::with_capacity(self.n_delims());
+        let mut unparsed = Vec::new();
+
+        let body_start = match &self.head {
+            Some((literal, _)) => {
+                if !content.starts_with(literal.as_str()) {
+                    return None;
+                }
+                literal.len()
+            }
+            None => 0,
+        };
+
+        // everything before the first anchor
+        let (first_anchor, _) = self.anchors.first()?;
+        let first_pos = body_start + content[body_start..].find(first_anchor.as_str())?;
+        let seg_0 = &content[body_start..first_pos];
+        if !is_safe_gap(seg_0) {
+            return None;
+        }
+        match &self.head {
+            Some((_, key)) => {
+                if seg_0.is_empty() {
+                    return None;
+                }
+                pairs.push((key.clone(), clean_value(seg_0)));
+            }
+            None => {
+                let seg = seg_0.trim();
+                if !seg.is_empty() {
+                    match parse_segment(seg) {
+                        Some(pair) => pairs.push(pair),
+                        None => unparsed.push(seg.to_string()),
+                    }
+                }
+            }
+        }
+
+        // anchored values
+        let mut pos = first_pos;
+        for (i, (anchor, key)) in self.anchors.iter().enumerate() {
+            let value_start = pos + anchor.len();
+            let value_end = match self.anchors.get(i + 1) {
+                Some((next_anchor, _)) => {
+                    let gap_len = content[value_start..].find(next_anchor.as_str())?;
+                    let gap = &content[value_start..value_start + gap_len];
+                    if gap.is_empty() || !is_safe_gap(gap) {
+                        return None;
+                    }
+                    value_start + gap_len
+                }
+                None => {
+                    if content[value_start..].contains(is_delim) {
+                        return None;
+                    }
+                    content.len()
+                }
+            };
+            pairs.push((key.clone(), clean_value(&content[value_start..value_end])));
+            pos = value_end;
+        }
+
+        Some((pairs, unparsed))
+    }
+}
+
+
+#[derive(Default)]
+struct TemplateStore {
+    // templates bucketed by the number of ':' / '=' delimiters in the content
+    buckets: HashMap<usize, Vec<Arc<Template>>>,
+    known: HashSet<String>,
+    support: HashMap<String, usize>,
+    len: usize,
+}
+
+impl TemplateStore {
+    fn observe(&mut self, template: Template) {
+        let identity = template.identity();
+        if self.known.contains(&identity) {
+            return;
+        }
+
+        let count = {
+            let count = self.support.entry(identity.clone()).or_insert(0);
+            *count += 1;
+            *count
+        };
+        if count < MIN_SUPPORT.load(Ordering::Relaxed) {
+            if self.support.len() > MAX_CANDIDATES {
+                self.support.clear();
+            }
+            return;
+        }
+
+        // promote candidate to template, it is the most recently used one so the eviction
+        // below drops an older template instead of the one just learned
+        template.last_used.store(CLOCK.fetch_add(1, Ordering::Relaxed), Ordering::Relaxed);
+        self.support.remove(&identity);
+        self.known.insert(identity);
+        self.buckets.entry(template.n_delims()).or_default().push(Arc::new(template));
+        self.len += 1;
+        TEMPLATES_LEARNED.fetch_add(1, Ordering::Relaxed);
+
+        while self.len > MAX_TEMPLATES.load(Ordering::Relaxed) {
+            self.evict_coldest();
+        }
+    }
+
+    /// drop the least recently used template
+    fn evict_coldest(&mut self) {
+        let coldest = self
+            .buckets
+            .iter()
+            .flat_map(|(n, bucket)| {
+                bucket
+                    .iter()
+                    .enumerate()
+                    .map(move |(i, t)| (*n, i, t.last_used.load(Ordering::Relaxed)))
+            })
+            .min_by_key(|(_, _, last_used)| *last_used);
+
+        if let Some((n, i, _)) = coldest {
+            if let Some(bucket) = self.buckets.get_mut(&n) {
+                let template = bucket.swap_remove(i);
+                self.known.remove(&template.identity());
+                if bucket.is_empty() {
+                    self.buckets.remove(&n);
+                }
+            }
+            self.len -= 1;
+            TEMPLATES_EVICTED.fetch_add(1, Ordering::Relaxed);
+        } else {
+            self.len = 0;
+        }
+    }
+}
+
+
+fn store() -> &'static RwLock<TemplateStore> {
+    STORE.get_or_init(|| RwLock::new(TemplateStore::default()))
+}
+
+
+/// fast path: try the learned templates of this delimiter count
+pub(crate) fn try_templates(content: &str) -> Option<(Vec<(String, String)>, Vec<String>)> {
+    if !ENABLED.load(Ordering::Relaxed) {
+        return None;
+    }
+
+    let n_delims = content.bytes().filter(|b| *b == b':' || *b == b'=').count();
+    let result = store().read().ok().and_then(|store| {
+        store.buckets.get(&n_delims).and_then(|bucket| {
+            bucket.iter().find_map(|template| {
+                let extracted = template.apply(content)?;
+                template
+                    .last_used
+                    .store(CLOCK.fetch_add(1, Ordering::Relaxed), Ordering::Relaxed);
+                Some(extracted)
+            })
+        })
+    });
+
+    match result {
+        Some(_) => TEMPLATE_HITS.fetch_add(1, Ordering::Relaxed),
+        None => TEMPLATE_MISSES.fetch_add(1, Ordering::Relaxed),
+    };
+    result
+}
+
+
+/// Derive a template candidate from a record that went through the full pest path.
+///
+/// `split_points` are (splitter match start, key start) offsets into `content`. The
+/// candidate is only returned if applying it reproduces the pest output exactly.
+pub(crate) fn derive(
+    content: &str,
+    split_points: &[(usize, usize)],
+    pairs: &[(String, String)],
+    unparsed: &[String],
+) -> Option<Template> {
+    if !ENABLED.load(Ordering::Relaxed) || split_points.is_empty() {
+        return None;
+    }
+
+    let head = key_value_start(content, 0)
+        .filter(|(_, value_start)| *value_start <= split_points[0].0)
+        .map(|(key, value_start)| (content[..value_start].to_string(), key));
+
+    let anchors = split_points
+        .iter()
+        .map(|&(start, key_start)| {
+            let (key, value_start) = key_value_start(content, key_start)?;
+            Some((content[start..value_start].to_string(), key))
+        })
+        .collect::<Option<Vec<_>>>()?;
+
+    let template = Template {
+        head,
+        anchors,
+        last_used: AtomicU64::new(0),
+    };
+
+    // only keep templates that reproduce the full parse exactly
+    let (template_pairs, template_unparsed) = template.apply(content)?;
+    (template_pairs == pairs && template_unparsed == unparsed).then_some(template)
+}
+
+
+/// record template candidates from a finished batch (call once per batch, not per record)
+pub(crate) fn learn(candidates: impl Iterator<Item = Template>) {
+    let mut candidates = candidates.peekable();
+    if candidates.peek().is_none() {
+        return;
+    }
+    let Ok(mut store) = store().write() else {
+        return;
+    };
+    for template in candidates {
+        store.observe(template);
+    }
+}
+
+
+/// Configure the learned template fast path of the key value parser.
+#[pyfunction]
+#[pyo3(signature = (enabled=true, min_support=3, max_templates=256))]
+pub fn configure_templates(enabled: bool, min_support: usize, max_templates: usize) {
+    ENABLED.store(enabled, Ordering::Relaxed);
+    MIN_SUPPORT.store(min_support.max(1), Ordering::Relaxed);
+    MAX_TEMPLATES.store(max_templates, Ordering::Relaxed);
+
+    if let Ok(mut store) = store().write() {
+        while store.len > max_templates {
+            store.evict_coldest();
+        }
+    }
+}
+
+
+/// Drop every learned template and candidate (counters are kept).
+#[pyfunction]
+pub fn clear_templates() {
+    if let Ok(mut store) = store().write() {
+        *store = TemplateStore::default();
+    }
+}
+
+
+/// Counters of the learned template fast path.
+#[pyfunction]
+pub fn template_stats(py: Python<'_>) -> PyResult<Py<PyDict>> {
+    let n_templates = store().read().map(|store| store.len).unwrap_or(0);
+
+    let out = PyDict::new(py);
+    out.set_item("enabled", ENABLED.load(Ordering::Relaxed))?;
+    out.set_item("templates", n_templates)?;
+    out.set_item("hits", TEMPLATE_HITS.load(Ordering::Relaxed))?;
+    out.set_item("misses", TEMPLATE_MISSES.load(Ordering::Relaxed))?;
+    out.set_item("learned", TEMPLATES_LEARNED.load(Ordering::Relaxed))?;
+    out.set_item("evicted", TEMPLATES_EVICTED.load(Ordering::Relaxed))?;
+    Ok(out.unbind())
+}
@@ -6,7 +6,17 @@ import os
 import traceback
 from datetime import datetime
 from io import BytesIO
-from typing import Annotated, Any, Dict, List, Literal, Optional, Tuple, TypedDict
+from typing import (
+    Annotated,
+    Any,
+    Dict,
+    List,
+    Literal,
+    Mapping,
+    Optional,
+    Tuple,
+    TypedDict,
+)
 
 import virt_s3
 from langgraph.checkpoint.memory import MemorySaver
@@ -466,13 +476,16 @@ class ETLBuilderAgent:
 
     async def run(
         self,
-        cluster_dict: Dict[str, List[ClusterRecord]],
+        cluster_dict: Mapping[str, List[ClusterRecord]],
         run_id: Optional[str] = None,
+        replace_clusters: bool = True,
     ) -> Tuple[Dict[str, List[str]], Dict[str, ETLMap]]:
         """_summary_
 
         :param cluster_dict: _description_
         :param run_id: _description_, defaults to None
+        :param replace_clusters: replace the stored cluster sets, defaults to True (False for
+            a subset of signatures assigned to existing clusters)
         :return: _description_
         """
         self.run_id = run_id
@@ -525,6 +538,7 @@ class ETLBuilderAgent:
             await registry.store_etl_lookup(
                 clusters,
                 etl_map,
+                replace_clusters=replace_clusters,
             )
 
         return clusters, etl_map
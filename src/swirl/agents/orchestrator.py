@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import asyncio
 import json
 import operator
 import os
@@ -18,11 +19,16 @@ from swirl.agents.etl_builder_agent import ETLBuilderAgent
 from swirl.clients.async_httpx_client import AsyncHttpxClient
 from swirl.clients.async_llm_client import AsyncLLMClient
 from swirl.clients.pg_duckdb_client import PGConfig, PGDuckDBClient
-from swirl.ingestion.rust_ingestion import smart_parse_batch
+from swirl.ingestion.parse_cache import ParseCache
 from swirl.ingestion.structure_analyzer import StructuralAnalyzer
 from swirl.ml_ai.clustering import ClusterOrchestrator
+from swirl.ml_ai.embedding_cache import EmbeddingCache
 from swirl.ml_ai.embedding_model import EmbeddingModel
-from swirl.persistence.signature_registry import SignatureRegistry
+from swirl.persistence.signature_registry import ETLMap, SignatureRegistry
+from swirl.persistence.signature_vector_index import (
+    SignatureVector,
+    SignatureVectorIndex,
+)
 from swirl.prompts.orchestrator_prompts import REASONING_RESPONSE_PROMPT
 from swirl.prompts.sql_gen_prompts import PGDUCKDB_PROMPT
 from swirl.utils.agent_utils import (
@@ -33,6 +39,12 @@ from swirl.utils.agent_utils import (
 )
 from swirl.utils.log_utils import get_custom_logger
 
+try:
+    from swirl.ingestion.rust_ingestion import extract_json_records
+except ImportError:
+    # maturin extension not built, use the pure python parser
+    from swirl.ingestion.py_ingestion import extract_json_records
+
 logger = get_custom_logger()
 
 
@@ -55,6 +67,11 @@ class DQAgentOrchestrator:
         http_client: Optional[AsyncHttpxClient] = None,
         pg_config: Optional[PGConfig] = None,
         embedding_model: EmbeddingModel | str = "all-MiniLM-L6-v2",
+        parse_cache: Optional[ParseCache] = None,
+        embedding_cache: Optional[EmbeddingCache] = None,
+        cluster_orchestrator: Optional[ClusterOrchestrator] = None,
+        signature_index: Optional[SignatureVectorIndex] = None,
+        nearest_max_distance: float = 0.1,
         max_attempts: int = 5,
         sample_count: int = 10,
     ) -> None:
@@ -66,6 +83,13 @@ class DQAgentOrchestrator:
         :param http_client: _description_, defaults to None
         :param pg_config: _description_, defaults to None
         :param embedding_model: _description_, defaults to "all-MiniLM-L6-v2"
+        :param parse_cache: process wide parse/fingerprint cache, defaults to None (new cache per orchestrator)
+        :param embedding_cache: process wide signature embedding cache, defaults to None (no caching)
+        :param cluster_orchestrator: process wide clusterer that keeps its fitted clusters between runs,
+            defaults to None (new clusterer per orchestrator)
+        :param signature_index: pgvector index of the registered signatures' embeddings, unseen
+            signatures close to a known one join its cluster without reclustering, defaults to None
+        :param nearest_max_distance: max cosine distance of a nearest signature match, defaults to 0.1
         :param max_attempts: _description_, defaults to 5
         :param sample_count: _description_, defaults to 10
         """
@@ -92,9 +116,19 @@ class DQAgentOrchestrator:
             cfg = PGConfig()
 
         self.pg_client = PGDuckDBClient(cfg)
-        self.clusterer = ClusterOrchestrator(embedding_model=embedding_model)
-        self.analyzer = StructuralAnalyzer(ignore_unparsed=False)
+        self.clusterer = cluster_orchestrator or ClusterOrchestrator(
+            embedding_model=embedding_model,
+            embedding_cache=embedding_cache,
+        )
+        # the etl builder never looks at more than `max_sample_size` records per signature
+        self.analyzer = StructuralAnalyzer(
+            ignore_unparsed=False,
+            max_records=self.etl_agent.max_sample_size,
+        )
+        self.parse_cache = parse_cache or ParseCache()
         self.registry = SignatureRegistry(redis=redis)
+        self.signature_index = signature_index
+        self.nearest_max_distance = nearest_max_distance
 
         # build graph
         self.graph = self._build_graph()
@@ -108,6 +142,89 @@ class DQAgentOrchestrator:
         run_id = f"run_{curr_dt_str}"
         return run_id
 
+    async def _resolve_nearest(
+        self,
+        curr_map: Dict[str, Any],
+        new_signs: List[str],
+    ) -> List[str]:
+        """Helper method to register unseen signatures under their nearest known signature's
+        cluster (pgvector ANN lookup), when one is within `nearest_max_distance`
+
+        :param curr_map: output of `StructuralAnalyzer.get_signature_map()`
+        :param new_signs: signature hashes missing from the signature registry
+        :return: signature hashes that are still unknown (need a clustering run)
+        """
+        signatures = [curr_map[sign]["signature"] for sign in new_signs]
+        embeddings = await asyncio.to_thread(
+            self.clusterer.embed_signatures, signatures
+        )
+        neighbors = await asyncio.to_thread(
+            self.signature_index.nearest, embeddings, self.nearest_max_distance
+        )
+
+        unresolved = []
+        matched = []
+        for sign, embedding, neighbor in zip(new_signs, embeddings, neighbors):
+            meta = None
+            if neighbor is not None:
+                meta = await self.registry.lookup_hash_signature(
+                    neighbor.signature_hash
+                )
+            # no close signature, or its ETL metadata expired from the registry
+            if meta is None:
+                unresolved.append(sign)
+                continue
+
+            fields = [f for f in curr_map[sign]["signature"] if f != "_unparsed"]
+            await self.registry.register_signature(
+                sign, meta.model_copy(update={"fields": fields})
+            )
+            matched.append(
+                SignatureVector(
+                    signature_hash=sign,
+                    semantic_cluster_id=meta.semantic_cluster_id,
+                    structure_cluster_id=meta.structure_cluster_id,
+                    fields=fields,
+                    embedding=embedding,
+                )
+            )
+            logger.debug(
+                f"Signature {sign} matched {neighbor.signature_hash} "
+                f"(distance={neighbor.distance:.4f})"
+            )
+
+        await asyncio.to_thread(self.signature_index.upsert, matched)
+        return unresolved
+
+    async def _index_signatures(
+        self,
+        curr_map: Dict[str, Any],
+        export_map: Dict[str, ETLMap],
+    ) -> None:
+        """Helper method to store the embeddings of newly registered signatures in the pgvector index
+
+        :param curr_map: output of `StructuralAnalyzer.get_signature_map()`
+        :param export_map: signature hash -> ETL metadata of the clustering run
+        """
+        signs = [sign for sign in export_map if sign in curr_map]
+        if not signs:
+            return
+        embeddings = await asyncio.to_thread(
+            self.clusterer.embed_signatures,
+            [curr_map[sign]["signature"] for sign in signs],
+        )
+        vectors = [
+            SignatureVector(
+                signature_hash=sign,
+                semantic_cluster_id=export_map[sign]["semantic_cluster_id"],
+                structure_cluster_id=export_map[sign]["structure_cluster_id"],
+                fields=export_map[sign]["fields"],
+                embedding=embedding,
+            )
+            for sign, embedding in zip(signs, embeddings)
+        ]
+        await asyncio.to_thread(self.signature_index.upsert, vectors)
+
     def _build_graph(self) -> StateGraph:
         """_summary_
 
@@ -172,22 +289,24 @@ class DQAgentOrchestrator:
         data_key = state["data_key"]
 
         try:
-            result = set()
+            bodies = []
             for _ in range(self.sample_count):
                 try:
                     res = await self.http_client.request(
                         req_config["url"],
                         method=req_config["method"],
                         request_body=req_config["request_body"],
+                        raw=True,
                     )
-                    for rec_str in res[data_key]:
-                        result.add(rec_str)
+                    bodies.append(res)
 
                 except Exception:
                     pass
 
+            # pull + dedup the data_key records straight from the raw bodies
+            # (bodies without a data_key array are skipped)
             result = {
-                data_key: list(result),
+                data_key: extract_json_records(bodies, data_key, strict=False),
             }
 
             logger.debug(json.dumps(result, indent=4))
@@ -236,46 +355,58 @@ class DQAgentOrchestrator:
                     payload = f"{payload}"
                     data[data_key][i] = payload
 
-            # run smart parse batch
-            data_samples = smart_parse_batch(data[data_key])
+            # run smart parse batch (parsing + fingerprinting in one rust pass)
+            # records seen before are served from the parse cache
+            data_samples = self.parse_cache.parse_fingerprint_batch(
+                data[data_key],
+                ignore_unparsed=self.analyzer.ignore_unparsed,
+            )
+            logger.debug(f"Parse Cache Stats: {self.parse_cache.stats()}")
 
             # run analyzer
             result = []
-            for raw, parsed in data_samples:
+            for raw, parsed, fingerprint in data_samples:
                 logger.debug(f"RAW: {raw}, PARSED: {parsed}")
-                fingerprint = self.analyzer.generate_fingerprint(
-                    raw,
-                    parsed,
-                    store_in_map=True,
-                )
+                self.analyzer.store_fingerprint(raw, parsed, fingerprint)
                 hash_sign = fingerprint["hash"]
                 result.append((raw, parsed, hash_sign))
 
             # determine if hashes live in redis signature registry
             curr_map = self.analyzer.get_signature_map()
             logger.debug(json.dumps(curr_map, indent=4))
-            new_signs_exist = False
+            new_signs = []
             for sign, sign_entry in curr_map.items():
                 res = await self.registry.lookup_hash_signature(sign)
                 if not res:
-                    new_signs_exist = True
+                    new_signs.append(sign)
+
+            # unseen signatures close to a known one join its cluster (ANN lookup)
+            if new_signs and self.signature_index is not None:
+                new_signs = await self._resolve_nearest(curr_map, new_signs)
 
             # continue early
-            if not new_signs_exist:
+            if not new_signs:
                 return {
                     "step_result": result,
                     "error": None,
                     "attempts": 1,
                 }
 
-            # if there are new signatures, run clustering
-            cluster_map = self.clusterer.make_clusters(curr_map)
+            # if there are new signatures, run clustering (only they are assigned between
+            # refits) off the event loop, other jobs keep running while clustering
+            cluster_map = await self.clusterer.amake_clusters(
+                curr_map, signature_hashes=new_signs
+            )
             export_map, cluster_sets = await self.etl_agent.run(
                 cluster_map,
                 run_id=run_id,
+                # assigned signatures join the stored cluster sets
+                replace_clusters=cluster_map.complete,
             )
             logger.debug(f"ETL Lookup Map:\n{json.dumps(export_map, indent=4)}")
             logger.debug(f"Cluster Sets:\n{json.dumps(cluster_sets, indent=4)}")
+            if self.signature_index is not None:
+                await self._index_signatures(curr_map, export_map)
 
             return {
                 "step_result": result,
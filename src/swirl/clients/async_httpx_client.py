@@ -71,12 +71,14 @@ class AsyncHttpxClient:
         url: str,
         method: str = "GET",
         request_body: Optional[Dict[str, Any]] = None,
-    ) -> Dict[str, Any] | str | Any:
+        raw: bool = False,
+    ) -> Dict[str, Any] | str | bytes | Any:
         """Async method to get data from an http api endpoint
 
         :param url: api url
         :param method: HTTP verb method, defaults to "GET"
         :param request_body: dictionary of request body (converted to query params for GET and JSON body for POST), defaults to None
+        :param raw: return the undecoded response body (bytes), defaults to False
         :return: _description_
         """
 
@@ -103,6 +105,9 @@ class AsyncHttpxClient:
 
             response.raise_for_status()
 
+            if raw:
+                return response.content
+
             content_type = response.headers.get("Content-Type", "")
             if "application/json" in content_type:
                 return response.json()
@@ -2,7 +2,7 @@ import os
 import uuid
 from contextlib import contextmanager
 from dataclasses import asdict, dataclass, field
-from typing import Any, Generator, List, Optional, Type, Union
+from typing import Any, Callable, Generator, List, Optional, Type, Union
 
 import psycopg
 from psycopg import sql
@@ -45,12 +45,20 @@ class PGConfig:
 
 
 class PGDuckDBClient:
-    def __init__(self, config: PGConfig, pool: Optional[ConnectionPool] = None) -> None:
+    def __init__(
+        self,
+        config: PGConfig,
+        pool: Optional[ConnectionPool] = None,
+        configure: Optional[Callable[[psycopg.Connection], None]] = None,
+    ) -> None:
         """_summary_
 
         :param config: _description_
+        :param configure: extra setup of every new pooled connection (e.g. type registration),
+            defaults to None (ignored when `pool` is given)
         """
         self.config = config
+        self.configure = configure
         self.pool = pool
         if not self.pool:
             logger.info(f"Initializing Postgres ConnectionPool")
@@ -79,6 +87,9 @@ class PGDuckDBClient:
         finally:
             conn.autocommit = old_autocommit
 
+        if self.configure is not None:
+            self.configure(conn)
+
     def is_healthy(self, timeout: float = 2.0) -> bool:
         """_summary_
 
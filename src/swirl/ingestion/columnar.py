@@ -0,0 +1,139 @@
+import os
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Tuple
+
+import numpy as np
+
+
+@dataclass(slots=True)
+class ColumnarBatch:
+    """Zero-copy view over the flat buffers returned by `smart_parse_batch_columnar`
+
+    Layout (arrow style offsets):
+    * record `i` owns pairs `record_offsets[i]:record_offsets[i + 1]`
+    * pair `j` has key `keys[key_ids[j]]` and value `values[value_offsets[j]:value_offsets[j + 1]]`
+    * record `i` raw string is `raw[raw_offsets[i]:raw_offsets[i + 1]]`
+    """
+
+    keys: List[str]
+    raw: bytes
+    raw_offsets: np.ndarray
+    raw_lengths: np.ndarray
+    record_offsets: np.ndarray
+    key_ids: np.ndarray
+    values: bytes
+    value_offsets: np.ndarray
+
+    @classmethod
+    def from_buffers(cls, buffers: Dict[str, Any]) -> "ColumnarBatch":
+        """Method to wrap the raw buffer dict from rust without copying
+
+        :param buffers: output of `smart_parse_batch_columnar()`
+        :return: ColumnarBatch instance
+        """
+        return cls(
+            keys=buffers["keys"],
+            raw=buffers["raw"],
+            raw_offsets=np.frombuffer(buffers["raw_offsets"], dtype="<i8"),
+            raw_lengths=np.frombuffer(buffers["raw_lengths"], dtype="<i8"),
+            record_offsets=np.frombuffer(buffers["record_offsets"], dtype="<i8"),
+            key_ids=np.frombuffer(buffers["key_ids"], dtype="<u4"),
+            values=buffers["values"],
+            value_offsets=np.frombuffer(buffers["value_offsets"], dtype="<i8"),
+        )
+
+    def __len__(self) -> int:
+        return len(self.record_offsets) - 1
+
+    def get_raw(self, i: int) -> str:
+        """Method to decode the raw string of a single record
+
+        :param i: record index
+        :return: original raw string
+        """
+        start, end = self.raw_offsets[i], self.raw_offsets[i + 1]
+        return self.raw[start:end].decode("utf-8")
+
+    def get_key_ids(self, i: int) -> Tuple[int, ...]:
+        """Method to get the ordered interned key ids of a single record
+
+        :param i: record index
+        :return: tuple of indices into `keys`
+        """
+        start, end = self.record_offsets[i], self.record_offsets[i + 1]
+        return tuple(self.key_ids[start:end].tolist())
+
+    def get_record(self, i: int) -> Dict[str, str]:
+        """Method to materialize a single record as a parsed dict
+
+        :param i: record index
+        :return: dictionary equivalent to the `smart_parse_batch()` output
+        """
+        start, end = self.record_offsets[i], self.record_offsets[i + 1]
+        offsets = self.value_offsets[start : end + 1].tolist()
+        record = {}
+        for j, key_id in enumerate(self.key_ids[start:end].tolist()):
+            record[self.keys[key_id]] = self.values[offsets[j] : offsets[j + 1]].decode(
+                "utf-8"
+            )
+        return record
+
+    def __iter__(self) -> Iterator[Tuple[str, Dict[str, str]]]:
+        for i in range(len(self)):
+            yield self.get_raw(i), self.get_record(i)
+
+    def to_arrow(self) -> Any:
+        """Method to export the batch as a pyarrow table without copying data buffers
+
+        Columns:
+        * raw: large_string
+        * pairs: large_list<struct<key: dictionary<int32, string>, value: large_string>>
+
+        :return: pyarrow.Table
+        """
+        import pyarrow as pa
+
+        n_pairs = len(self.key_ids)
+        keys = pa.DictionaryArray.from_arrays(
+            pa.array(self.key_ids.astype(np.int32)),
+            pa.array(self.keys, type=pa.string()),
+        )
+        values = pa.LargeStringArray.from_buffers(
+            n_pairs,
+            pa.py_buffer(self.value_offsets),
+            pa.py_buffer(self.values),
+        )
+        pairs = pa.LargeListArray.from_arrays(
+            pa.array(self.record_offsets),
+            pa.StructArray.from_arrays([keys, values], names=["key", "value"]),
+        )
+        raw = pa.LargeStringArray.from_buffers(
+            len(self),
+            pa.py_buffer(self.raw_offsets),
+            pa.py_buffer(self.raw),
+        )
+        return pa.table({"raw": raw, "pairs": pairs})
+
+
+def parse_batch_columnar(batch: List[str | dict]) -> ColumnarBatch:
+    """Function to run the rust parser in columnar output mode
+
+    :param batch: list of raw strings or dictionaries
+    :return: ColumnarBatch over the parsed batch
+    """
+    from swirl.ingestion.rust_ingestion import smart_parse_batch_columnar
+
+    return ColumnarBatch.from_buffers(smart_parse_batch_columnar(batch))
+
+
+def parse_bytes_columnar(
+    source: bytes | memoryview | str | os.PathLike,
+) -> ColumnarBatch:
+    """Function to run the rust parser in columnar output mode over newline delimited records
+
+    :param source: bytes, bytes-like buffer or path of a file (memory mapped) with one record per line
+    :return: ColumnarBatch over the parsed records
+    """
+    from swirl.ingestion.rust_ingestion import smart_parse_bytes
+
+    return ColumnarBatch.from_buffers(smart_parse_bytes(source, output="columnar"))
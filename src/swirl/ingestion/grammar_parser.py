@@ -4,6 +4,8 @@ from typing import Any, Dict, Optional, Tuple
 
 from lark import Lark, Transformer, v_args
 
+from swirl.ingestion.type_inference import infer_json_value, infer_value
+
 DEFAULT_GRAMMAR = r"""
     pair: KEY DELIMITER [VALUE]
     KEY: /[a-zA-Z_]\w*/
@@ -13,6 +15,13 @@ DEFAULT_GRAMMAR = r"""
     %ignore WS
 """
 
+# precompiled equivalent of DEFAULT_GRAMMAR's `pair` rule (KEY DELIMITER [VALUE])
+# whitespace only delimiters make a pair here as with the Earley parser (unlike the pest
+# grammar of the rust parser), see tests/unit/test_grammar_parser_regex.py
+DEFAULT_PAIR_PATTERN = re.compile(r"([a-zA-Z_]\w*)(?:\s*[:=]\s*|\s+)(.*)")
+# VALUE lookahead, a value can't run over the start of another pair
+VALUE_STOP_PATTERN = re.compile(r"(?:,\s*|\s+)[a-zA-Z_]\w*\s*[:=]")
+
 
 class KeyValueTransformer(Transformer):
     @v_args(inline=True)
@@ -32,19 +41,48 @@ class KeyValueTransformer(Transformer):
 
 
 class GrammarParser:
-    def __init__(self, grammar_override: Optional[str] = None) -> None:
+    def __init__(
+        self,
+        grammar_override: Optional[str] = None,
+        infer_types: bool = False,
+    ) -> None:
         """Init method for GrammarParser
 
         :param grammar_override: pass in your own grammar rules string, defaults to None
+        :param infer_types: return typed values (see `type_inference.infer_value()`) instead of strings, defaults to False
         """
+        self.infer_types = infer_types
         self.pair_grammar = grammar_override or DEFAULT_GRAMMAR
-        self.pair_parser = Lark(self.pair_grammar, start="pair", parser="earley")
         self.transformer = KeyValueTransformer()
 
+        # the default grammar runs as a precompiled regex, Earley is only needed for overrides
+        self.pair_parser = None
+        if grammar_override is not None:
+            self.pair_parser = Lark(self.pair_grammar, start="pair", parser="earley")
+
         # pre-compile regex
         self.header_fix = re.compile(r"([a-zA-Z]+)\s+(\d+):\s*")
         self.splitter = re.compile(r"(?:,\s*|\s+)(?=[a-zA-Z_]\w*\s*[:=])")
 
+    def _parse_pair(self, seg: str) -> Tuple[str, Any]:
+        """Helper function to parse a single segment into a key-value tuple
+
+        :param seg: stripped string segment
+        :raises ValueError: if the segment doesn't match the pair grammar
+        :return: tuple containing the string key and its cleaned value or "None"
+        """
+        if self.pair_parser is not None:
+            tree = self.pair_parser.parse(seg)
+            return self.transformer.transform(tree)
+
+        match = DEFAULT_PAIR_PATTERN.fullmatch(seg)
+        if match is None:
+            raise ValueError(f"segment is not a key value pair: {seg}")
+        key, value = match.groups()
+        if value and VALUE_STOP_PATTERN.search(value, 1):
+            raise ValueError(f"segment is not a key value pair: {seg}")
+        return self.transformer.pair(key, None, value)
+
     def _try_parse_json(self, trimmed: str) -> Optional[Dict[str, Any]]:
         """Helper function to parse stringified JSON objects/arrays
 
@@ -60,6 +98,10 @@ class GrammarParser:
         try:
             data = json.loads(trimmed)
             if isinstance(data, dict):
+                if self.infer_types:
+                    return {
+                        str(k).lower(): infer_json_value(v) for k, v in data.items()
+                    }
                 # normalize keys to lowercase and values to strings to match Lark output
                 return {str(k).lower(): str(v) for k, v in data.items()}
             elif isinstance(data, list):
@@ -107,9 +149,8 @@ class GrammarParser:
 
             try:
                 # k,v pairs
-                tree = self.pair_parser.parse(seg)
-                k, v = self.transformer.transform(tree)
-                extracted[k] = v
+                k, v = self._parse_pair(seg)
+                extracted[k] = infer_value(v) if self.infer_types else v
             except Exception:
                 # unparsed segments
                 unparsed_segments.append(seg)
@@ -0,0 +1,153 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, NamedTuple, Tuple, TypedDict
+
+from swirl.ingestion.structure_analyzer import Fingerprint
+
+try:
+    from swirl.ingestion.rust_ingestion import hash_batch, smart_parse_fingerprint_batch
+except ImportError:
+    # maturin extension not built, use the pure python parser
+    from swirl.ingestion.py_ingestion import hash_batch, smart_parse_fingerprint_batch
+
+
+class CacheEntry(NamedTuple):
+    raw: str
+    parsed: Dict[str, Any]
+    fingerprint: Fingerprint
+
+
+def _copy_fingerprint(fingerprint: Fingerprint) -> Fingerprint:
+    """copy of a fingerprint and its typed signature (all the fingerprint values are flat)"""
+    return {**fingerprint, "signature": dict(fingerprint["signature"])}
+
+
+class CacheStats(TypedDict):
+    hits: int
+    misses: int
+    evictions: int
+    size: int
+    max_size: int
+    hit_rate: float
+
+
+class ParseCache:
+    """Bounded LRU cache of parse + fingerprint results keyed by a fast hash of the raw record
+
+    Meant to live for the whole worker process (see `worker/saq_worker.py`) so records that
+    are re-sent across polls and jobs skip both the rust parser and the structural analyzer.
+
+    Cache Structure:
+    ```python
+    {
+        (<xxh3 hash of raw>, <ignore_unparsed>, <infer_types>): <CacheEntry>
+    }
+    ```
+    """
+
+    def __init__(self, max_size: int = 100_000) -> None:
+        """Init Method
+
+        :param max_size: max number of cached records before LRU eviction, defaults to 100_000
+        """
+        self.max_size = max_size
+        self._entries: OrderedDict[Tuple[int, bool, bool], CacheEntry] = OrderedDict()
+        self._lock = threading.Lock()
+
+        # counters
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def parse_fingerprint_batch(
+        self,
+        batch: List[str | dict],
+        ignore_unparsed: bool = False,
+        infer_types: bool = False,
+    ) -> List[Tuple[str, Dict[str, Any], Fingerprint]]:
+        """Cached drop-in for `rust_ingestion.smart_parse_fingerprint_batch()`
+
+        Only strings are cached, dict inputs always go through the parser.
+
+        :param batch: list of raw strings or dictionaries
+        :param ignore_unparsed: boolean flag to ignore the "_unparsed" field in fingerprints, defaults to False
+        :param infer_types: boolean flag to return typed values and signatures, defaults to False
+        :return: list of (raw, parsed, fingerprint) tuples in input order
+        """
+        str_idx = [i for i, rec in enumerate(batch) if isinstance(rec, str)]
+        hashes = hash_batch([batch[i] for i in str_idx])
+        keys = dict(zip(str_idx, hashes))
+
+        results = [None] * len(batch)
+        miss_idx = []
+        with self._lock:
+            for i, rec in enumerate(batch):
+                entry = None
+                if i in keys:
+                    key = (keys[i], ignore_unparsed, infer_types)
+                    entry = self._entries.get(key)
+                    # guard against hash collisions
+                    if entry is not None and entry.raw != rec:
+                        entry = None
+
+                if entry is None:
+                    miss_idx.append(i)
+                    continue
+
+                self._entries.move_to_end(key)
+                self.hits += 1
+                # copies so callers (and `StructuralAnalyzer.store_fingerprint()`) can't mutate the
+                # cached parsed dict, fingerprint or signature, nested parsed values are shared
+                results[i] = (
+                    entry.raw,
+                    dict(entry.parsed),
+                    _copy_fingerprint(entry.fingerprint),
+                )
+
+            self.misses += len(miss_idx)
+
+        if not miss_idx:
+            return results
+
+        parsed_misses = smart_parse_fingerprint_batch(
+            [batch[i] for i in miss_idx],
+            ignore_unparsed=ignore_unparsed,
+            infer_types=infer_types,
+        )
+
+        with self._lock:
+            for i, (raw, parsed, fingerprint) in zip(miss_idx, parsed_misses):
+                if i in keys:
+                    key = (keys[i], ignore_unparsed, infer_types)
+                    self._entries[key] = CacheEntry(
+                        raw, dict(parsed), _copy_fingerprint(fingerprint)
+                    )
+                    self._entries.move_to_end(key)
+                results[i] = (raw, parsed, fingerprint)
+
+            # LRU eviction
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+        return results
+
+    def stats(self) -> CacheStats:
+        """Getter method for cache counters
+
+        :return: hit/miss/eviction counters plus current size
+        """
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+    def clear(self) -> None:
+        """Method to drop all cached entries (counters are kept)"""
+        with self._lock:
+            self._entries.clear()
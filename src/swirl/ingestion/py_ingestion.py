@@ -0,0 +1,280 @@
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from swirl.ingestion.structure_analyzer import Fingerprint, StructuralAnalyzer
+from swirl.ingestion.type_inference import infer_json_value, infer_value
+
+# same patterns as the rust parser
+HEADER_FIX = re.compile(r"(?P<name>[a-zA-Z]+)\s+(?P<id>\d+):\s*")
+SPLIT_PATTERN = re.compile(r"(?:,\s*|\s+)[a-zA-Z_]\w*\s*[:=]")
+KEY_START = re.compile(r"\w")
+# pest `pair_segment` (key ~ delimiter ~ value?) with implicit " "/"\t" skipping
+PAIR_SEGMENT = re.compile(
+    r"([a-zA-Z_][a-zA-Z0-9_]*)[ \t]*[:=][ \t]*(.*)", re.ASCII | re.DOTALL
+)
+
+# below this many records the process pool start up costs more than it saves
+MIN_RECORDS_PER_WORKER = 5_000
+
+
+def _reject_constant(name: str) -> Any:
+    # serde_json doesn't accept NaN / Infinity
+    raise ValueError(f"invalid JSON constant: {name}")
+
+
+def _to_json(value: Any) -> str:
+    """compact JSON serialization (serde_json `to_string()` equivalent)"""
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+def _try_parse_json(trimmed: str, infer_types: bool) -> Optional[Dict[str, Any]]:
+    """Helper function to handle the JSON fast path
+
+    :param trimmed: stripped raw string
+    :param infer_types: return typed values instead of strings
+    :return: parsed dictionary or None if the string isn't a JSON object/array
+    """
+    if not (
+        (trimmed.startswith("{") and trimmed.endswith("}"))
+        or (trimmed.startswith("[") and trimmed.endswith("]"))
+    ):
+        return None
+
+    try:
+        data = json.loads(trimmed, parse_constant=_reject_constant)
+    except ValueError:
+        return None
+
+    if isinstance(data, dict):
+        if infer_types:
+            return {str(k).lower(): infer_json_value(v) for k, v in data.items()}
+        return {
+            str(k).lower(): v if isinstance(v, str) else _to_json(v)
+            for k, v in data.items()
+        }
+    # treat the whole array as a single entry to keep KV structure
+    return {"json_data": trimmed}
+
+
+def _parse_segment(seg: str) -> Optional[Tuple[str, str]]:
+    """Helper function to parse a single trimmed segment into a (key, value) pair
+
+    :param seg: trimmed segment string
+    :return: lowercase key and cleaned value ("None" if empty), or None if no pair matched
+    """
+    match = PAIR_SEGMENT.fullmatch(seg)
+    if match is None:
+        return None
+
+    key, value = match.groups()
+    value = value.strip()
+    value = value.removesuffix(",").strip()
+    return key.lower(), value or "None"
+
+
+def parse_record(raw_str: str, infer_types: bool = False) -> Dict[str, Any]:
+    """Function to parse a single raw string, same output as the rust parser
+
+    :param raw_str: raw string to be processed
+    :param infer_types: return typed values (see `type_inference.infer_value()`), defaults to False
+    :return: dictionary of extracted key-value pairs, plus an '_unparsed' field
+        for any data that didn't match the key, value pair schema
+    """
+    # json
+    json_result = _try_parse_json(raw_str.strip(), infer_types)
+    if json_result is not None:
+        return json_result
+
+    # key value pair string
+    extracted = {}
+    unparsed_segments = []
+
+    content = HEADER_FIX.sub(r"\g<name>-\g<id>, ", raw_str)
+
+    # split segments at the start of every `<key><delim>`
+    segments = []
+    last = 0
+    for match in SPLIT_PATTERN.finditer(content):
+        segments.append(content[last : match.start()])
+        last = match.start() + KEY_START.search(match.group()).start()
+    segments.append(content[last:])
+
+    for seg in segments:
+        seg = seg.strip()
+        if not seg:
+            continue
+
+        pair = _parse_segment(seg)
+        if pair is None:
+            unparsed_segments.append(seg)
+            continue
+
+        k, v = pair
+        extracted[k] = infer_value(v) if infer_types else v
+
+    if unparsed_segments:
+        extracted["_unparsed"] = " ".join(unparsed_segments)
+
+    return extracted
+
+
+def _parse_chunk(
+    chunk: List[str | dict],
+    infer_types: bool,
+) -> List[Tuple[str, Dict[str, Any]]]:
+    results = []
+    for rec in chunk:
+        if isinstance(rec, dict):
+            results.append((_to_json(rec), rec))
+        else:
+            raw = rec if isinstance(rec, str) else str(rec)
+            results.append((raw, parse_record(raw, infer_types)))
+    return results
+
+
+def smart_parse_batch(
+    batch: List[str | dict],
+    infer_types: bool = False,
+    lazy: bool = False,
+    n_workers: Optional[int] = None,
+    chunk_size: int = 10_000,
+) -> List[Tuple[str, Dict[str, Any]]]:
+    """Pure python drop-in for `rust_ingestion.smart_parse_batch()`
+
+    Mirrors the rust parser (`src/rust/lib.rs`) with precompiled regular expressions
+    instead of a grammar engine, for environments without the maturin extension.
+
+    :param batch: list of raw strings or dictionaries
+    :param infer_types: return typed values instead of strings, defaults to False
+    :param lazy: accepted for signature compatibility, records are always plain dicts, defaults to False
+    :param n_workers: number of worker processes (1 = in process), defaults to None (cpu count,
+        only used for batches of at least `MIN_RECORDS_PER_WORKER` records per worker)
+    :param chunk_size: number of records sent to a worker process at a time, defaults to 10_000
+    :return: list of tuples (original string, parsed dict)
+    """
+    if n_workers is None:
+        n_workers = min(os.cpu_count() or 1, len(batch) // MIN_RECORDS_PER_WORKER)
+    if n_workers <= 1:
+        return _parse_chunk(batch, infer_types)
+
+    chunks = [batch[i : i + chunk_size] for i in range(0, len(batch), chunk_size)]
+    with ProcessPoolExecutor(max_workers=n_workers) as executor:
+        parsed_chunks = executor.map(_parse_chunk, chunks, [infer_types] * len(chunks))
+        results = [pair for parsed_chunk in parsed_chunks for pair in parsed_chunk]
+
+    # dict inputs are returned as the same objects, like the rust parser
+    for i, rec in enumerate(batch):
+        if isinstance(rec, dict):
+            results[i] = (results[i][0], rec)
+    return results
+
+
+def smart_parse_fingerprint_batch(
+    batch: List[str | dict],
+    ignore_unparsed: bool = False,
+    infer_types: bool = False,
+) -> List[Tuple[str, Dict[str, Any], Fingerprint]]:
+    """Drop-in for `rust_ingestion.smart_parse_fingerprint_batch()`
+
+    :param batch: list of raw strings or dictionaries
+    :param ignore_unparsed: boolean flag to ignore the "_unparsed" field in fingerprints, defaults to False
+    :param infer_types: return typed values and signatures, defaults to False
+    :return: list of (raw, parsed, fingerprint) tuples
+    """
+    analyzer = StructuralAnalyzer(ignore_unparsed=ignore_unparsed)
+    return [
+        (raw, parsed, analyzer.generate_fingerprint(raw, parsed, store_in_map=False))
+        for raw, parsed in smart_parse_batch(batch, infer_types=infer_types)
+    ]
+
+
+def hash_batch(batch: List[str]) -> List[int]:
+    """Drop-in for `rust_ingestion.hash_batch()`
+
+    Uses the builtin (per process salted) string hash, which is enough for in-memory caches.
+
+    :param batch: list of raw strings
+    :return: list of unsigned 64 bit hashes
+    """
+    return [hash(rec) & 0xFFFF_FFFF_FFFF_FFFF for rec in batch]
+
+
+def _find_array(body: bytes, pointer: str) -> List[Any]:
+    """Helper function to resolve a JSON pointer (or plain top level key) to an array
+
+    :param body: raw JSON response body
+    :param pointer: JSON pointer (e.g. "/data/items") or plain top level key
+    :raises ValueError: if the body isn't JSON or the pointer doesn't resolve to an array
+    :return: the array at `pointer`
+    """
+    if pointer.startswith("/"):
+        tokens = [
+            t.replace("~1", "/").replace("~0", "~") for t in pointer[1:].split("/")
+        ]
+    else:
+        tokens = [pointer] if pointer else []
+
+    current = json.loads(body)
+    for token in tokens:
+        if isinstance(current, dict) and token in current:
+            current = current[token]
+        elif (
+            isinstance(current, list) and token.isdigit() and int(token) < len(current)
+        ):
+            current = current[int(token)]
+        else:
+            raise ValueError(f"'{token}' not found in JSON body")
+
+    if not isinstance(current, list):
+        raise ValueError("JSON pointer does not resolve to an array")
+    return current
+
+
+def extract_json_records(
+    bodies: List[bytes],
+    pointer: str,
+    strict: bool = True,
+) -> List[str]:
+    """Drop-in for `rust_ingestion.extract_json_records()`
+
+    :param bodies: raw JSON response bodies
+    :param pointer: JSON pointer (e.g. "/data/items") or plain top level key
+    :param strict: raise on bodies without an array at `pointer` instead of skipping them, defaults to True
+    :return: deduplicated record strings (non string elements as compact JSON)
+    """
+    records = {}
+    for body in bodies:
+        try:
+            elements = _find_array(body, pointer)
+        except ValueError:
+            if strict:
+                raise
+            continue
+
+        for element in elements:
+            rec = element if isinstance(element, str) else _to_json(element)
+            records.setdefault(rec, None)
+    return list(records)
+
+
+def smart_parse_json_bodies(
+    bodies: List[bytes],
+    pointer: str,
+    infer_types: bool = False,
+    strict: bool = True,
+) -> List[Tuple[str, Dict[str, Any]]]:
+    """Drop-in for `rust_ingestion.smart_parse_json_bodies()`
+
+    :param bodies: raw JSON response bodies
+    :param pointer: JSON pointer (e.g. "/data/items") or plain top level key
+    :param infer_types: return typed values instead of strings, defaults to False
+    :param strict: raise on bodies without an array at `pointer` instead of skipping them, defaults to True
+    :return: list of tuples (original string, parsed dict)
+    """
+    return smart_parse_batch(
+        extract_json_records(bodies, pointer, strict=strict),
+        infer_types=infer_types,
+    )
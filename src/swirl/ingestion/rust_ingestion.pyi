@@ -1,8 +1,191 @@
-from typing import Any, Dict, List, Tuple
+import os
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Literal,
+    Mapping,
+    Optional,
+    Tuple,
+)
 
-def smart_parse_batch(batch: List[str | dict]) -> List[Tuple[str, Dict[str, Any]]]:
+def smart_parse_batch(
+    batch: List[str | dict],
+    infer_types: bool = False,
+    lazy: bool = False,
+) -> List[Tuple[str, Dict[str, Any] | LazyRecord]]:
     """
     Function to parse a list of strings or dictionaries into a list of tuples (original string, grammar parsed dict).
+    * `infer_types` returns typed values (int, float, bool, None, Decimal, date, datetime, list, dict)
+      instead of strings, see `swirl.ingestion.type_inference`.
+    * `lazy` returns read-only `LazyRecord` mappings instead of dicts, python keys/values are only
+      created on access (dict inputs are still returned as the same dict objects).
     * Utilizes parallel Rust execution (Rayon).
     """
     ...
+
+def smart_parse_batch_columnar(batch: List[str | dict]) -> Dict[str, Any]:
+    """
+    Columnar output mode of `smart_parse_batch`, wrap with `swirl.ingestion.columnar.ColumnarBatch`.
+    * One interned key table plus little endian offset / key id / value buffers (`bytes`) per batch.
+    * Dict inputs are parsed as their JSON serialization.
+    * Utilizes parallel Rust execution (Rayon).
+    """
+    ...
+
+def smart_parse_bytes(
+    source: bytes | bytearray | memoryview | str | os.PathLike,
+    output: Literal["tuples", "columnar"] = "tuples",
+    infer_types: bool = False,
+) -> List[Tuple[str, Dict[str, Any]]] | Dict[str, Any]:
+    """
+    Function to parse newline delimited records from bytes, a buffer or a file path (memory mapped).
+    * Records are split and parsed from borrowed slices (no python `str` per input record),
+      writable buffers (e.g. `bytearray`) are copied first.
+    * Blank lines are skipped, a trailing carriage return is dropped.
+    * `output="tuples"` matches `smart_parse_batch`, `output="columnar"` matches `smart_parse_batch_columnar`.
+    * Utilizes parallel Rust execution (Rayon).
+    """
+    ...
+
+def smart_parse_fingerprint_batch(
+    batch: List[str | dict],
+    ignore_unparsed: bool = False,
+    infer_types: bool = False,
+) -> List[Tuple[str, Dict[str, Any], Dict[str, Any]]]:
+    """
+    Function to parse and fingerprint a list of strings or dictionaries in one pass.
+    * Returns tuples of (original string, grammar parsed dict, fingerprint).
+    * `fingerprint` matches `StructuralAnalyzer.generate_fingerprint(raw, parsed, store_in_map=False)`.
+    * `infer_types` returns typed values and typed signatures (see `smart_parse_batch`).
+    * Utilizes parallel Rust execution (Rayon).
+    """
+    ...
+
+def fingerprint_batch(
+    pairs: List[Tuple[str, Dict[str, Any]]],
+    ignore_unparsed: bool = False,
+) -> List[Dict[str, Any]]:
+    """
+    Function to fingerprint already parsed (original string, parsed dict) pairs.
+    * Output matches `StructuralAnalyzer.generate_fingerprint(raw, parsed, store_in_map=False)`,
+      values are typed with their python type names (`int` beyond i64, `tuple`, `datetime`...).
+    * Utilizes parallel Rust execution (Rayon).
+    """
+    ...
+
+def hash_batch(batch: List[str]) -> List[int]:
+    """
+    Function to compute a fast content hash (xxh3, 64 bit) of every raw string.
+    * Utilizes parallel Rust execution (Rayon).
+    """
+    ...
+
+def extract_json_records(
+    bodies: List[bytes],
+    pointer: str,
+    strict: bool = True,
+) -> List[str]:
+    """
+    Function to extract the records of the array at `pointer` from raw JSON response bodies.
+    * `pointer` is a JSON pointer (e.g. "/data/items") or a plain top level key (e.g. "data").
+    * String elements are returned as is, other elements as compact JSON.
+    * Records are deduplicated across all bodies by content, first occurrence wins.
+    * `strict=False` skips bodies that aren't JSON or have no array at `pointer` instead of raising `ValueError`.
+    * Utilizes parallel Rust execution (Rayon).
+    """
+    ...
+
+def smart_parse_json_bodies(
+    bodies: List[bytes],
+    pointer: str,
+    infer_types: bool = False,
+    strict: bool = True,
+) -> List[Tuple[str, Dict[str, Any]]]:
+    """
+    Function to extract, deduplicate and parse the records of raw JSON response bodies in one pass.
+    * Same records as `extract_json_records`, same output as `smart_parse_batch`.
+    * Utilizes parallel Rust execution (Rayon).
+    """
+    ...
+
+def configure_templates(
+    enabled: bool = True,
+    min_support: int = 3,
+    max_templates: int = 256,
+) -> None:
+    """
+    Function to configure the learned template fast path of the key value parser.
+    * Layouts seen `min_support` times are reused as literal extraction templates.
+    * At most `max_templates` templates are kept (least used ones are evicted).
+    """
+    ...
+
+def template_stats() -> Dict[str, Any]:
+    """
+    Function to get the template fast path counters
+    (enabled, templates, hits, misses, learned, evicted).
+    """
+    ...
+
+def clear_templates() -> None:
+    """
+    Function to drop every learned template and candidate layout.
+    """
+    ...
+
+def configure_parallelism(
+    num_threads: Optional[int] = None,
+    sequential_cutoff: int = 64,
+) -> None:
+    """
+    Function to configure the threads used by every batch function of this process.
+    * `num_threads` builds a dedicated rayon pool for the process, None uses rayon's global pool
+      (sized by `RAYON_NUM_THREADS` or the core count).
+    * Batches with fewer than `sequential_cutoff` records are processed on the calling thread.
+    """
+    ...
+
+def parallelism_stats() -> Dict[str, Any]:
+    """
+    Function to get the pool settings and path counters
+    (dedicated_pool, num_threads, sequential_cutoff, parallel_batches, parallel_records,
+    sequential_batches, sequential_records).
+    """
+    ...
+
+class LazyRecord(Mapping[str, Any]):
+    """
+    Read-only mapping over a parsed record, returned by `smart_parse_batch(lazy=True)`.
+    * Parsed pairs stay in rust memory, python objects are created on every access.
+    * Compares equal to the dict `smart_parse_batch(lazy=False)` would return.
+    """
+
+    def __getitem__(self, key: str) -> Any: ...
+    def __len__(self) -> int: ...
+    def __iter__(self) -> Iterator[str]: ...
+    def to_dict(self) -> Dict[str, Any]:
+        """Materialize the record as a regular dict."""
+        ...
+
+class SmartParser:
+    """
+    Streaming variant of `smart_parse_batch` for unbounded record feeds.
+    * Records are read from the fed iterables in chunks of `chunk_size`.
+    * Each chunk is parsed in parallel (Rayon) while the next one is being read.
+    * Iterating yields lists of (original string, grammar parsed dict) tuples.
+    """
+
+    def __init__(
+        self,
+        records: Optional[Iterable[str | dict]] = None,
+        chunk_size: int = 10_000,
+        infer_types: bool = False,
+    ) -> None: ...
+    def feed(self, records: Iterable[str | dict]) -> None:
+        """Queue an iterable of records to be parsed."""
+        ...
+    def __iter__(self) -> Iterator[List[Tuple[str, Dict[str, Any]]]]: ...
+    def __next__(self) -> List[Tuple[str, Dict[str, Any]]]: ...
@@ -1,5 +1,11 @@
 import hashlib
-from typing import Any, Dict, List, TypedDict
+import random
+import re
+from collections import Counter, OrderedDict
+from typing import TYPE_CHECKING, Any, Dict, List, Literal, Optional, Tuple, TypedDict
+
+if TYPE_CHECKING:
+    from swirl.ingestion.columnar import ColumnarBatch
 
 
 class Fingerprint(TypedDict):
@@ -17,6 +23,14 @@ class RawParsedPair(TypedDict):
 class SignatureEntry(TypedDict):
     signature: Dict[str, Any]
     records: List[RawParsedPair]
+    count: int
+
+
+SamplingStrategy = Literal["uniform", "diverse"]
+
+# value "shape" used by diversity aware sampling, e.g. "$742.10" -> "$9.9"
+DIGIT_RUN = re.compile(r"\d+")
+ALPHA_RUN = re.compile(r"[^\W\d_]+")
 
 
 class StructuralAnalyzer:
@@ -28,15 +42,56 @@ class StructuralAnalyzer:
         <hash>: <SignatureEntry>
     }
     ```
+
+    With `max_records` set, every signature keeps a reservoir of at most `max_records`
+    sample records, while `count` stays the exact number of records seen.
+
+    Blueprints and structure hashes are interned per (path, type) layout in a bounded
+    LRU table, so repeat shapes skip the sort, join and md5 in `build_blueprint()`. Flat
+    records are also interned per (key, value type) layout, so repeat records skip
+    `flatten_and_type()` as well and share one typed map.
     """
 
-    def __init__(self, ignore_unparsed: bool = False):
+    def __init__(
+        self,
+        ignore_unparsed: bool = False,
+        max_records: Optional[int] = None,
+        sampling: SamplingStrategy = "uniform",
+        seed: Optional[int] = None,
+        max_interned: int = 10_000,
+    ):
         """Init Method
 
         :param ignore_unparsed: boolean flag to ignore the "_unparsed" field or not, defaults to False
+        :param max_records: max number of sample records kept per signature, defaults to None (keep all)
+        :param sampling: reservoir strategy, "uniform" (every record equally likely) or
+            "diverse" (prefer records whose value shapes aren't in the reservoir yet), defaults to "uniform"
+        :param seed: random seed for the reservoir, defaults to None
+        :param max_interned: max number of interned blueprints before LRU eviction (0 disables interning), defaults to 10_000
         """
+        if max_records is not None and max_records < 1:
+            raise ValueError(f"max_records must be at least 1, got {max_records}")
+        if sampling not in ("uniform", "diverse"):
+            raise ValueError(f"unknown sampling strategy: {sampling}")
+
         self.signature_map: Dict[str, SignatureEntry] = {}
         self.ignore_unparsed = ignore_unparsed
+        self.max_records = max_records
+        self.sampling = sampling
+        self.rng = random.Random(seed)
+
+        # value shapes of the reservoir records (diverse sampling only), same order as `records`
+        self.record_shapes: Dict[str, List[Tuple[str, ...]]] = {}
+
+        # (path, type) pairs in insertion order -> (blueprint string, structure hash)
+        self.max_interned = max_interned
+        self.blueprint_table: OrderedDict[
+            Tuple[Tuple[str, Any], ...], Tuple[str, str]
+        ] = OrderedDict()
+        # flat record (key, value type) layout -> (typed map, blueprint string, structure hash)
+        self.layout_table: OrderedDict[
+            Tuple[Tuple[Any, ...], ...], Tuple[Dict[str, Any], str, str]
+        ] = OrderedDict()
 
     def _get_type(self, value: Any) -> str:
         """Method to get value type from key:value in dictionary
@@ -121,6 +176,165 @@ class StructuralAnalyzer:
         # 2 decimal palces
         return round(min(structured_len / total_len, 1.0), 2)
 
+    def build_blueprint(self, typed_map: Dict[str, Any]) -> Tuple[str, str]:
+        """Method to build the sorted blueprint string and structure hash of a typed map
+
+        :param typed_map: output of `flatten_and_type()`
+        :return: tuple of (blueprint string, md5 hex digest of the blueprint)
+        """
+        layout = tuple(typed_map.items())
+        interned = self.blueprint_table.get(layout)
+        if interned is not None:
+            self.blueprint_table.move_to_end(layout)
+            return interned
+
+        sorted_keys = sorted(typed_map.keys())
+        blueprint_str = "|".join([f"{k}:{typed_map[k]}" for k in sorted_keys])
+        struct_hash = hashlib.md5(blueprint_str.encode()).hexdigest()
+
+        if self.max_interned > 0:
+            self.blueprint_table[layout] = (blueprint_str, struct_hash)
+            if len(self.blueprint_table) > self.max_interned:
+                self.blueprint_table.popitem(last=False)
+
+        return blueprint_str, struct_hash
+
+    def _record_layout(
+        self, parsed_dict: Dict[str, Any]
+    ) -> Optional[Tuple[Tuple[Any, ...], ...]]:
+        """Method to get the (key, value type) layout of a flat record, the key of `layout_table`
+
+        :param parsed_dict: parsed dictionary of the record
+        :return: layout tuple, None for nested records (maps / lists of maps)
+        """
+        layout = []
+        for k, v in parsed_dict.items():
+            if isinstance(v, dict):
+                return None
+            if isinstance(v, list):
+                if v and isinstance(v[0], dict):
+                    return None
+                layout.append((k, list, type(v[0]) if v else None))
+            else:
+                layout.append((k, type(v)))
+        return tuple(layout)
+
+    def type_and_blueprint(
+        self, parsed_dict: Dict[str, Any]
+    ) -> Tuple[Dict[str, Any], str, str]:
+        """Method to get the typed map, blueprint string and structure hash of a record,
+        interned per flat record layout
+
+        :param parsed_dict: parsed dictionary of the record
+        :return: tuple of (output of `flatten_and_type()`, blueprint string, structure hash)
+        """
+        layout = self._record_layout(parsed_dict) if self.max_interned > 0 else None
+        if layout is not None:
+            interned = self.layout_table.get(layout)
+            if interned is not None:
+                self.layout_table.move_to_end(layout)
+                # copy, the typed map ends up as the (mutable) fingerprint signature
+                typed_map, blueprint_str, struct_hash = interned
+                return dict(typed_map), blueprint_str, struct_hash
+
+        typed_map = self.flatten_and_type(parsed_dict)
+        blueprint_str, struct_hash = self.build_blueprint(typed_map)
+
+        if layout is not None:
+            self.layout_table[layout] = (dict(typed_map), blueprint_str, struct_hash)
+            if len(self.layout_table) > self.max_interned:
+                self.layout_table.popitem(last=False)
+
+        return typed_map, blueprint_str, struct_hash
+
+    def _value_shape(self, parsed_dict: Dict[str, Any]) -> Tuple[str, ...]:
+        """Method to reduce a parsed record to the shape of its values (digit/letter runs collapsed)
+
+        :param parsed_dict: parsed dictionary of the record
+        :return: tuple of value shapes, in sorted key order
+        """
+        shapes = []
+        for k in sorted(parsed_dict.keys()):
+            v = ALPHA_RUN.sub("a", DIGIT_RUN.sub("9", str(parsed_dict[k])))
+            shapes.append(v)
+        return tuple(shapes)
+
+    def _reservoir_slot(
+        self,
+        struct_hash: str,
+        count: int,
+        shape: Optional[Tuple[str, ...]],
+    ) -> Optional[int]:
+        """Method to pick the reservoir slot a new record replaces, once the reservoir is full
+
+        :param struct_hash: structure hash of the record
+        :param count: number of records seen for the signature, including the new one
+        :param shape: value shape of the new record (diverse sampling only)
+        :return: index of the record to replace, or None to drop the new record
+        """
+        if shape is not None:
+            shapes = self.record_shapes[struct_hash]
+            shape_counts = Counter(shapes)
+            if shape not in shape_counts:
+                # evict a record of the most over-represented shape
+                common_shape, common_count = shape_counts.most_common(1)[0]
+                if common_count > 1:
+                    candidates = [i for i, s in enumerate(shapes) if s == common_shape]
+                    return self.rng.choice(candidates)
+
+        # algorithm R
+        slot = self.rng.randrange(count)
+        if slot < self.max_records:
+            return slot
+        return None
+
+    def _store_record(
+        self,
+        struct_hash: str,
+        typed_map: Dict[str, Any],
+        raw_input: str,
+        parsed_dict: Dict[str, Any],
+    ) -> None:
+        """Method to add a raw/parsed pair to the signature map under its structure hash
+
+        :param struct_hash: structure hash of the record
+        :param typed_map: output of `flatten_and_type()` for the record
+        :param raw_input: original raw string input
+        :param parsed_dict: parsed dictionary of the record
+        """
+        new_record: RawParsedPair = {
+            "raw": raw_input,
+            "parsed": parsed_dict,
+        }
+        shape = None
+        if self.max_records is not None and self.sampling == "diverse":
+            shape = self._value_shape(parsed_dict)
+
+        entry = self.signature_map.get(struct_hash)
+        if entry is None:
+            self.signature_map[struct_hash] = {
+                "signature": typed_map,
+                "records": [new_record],
+                "count": 1,
+            }
+            if shape is not None:
+                self.record_shapes[struct_hash] = [shape]
+            return
+
+        entry["count"] += 1
+        records = entry["records"]
+        if self.max_records is None or len(records) < self.max_records:
+            records.append(new_record)
+            if shape is not None:
+                self.record_shapes[struct_hash].append(shape)
+            return
+
+        slot = self._reservoir_slot(struct_hash, entry["count"], shape)
+        if slot is not None:
+            records[slot] = new_record
+            if shape is not None:
+                self.record_shapes[struct_hash][slot] = shape
+
     def generate_fingerprint(
         self,
         raw_input: str,
@@ -135,15 +349,8 @@ class StructuralAnalyzer:
         :return: dictionary containing the hash, typed signature, parseability score,
             and summary string of the input structure
         """
-        # map paths to types
-        typed_map = self.flatten_and_type(parsed_dict)
-
-        # blueprint structure string
-        sorted_keys = sorted(typed_map.keys())
-        blueprint_str = "|".join([f"{k}:{typed_map[k]}" for k in sorted_keys])
-
-        # structure hash
-        struct_hash = hashlib.md5(blueprint_str.encode()).hexdigest()
+        # map paths to types, blueprint structure string + structure hash
+        typed_map, blueprint_str, struct_hash = self.type_and_blueprint(parsed_dict)
 
         # parseability
         score = self.get_parseability(raw_input, typed_map)
@@ -153,17 +360,7 @@ class StructuralAnalyzer:
         full_str = f"{blueprint_str}|parse_score:{score}"
 
         if store_in_map:
-            new_record: RawParsedPair = {
-                "raw": raw_input,
-                "parsed": parsed_dict,
-            }
-            if struct_hash not in self.signature_map:
-                self.signature_map[struct_hash] = {
-                    "signature": typed_map,
-                    "records": [new_record],
-                }
-            else:
-                self.signature_map[struct_hash]["records"].append(new_record)
+            self._store_record(struct_hash, typed_map, raw_input, parsed_dict)
 
         fingerprint: Fingerprint = {
             "hash": struct_hash,
@@ -173,3 +370,64 @@ class StructuralAnalyzer:
         }
 
         return fingerprint
+
+    def store_fingerprint(
+        self,
+        raw_input: str,
+        parsed_dict: Dict[str, Any],
+        fingerprint: Fingerprint,
+    ) -> None:
+        """Method to store a record whose fingerprint was computed elsewhere
+        (e.g. `rust_ingestion.smart_parse_fingerprint_batch()`)
+
+        :param raw_input: original raw string input
+        :param parsed_dict: parsed dictionary of the record
+        :param fingerprint: fingerprint of the record, as returned by `generate_fingerprint()`
+        """
+        self._store_record(
+            fingerprint["hash"],
+            fingerprint["signature"],
+            raw_input,
+            parsed_dict,
+        )
+
+    def ingest_columnar(
+        self,
+        batch: "ColumnarBatch",
+        store_in_map: bool = True,
+    ) -> List[str]:
+        """Method to fingerprint a whole columnar batch at once.
+
+        Records are grouped by their ordered key ids, so flattening, blueprint building
+        and hashing run once per distinct layout instead of once per record. Parsed dicts
+        are only materialized for records that get stored in the signature map.
+
+        :param batch: output of `parse_batch_columnar()`
+        :param store_in_map: boolean flag to store in `StructureAnalyzer.signature_map`, defaults to True
+        :return: list of structure hashes, one per record in the batch
+        """
+        layouts: Dict[Tuple[int, ...], Tuple[str, Dict[str, Any]]] = {}
+        hashes = []
+        for i in range(len(batch)):
+            key_ids = batch.get_key_ids(i)
+            layout = layouts.get(key_ids)
+            if layout is None:
+                # raw parsed values are always strings
+                typed_map = self.flatten_and_type(
+                    {batch.keys[key_id]: "" for key_id in key_ids}
+                )
+                _, struct_hash = self.build_blueprint(typed_map)
+                layout = (struct_hash, typed_map)
+                layouts[key_ids] = layout
+
+            struct_hash, typed_map = layout
+            if store_in_map:
+                self._store_record(
+                    struct_hash,
+                    typed_map,
+                    batch.get_raw(i),
+                    batch.get_record(i),
+                )
+            hashes.append(struct_hash)
+
+        return hashes
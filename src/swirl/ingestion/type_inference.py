@@ -0,0 +1,89 @@
+import re
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Dict
+
+# same shapes the rust parser (`src/rust/inference.rs`) accepts
+INT_PATTERN = re.compile(r"[+-]?(?:0|[1-9]\d*)", re.ASCII)
+FLOAT_PATTERN = re.compile(
+    r"[+-]?(?:\d+\.\d*|\.\d+|\d+(?=[eE]))(?:[eE][+-]?\d+)?", re.ASCII
+)
+CURRENCY_PATTERN = re.compile(r"(-?)[$€£](\d+|\d{1,3}(?:,\d{3})+)(\.\d+)?", re.ASCII)
+DATE_PATTERN = re.compile(r"\d{4}-\d{2}-\d{2}", re.ASCII)
+DATETIME_PATTERN = re.compile(
+    r"\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}(?::\d{2}(?:\.\d+)?)?(?:Z|[+-]\d{2}:?\d{2})?",
+    re.ASCII,
+)
+
+NULL_VALUES = {"None", "null", ""}
+INT64_MIN, INT64_MAX = -(2**63), 2**63 - 1
+
+
+def infer_value(value: str) -> Any:
+    """Function to infer the typed value of a parsed string value
+
+    Order: None -> bool -> int -> float -> ISO date -> ISO datetime -> currency (Decimal) -> str
+
+    :param value: parsed string value
+    :return: typed python value, or the original string if no type matched
+    """
+    if value in NULL_VALUES:
+        return None
+
+    lowered = value.lower()
+    if lowered == "true":
+        return True
+    if lowered == "false":
+        return False
+
+    if INT_PATTERN.fullmatch(value):
+        as_int = int(value)
+        if INT64_MIN <= as_int <= INT64_MAX:
+            return as_int
+    if FLOAT_PATTERN.fullmatch(value):
+        as_float = float(value)
+        if as_float not in (float("inf"), float("-inf")):
+            return as_float
+    if DATE_PATTERN.fullmatch(value):
+        try:
+            return date.fromisoformat(value)
+        except ValueError:
+            pass
+    if DATETIME_PATTERN.fullmatch(value):
+        try:
+            return datetime.fromisoformat(value)
+        except ValueError:
+            pass
+
+    currency = CURRENCY_PATTERN.fullmatch(value)
+    if currency:
+        sign, whole, frac = currency.groups()
+        return Decimal(f"{sign}{whole.replace(',', '')}{frac or ''}")
+
+    return value
+
+
+def infer_json_value(value: Any) -> Any:
+    """Function to infer the typed value of a top level JSON value
+
+    Strings go through `infer_value()`, every other JSON value (numbers, bools, null,
+    lists, objects) is already typed and kept as is.
+
+    :param value: value from `json.loads()`
+    :return: typed python value
+    """
+    if isinstance(value, str):
+        return infer_value(value)
+    return value
+
+
+def infer_record(parsed: Dict[str, Any]) -> Dict[str, Any]:
+    """Function to infer typed values of an all-string parsed record
+
+    :param parsed: output of `GrammarParser.smart_parse()` / `smart_parse_batch()`
+    :return: new dictionary with typed values ("_unparsed" is kept as a string)
+    """
+    return {
+        k: v if k == "_unparsed" or not isinstance(v, str) else infer_value(v)
+        for k, v in parsed.items()
+    }
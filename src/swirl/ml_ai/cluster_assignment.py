@@ -0,0 +1,85 @@
+from typing import Dict, Optional
+
+import numpy as np
+from sklearn.neighbors import NearestNeighbors
+
+#################################################################################
+############################# Incremental Assignment ############################
+#################################################################################
+
+
+class ExemplarIndex:
+    """Nearest exemplar index over the points of a fitted clustering
+
+    Every fitted point is an exemplar of its cluster. A cluster's radius is the largest
+    nearest-neighbour distance between its own members, i.e. roughly the distance at which
+    HDBSCAN merged its last point. New points take the label of their nearest exemplar if
+    they are within `tolerance` x that cluster's radius, and are outliers (-1) otherwise.
+    """
+
+    def __init__(self, metric: str = "euclidean", tolerance: float = 1.0) -> None:
+        """Init Method
+
+        :param metric: distance metric used by the clusterer, defaults to "euclidean"
+        :param tolerance: multiplier on the cluster radius for new points, defaults to 1.0
+        """
+        self.metric = metric
+        self.tolerance = tolerance
+
+        # vars to populate
+        self.exemplars: Optional[np.ndarray] = None
+        self.labels: Optional[np.ndarray] = None
+        self.radius: Dict[int, float] = {}
+        self.neighbors: Optional[NearestNeighbors] = None
+
+    def fit(self, X: np.ndarray, labels: np.ndarray) -> "ExemplarIndex":
+        """Method to index the points and labels of a fitted clustering
+
+        :param X: fitted points, shape (n_samples, n_features)
+        :param labels: cluster labels of `X` (-1 for outliers)
+        :return: self
+        """
+        self.exemplars = np.ascontiguousarray(X, dtype=np.float32)
+        self.labels = np.asarray(labels, dtype=np.int64)
+        self.radius = {}
+
+        # neighbour queries instead of full pairwise matrices, so large clusters stay O(n) memory
+        for label in np.unique(self.labels):
+            if label == -1:
+                continue
+            members = self.exemplars[self.labels == label]
+            if len(members) < 2:
+                self.radius[int(label)] = 0.0
+                continue
+            nn = NearestNeighbors(n_neighbors=2, metric=self.metric).fit(members)
+            dists, _ = nn.kneighbors(members)
+            self.radius[int(label)] = float(dists[:, 1].max())
+
+        self.neighbors = NearestNeighbors(n_neighbors=1, metric=self.metric)
+        self.neighbors.fit(self.exemplars)
+        return self
+
+    def assign(self, X: np.ndarray) -> np.ndarray:
+        """Method to place new points into the indexed clusters
+
+        :param X: new points, shape (n_samples, n_features)
+        :return: cluster labels of `X` (-1 for points that don't fit any cluster)
+        """
+        if self.neighbors is None:
+            raise RuntimeError("ExemplarIndex has not been fitted")
+
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        if len(X) == 0:
+            return np.empty(0, dtype=np.int64)
+
+        dists, idx = self.neighbors.kneighbors(X)
+        nearest_dist = dists[:, 0]
+
+        labels = self.labels[idx[:, 0]].copy()
+        for i, label in enumerate(labels):
+            if label == -1:
+                continue
+            # float32 round off slack so exact duplicates of a singleton still fit
+            if nearest_dist[i] > self.radius[int(label)] * self.tolerance + 1e-6:
+                labels[i] = -1
+        return labels
@@ -1,22 +1,66 @@
-from dataclasses import asdict, dataclass
-from typing import Any, Dict, List, Tuple
+import asyncio
+import hashlib
+import pickle
+import threading
+import time
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
 
 from swirl.ingestion.structure_analyzer import SignatureEntry
+from swirl.ml_ai.embedding_cache import EmbeddingCache
 from swirl.ml_ai.embedding_model import EmbeddingModel
+from swirl.ml_ai.minhash_clustering import MinHashClusterer
 from swirl.ml_ai.semantic_clustering import SemanticClusterer
 from swirl.ml_ai.structure_clustering import StructureClusterer
 
 
 @dataclass(slots=True)
 class StructureClusterParams:
+    # "hdbscan" (TF-IDF + HDBSCAN) or "minhash" (MinHash / LSH, for very large signature sets)
+    engine: str = "hdbscan"
     min_cluster_size: int = 2
     distance_metric: str = "euclidean"
     tfidf_analyzer: str = "char"
     tfidf_ngram_range: Tuple[int, int] = (3, 5)
+    assign_tolerance: float = 1.0
+    svd_components: Optional[int] = 64
+    minhash_num_perm: int = 128
+    minhash_bands: int = 32
+    minhash_threshold: float = 0.5
+    minhash_bucket_window: int = 2
 
     def to_dict(self) -> dict:
         return asdict(self)
 
+    def build_clusterer(self) -> StructureClusterer | MinHashClusterer:
+        """Method to create the structure clusterer of the selected engine
+
+        :raises ValueError: if the engine is unknown
+        :return: unfitted structure clusterer
+        """
+        if self.engine == "hdbscan":
+            return StructureClusterer(
+                min_cluster_size=self.min_cluster_size,
+                distance_metric=self.distance_metric,
+                tfidf_analyzer=self.tfidf_analyzer,
+                tfidf_ngram_range=self.tfidf_ngram_range,
+                assign_tolerance=self.assign_tolerance,
+                svd_components=self.svd_components,
+            )
+        if self.engine == "minhash":
+            return MinHashClusterer(
+                min_cluster_size=self.min_cluster_size,
+                num_perm=self.minhash_num_perm,
+                bands=self.minhash_bands,
+                threshold=self.minhash_threshold,
+                bucket_window=self.minhash_bucket_window,
+            )
+        raise ValueError(f"unknown structure clustering engine: {self.engine}")
+
 
 @dataclass(slots=True)
 class SemanticClusterParams:
@@ -27,6 +71,11 @@ class SemanticClusterParams:
     cluster_selection_epsilon: float = 0.08
     cluster_selection_method: str = "eom"
     allow_single_cluster: bool = True
+    assign_tolerance: float = 1.0
+    # "sentence_transformers" (torch) or "onnx" (int8 onnxruntime export)
+    embedding_backend: str = "sentence_transformers"
+    # "signature" (one text per signature) or "field_tokens" (pooled field name vectors)
+    embedding_mode: str = "signature"
 
     def to_dict(self) -> dict:
         return asdict(self)
@@ -34,12 +83,78 @@ class SemanticClusterParams:
 
 @dataclass(slots=True, frozen=True)
 class ClusterRecord:
+    """Reference to one analyzer record of a cluster
+
+    The analyzer record and the signature's fields are referenced, not copied, `raw`,
+    `parsed` and `fields` are resolved from them when read. A record keeps the payload it
+    was built with, also after the analyzer store resamples that slot.
+    """
+
     signature_hash: str
-    semantic_cluster_id: int
-    structure_cluster_id: int
-    raw: str
-    parsed: Dict[str, Any]
-    fields: List[str]
+    semantic_cluster_id: str
+    structure_cluster_id: str
+    # position in the analyzer store when the index was built
+    record_idx: int
+    record: Dict[str, Any] = field(compare=False, repr=False)
+    # signature fields without `_unparsed`, shared by the signature's records
+    signature_fields: Tuple[str, ...] = field(compare=False, repr=False)
+
+    @property
+    def raw(self) -> str:
+        return self.record["raw"]
+
+    @property
+    def parsed(self) -> Dict[str, Any]:
+        """parsed record without `_unparsed` (new dict per access, the store isn't mutated)"""
+        return {k: v for k, v in self.record["parsed"].items() if k != "_unparsed"}
+
+    @property
+    def fields(self) -> List[str]:
+        return list(self.signature_fields)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "signature_hash": self.signature_hash,
+            "semantic_cluster_id": self.semantic_cluster_id,
+            "structure_cluster_id": self.structure_cluster_id,
+            "raw": self.raw,
+            "parsed": self.parsed,
+            "fields": self.fields,
+        }
+
+
+class ClusterIndex(Mapping):
+    """Compact output of `ClusterOrchestrator.make_clusters()`, a read-only mapping of
+    semantic cluster id -> `ClusterRecord` references into the analyzer's signature map
+
+    Payloads aren't copied, every record references its analyzer record (see `ClusterRecord`).
+    """
+
+    def __init__(self, complete: bool = True) -> None:
+        """Init Method
+
+        :param complete: whether the index covers every signature of the signature map,
+            defaults to True (False for signatures assigned between refits)
+        """
+        self.complete = complete
+        self.clusters: Dict[str, List[ClusterRecord]] = {}
+        # signature hash -> fields without `_unparsed`, shared by the signature's records
+        self.fields: Dict[str, Tuple[str, ...]] = {}
+
+    def __getitem__(self, cluster_id: str) -> List[ClusterRecord]:
+        return self.clusters[cluster_id]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.clusters)
+
+    def __len__(self) -> int:
+        return len(self.clusters)
+
+    def __repr__(self) -> str:
+        return f"ClusterIndex({len(self.clusters)} clusters, {len(self.fields)} signatures)"
+
+    def to_dict(self) -> Dict[str, List[ClusterRecord]]:
+        return dict(self.clusters)
 
 
 class ClusterOrchestrator:
@@ -48,18 +163,29 @@ class ClusterOrchestrator:
         structure_cluster_params: StructureClusterParams = StructureClusterParams(),
         semantic_cluster_params: SemanticClusterParams = SemanticClusterParams(),
         embedding_model: str | EmbeddingModel = "all-MiniLM-L6-v2",
+        embedding_cache: Optional[EmbeddingCache] = None,
+        refit_interval_seconds: Optional[float] = 3600.0,
+        drift_threshold: float = 0.2,
+        concurrent: bool = True,
     ) -> None:
         """_summary_
 
         :param structure_cluster_params: _description_
         :param semantic_cluster_params: _description_
+        :param embedding_cache: signature text embedding cache, defaults to None
+        :param refit_interval_seconds: max age of the fitted clusters before a full refit, defaults to 3600.0
+            (None never refits on schedule, 0 refits on every call)
+        :param drift_threshold: share of new signatures assigned as outliers that triggers a full refit,
+            defaults to 0.2
+        :param concurrent: run the structure and semantic clusterers on two threads, defaults to True
         """
+        self.refit_interval_seconds = refit_interval_seconds
+        self.drift_threshold = drift_threshold
 
-        self.structure_clusterer = StructureClusterer(
-            **structure_cluster_params.to_dict(),
-        )
+        self.structure_clusterer = structure_cluster_params.build_clusterer()
         self.semantic_clusterer = SemanticClusterer(
             embedding_model=embedding_model,
+            embedding_cache=embedding_cache,
             **semantic_cluster_params.to_dict(),
         )
 
@@ -67,47 +193,256 @@ class ClusterOrchestrator:
         self.structure_hash_map = None
         self.semantic_cluster_map = None
         self.cluster_map = None
+        self.last_fit_time: Optional[float] = None
+        # digest of the last fit, prefixes the cluster ids (see `_fit_digest()`)
+        self.fit_id: Optional[str] = None
+
+        # counters
+        self.n_fits = 0
+        self.n_assigns = 0
+
+        # structure clustering thread (the semantic half runs on the calling thread), the lock
+        # serializes `make_clusters()` calls of jobs sharing this orchestrator
+        self.executor = (
+            ThreadPoolExecutor(max_workers=1, thread_name_prefix="structure-cluster")
+            if concurrent
+            else None
+        )
+        self._lock = threading.Lock()
+
+    def _run_both(
+        self,
+        structure_fn: Callable[[Dict[str, SignatureEntry]], Any],
+        semantic_fn: Callable[[Dict[str, SignatureEntry]], Any],
+        registry_map: Dict[str, SignatureEntry],
+    ) -> None:
+        """Helper method to run the structure and semantic halves, concurrently if configured
+
+        Both spend most of their time in GIL releasing native code (numpy / sklearn / scipy,
+        the embedding model), so two threads overlap well.
+
+        :param structure_fn: structure clusterer method (`fit_predict` or `assign`)
+        :param semantic_fn: semantic clusterer method (`fit_predict` or `assign`)
+        :param registry_map: output of `StructuralAnalyzer.get_signature_map()`
+        """
+        if self.executor is None:
+            self.structure_hash_map = structure_fn(registry_map)
+            self.semantic_cluster_map = semantic_fn(registry_map)
+            return
+
+        structure_future = self.executor.submit(structure_fn, registry_map)
+        try:
+            self.semantic_cluster_map = semantic_fn(registry_map)
+        finally:
+            self.structure_hash_map = structure_future.result()
+
+    def _refit_due(self) -> bool:
+        """Helper method to check if the fitted clusters are missing or past the refit interval
+
+        :return: True if a full refit is needed
+        """
+        if not (
+            self.structure_clusterer.is_fitted and self.semantic_clusterer.is_fitted
+        ):
+            return True
+        if self.last_fit_time is None or self.fit_id is None:
+            return True
+        if self.refit_interval_seconds is None:
+            return False
+        return time.time() - self.last_fit_time >= self.refit_interval_seconds
+
+    def _assign(self, registry_map: Dict[str, SignatureEntry]) -> bool:
+        """Helper method to assign signatures to the fitted clusters
+
+        :param registry_map: output of `StructuralAnalyzer.get_signature_map()`
+        :return: True if the new signatures drifted (too many outliers) and a refit is needed
+        """
+        new_hashes = {
+            h for h in registry_map if h not in self.semantic_clusterer.labels_by_hash
+        }
+
+        self._run_both(
+            self.structure_clusterer.assign,
+            self.semantic_clusterer.assign,
+            registry_map,
+        )
+        self.n_assigns += 1
+
+        if not new_hashes:
+            return False
+        n_outliers = sum(
+            1
+            for records in self.semantic_cluster_map.values()
+            for rec in records
+            if rec["is_outlier"] and rec["signature_hash"] in new_hashes
+        )
+        return n_outliers / len(new_hashes) > self.drift_threshold
+
+    def _fit_digest(self, registry_map: Dict[str, SignatureEntry]) -> str:
+        """Helper method to identify a fit by its signatures and their cluster labels
+
+        Refits renumber the HDBSCAN labels, so cluster ids are prefixed with this digest to
+        keep the cluster sets of different fits apart (e.g. in the shared signature registry).
+        Fits with the same labels get the same digest, so their ids stay comparable.
+
+        :param registry_map: output of `StructuralAnalyzer.get_signature_map()` that was fitted
+        :return: short md5 hex digest
+        """
+        labels = "|".join(
+            f"{h}:{self.semantic_clusterer.labels_by_hash[h]}:{self.structure_hash_map[h]['cluster_id']}"
+            for h in sorted(registry_map)
+        )
+        return hashlib.md5(labels.encode()).hexdigest()[:8]
 
     def make_clusters(
-        self, registry_map: Dict[str, SignatureEntry]
-    ) -> Dict[str, List[ClusterRecord]]:
+        self,
+        registry_map: Dict[str, SignatureEntry],
+        force_refit: bool = False,
+        signature_hashes: Optional[List[str]] = None,
+    ) -> ClusterIndex:
         """_summary_
 
+        HDBSCAN is only refit when there are no fitted clusters yet, on the refit schedule,
+        when new signatures drift away from the fitted clusters, or when forced.
+        Otherwise signatures are assigned to the fitted clusters.
+
         :param registry_map: _description_
+        :param force_refit: always refit the clusterers, defaults to False
+        :param signature_hashes: signatures to assign (and return) between refits, defaults
+            to None (every signature). A refit still clusters and returns the whole map.
         :return: _description_
         """
-        self.structure_hash_map = self.structure_clusterer.fit_predict(registry_map)
-        self.semantic_cluster_map = self.semantic_clusterer.fit_predict(registry_map)
+        with self._lock:
+            assign_map = registry_map
+            if signature_hashes is not None:
+                assign_map = {h: registry_map[h] for h in signature_hashes}
+
+            refit = force_refit or self._refit_due()
+            if not refit:
+                refit = self._assign(assign_map)
+
+            if refit:
+                self._run_both(
+                    self.structure_clusterer.fit_predict,
+                    self.semantic_clusterer.fit_predict,
+                    registry_map,
+                )
+                self.last_fit_time = time.time()
+                self.fit_id = self._fit_digest(registry_map)
+                self.n_fits += 1
+                # refit cluster ids replace the previous ones
+                assign_map = registry_map
+
+            self.cluster_map = self._build_cluster_index(
+                assign_map, complete=assign_map is registry_map
+            )
+            return self.cluster_map
+
+    async def amake_clusters(
+        self,
+        registry_map: Dict[str, SignatureEntry],
+        force_refit: bool = False,
+        signature_hashes: Optional[List[str]] = None,
+    ) -> ClusterIndex:
+        """Async variant of `make_clusters()` that runs off the event loop, so other jobs
+        of the worker keep running while clustering
+
+        :param registry_map: output of `StructuralAnalyzer.get_signature_map()`
+        :param force_refit: always refit the clusterers, defaults to False
+        :param signature_hashes: signatures to assign between refits, defaults to None (every signature)
+        :return: same output as `make_clusters()`
+        """
+        return await asyncio.to_thread(
+            self.make_clusters, registry_map, force_refit, signature_hashes
+        )
 
-        cluster_dict = {}
-        for cluster_id, records in self.semantic_cluster_map.items():
-            cluster_dict[cluster_id] = cluster_dict.get(cluster_id, [])
+    def embed_signatures(self, signatures: List[Dict[str, Any]]) -> np.ndarray:
+        """Method to embed signatures with the semantic clusterer's model and embedding mode
+        (serialized with `make_clusters()` calls, which share the model)
+
+        :param signatures: signature dicts
+        :return: L2 normalized float32 array of shape (len(signatures), embedding dim)
+        """
+        with self._lock:
+            return self.semantic_clusterer.embed(signatures)
+
+    def _build_cluster_index(
+        self, registry_map: Dict[str, SignatureEntry], complete: bool = True
+    ) -> ClusterIndex:
+        """Helper method to join the structure and semantic cluster maps into a cluster index
+
+        Signatures without fields and records that only hold `_unparsed` are left out, cluster
+        ids are prefixed with the fit digest (e.g. "3f2a9c1b_4").
+
+        :param registry_map: output of `StructuralAnalyzer.get_signature_map()`
+        :param complete: whether `registry_map` is the full signature map, defaults to True
+        :return: semantic cluster id -> cluster records
+        """
+        index = ClusterIndex(complete)
+        for label, records in self.semantic_cluster_map.items():
+            cluster_id = f"{self.fit_id}_{label}"
+            members = index.clusters.setdefault(cluster_id, [])
             for rec in records:
                 signature_hash = rec["signature_hash"]
-                structure_cluster_id = self.structure_hash_map[signature_hash][
-                    "cluster_id"
-                ]
-                analyzer_records = registry_map[signature_hash]["records"]
-                fields_li = rec["fields"]
-                # ignore _unparsed
-                fields_li = [f for f in fields_li if f != "_unparsed"]
-                if len(fields_li) < 1:
+                fields = tuple(f for f in rec["fields"] if f != "_unparsed")
+                if len(fields) < 1:
                     continue
-                for r in analyzer_records:
-                    parsed_dict = r["parsed"]
-                    # ignore _unparsed
-                    parsed_dict.pop("_unparsed", None)
-                    if len(parsed_dict) < 1:
+                index.fields[signature_hash] = fields
+
+                structure_label = self.structure_hash_map[signature_hash]["cluster_id"]
+                structure_cluster_id = f"{self.fit_id}_{structure_label}"
+                analyzer_records = registry_map[signature_hash]["records"]
+                for i, r in enumerate(analyzer_records):
+                    # checked in place, parsed records can be shared or read-only mappings
+                    if not any(k != "_unparsed" for k in r["parsed"]):
                         continue
-                    cluster_dict[cluster_id].append(
+                    members.append(
                         ClusterRecord(
                             signature_hash=signature_hash,
                             semantic_cluster_id=cluster_id,
                             structure_cluster_id=structure_cluster_id,
-                            raw=r["raw"],
-                            parsed=parsed_dict,
-                            fields=fields_li,
+                            record_idx=i,
+                            record=r,
+                            signature_fields=fields,
                         )
                     )
 
-        return cluster_dict
+        return index
+
+    def close(self) -> None:
+        """Method to stop the structure clustering thread"""
+        if self.executor is not None:
+            self.executor.shutdown(wait=True)
+
+    def save_state(self, fpath: str) -> None:
+        """Method to persist the fitted clusterer state (e.g. between worker restarts)
+
+        The state (fitted sklearn models included) is pickled, write it somewhere only
+        trusted processes can modify, see `load_state()`.
+
+        :param fpath: output pickle file path
+        """
+        state = {
+            "structure": self.structure_clusterer.get_state(),
+            "semantic": self.semantic_clusterer.get_state(),
+            "last_fit_time": self.last_fit_time,
+            "fit_id": self.fit_id,
+        }
+        with open(fpath, "wb") as f:
+            pickle.dump(state, f)
+
+    def load_state(self, fpath: str) -> None:
+        """Method to restore a fitted clusterer state from `save_state()`
+
+        Unpickling runs arbitrary code, only load files written by `save_state()` from a
+        trusted location, never user supplied paths or uploads.
+
+        :param fpath: input pickle file path
+        """
+        with open(fpath, "rb") as f:
+            state = pickle.load(f)
+        self.structure_clusterer.set_state(state["structure"])
+        self.semantic_clusterer.set_state(state["semantic"])
+        self.last_fit_time = state["last_fit_time"]
+        # states saved without a fit digest are refit on the next call
+        self.fit_id = state.get("fit_id")
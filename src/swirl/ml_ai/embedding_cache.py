@@ -0,0 +1,280 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Protocol, TypedDict
+
+import numpy as np
+
+from swirl.ml_ai.embedding_model import EmbeddingModel
+
+
+class EmbeddingStore(Protocol):
+    """Duck type protocol class for a shared embedding tier (raw float16 bytes per key)
+
+    :param Protocol: extends typing.Protocol
+    """
+
+    def get_many(self, keys: List[str]) -> List[Optional[bytes]]:
+        pass
+
+    def set_many(self, items: Dict[str, bytes]) -> None:
+        pass
+
+
+class DiskEmbeddingStore:
+    """Embedding tier shared by every process on the host, one float16 file per key
+
+    Reads refresh a file's mtime, and every `prune_every` writes the process removes the
+    files unused for `ttl_seconds` and then the least recently used ones above `max_files`.
+
+    Directory Structure:
+    ```
+    <cache_dir>/<key[:2]>/<key>.f16
+    ```
+    """
+
+    def __init__(
+        self,
+        cache_dir: str = "./.embedding_cache",
+        max_files: Optional[int] = 500_000,
+        ttl_seconds: Optional[float] = None,
+        prune_every: int = 10_000,
+    ) -> None:
+        """Init Method
+
+        :param cache_dir: root directory of the embedding files, defaults to "./.embedding_cache"
+        :param max_files: max number of stored vectors, defaults to 500_000 (None for no cap)
+        :param ttl_seconds: remove vectors unused for this long, defaults to None (no expiry)
+        :param prune_every: writes of this process between two `prune()` runs, defaults to 10_000
+        """
+        self.cache_dir = cache_dir
+        self.max_files = max_files
+        self.ttl_seconds = ttl_seconds
+        self.prune_every = prune_every
+
+        self._writes = 0
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.f16")
+
+    def get_many(self, keys: List[str]) -> List[Optional[bytes]]:
+        """Method to read the stored vectors of a list of keys
+
+        :param keys: embedding cache keys
+        :return: raw float16 bytes per key, None for keys that aren't stored
+        """
+        results = []
+        for key in keys:
+            path = self._path(key)
+            try:
+                with open(path, "rb") as f:
+                    results.append(f.read())
+                # recently used, see `prune()`
+                os.utime(path)
+            except OSError:
+                results.append(None)
+        return results
+
+    def set_many(self, items: Dict[str, bytes]) -> None:
+        """Method to store vectors (write to a temp file + rename, so readers never see partial files)
+
+        :param items: mapping of embedding cache keys to raw float16 bytes
+        """
+        for key, data in items.items():
+            path = self._path(key)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+
+        if self.max_files is None and self.ttl_seconds is None:
+            return
+        with self._lock:
+            self._writes += len(items)
+            if self._writes < self.prune_every:
+                return
+            self._writes = 0
+        self.prune()
+
+    def prune(self) -> int:
+        """Method to remove the vectors unused for `ttl_seconds`, then the least recently
+        used ones above `max_files`
+
+        :return: number of removed vectors
+        """
+        files = []
+        try:
+            with os.scandir(self.cache_dir) as subdirs:
+                for subdir in subdirs:
+                    if not subdir.is_dir():
+                        continue
+                    with os.scandir(subdir.path) as entries:
+                        for entry in entries:
+                            if not entry.name.endswith(".f16"):
+                                continue
+                            try:
+                                files.append((entry.stat().st_mtime, entry.path))
+                            except OSError:
+                                # removed by another process
+                                continue
+        except OSError:
+            return 0
+
+        expired = []
+        if self.ttl_seconds is not None:
+            cutoff = time.time() - self.ttl_seconds
+            expired = [path for mtime, path in files if mtime < cutoff]
+            files = [(mtime, path) for mtime, path in files if mtime >= cutoff]
+        if self.max_files is not None and len(files) > self.max_files:
+            files.sort()
+            expired.extend(path for _, path in files[: len(files) - self.max_files])
+
+        n_removed = 0
+        for path in expired:
+            try:
+                os.remove(path)
+                n_removed += 1
+            except OSError:
+                continue
+        return n_removed
+
+
+class EmbeddingCacheStats(TypedDict):
+    memory_hits: int
+    store_hits: int
+    misses: int
+    evictions: int
+    size: int
+    max_size: int
+    hit_rate: float
+
+
+class EmbeddingCache:
+    """Two tier cache of text embeddings keyed by a hash of the model name and the text
+
+    Vectors are kept as float16 in a bounded in-process LRU tier, backed by an optional
+    shared `EmbeddingStore` (e.g. `DiskEmbeddingStore`), so only unseen texts are encoded.
+
+    Cache Structure:
+    ```python
+    {
+        <md5 of model name + text>: <float16 vector>
+    }
+    ```
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        max_size: int = 50_000,
+        store: Optional[EmbeddingStore] = None,
+    ) -> None:
+        """Init Method
+
+        :param model_name: name of the embedding model, part of every cache key
+        :param max_size: max number of vectors in the in-process tier before LRU eviction, defaults to 50_000
+        :param store: shared tier, defaults to None (in-process tier only)
+        """
+        self.model_name = model_name
+        self.max_size = max_size
+        self.store = store
+        self._entries: OrderedDict[str, np.ndarray] = OrderedDict()
+        self._lock = threading.Lock()
+
+        # counters
+        self.memory_hits = 0
+        self.store_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _key(self, text: str) -> str:
+        return hashlib.md5(f"{self.model_name}\x00{text}".encode()).hexdigest()
+
+    def _put(self, key: str, vector: np.ndarray) -> None:
+        """Method to add a vector to the in-process tier (call with the lock held)"""
+        self._entries[key] = vector
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def encode(self, model: EmbeddingModel, texts: List[str]) -> np.ndarray:
+        """Cached drop-in for `model.encode(texts)`
+
+        :param model: embedding model, only called for texts missing from both tiers
+        :param texts: texts to embed
+        :return: float32 array of shape (len(texts), embedding dim)
+        """
+        keys = [self._key(text) for text in texts]
+        vectors: Dict[str, np.ndarray] = {}
+
+        # in-process tier
+        with self._lock:
+            for key in keys:
+                vector = self._entries.get(key)
+                if vector is not None and key not in vectors:
+                    self._entries.move_to_end(key)
+                    vectors[key] = vector
+                    self.memory_hits += 1
+
+        # shared tier
+        missing = list(dict.fromkeys(key for key in keys if key not in vectors))
+        if missing and self.store is not None:
+            stored = self.store.get_many(missing)
+            with self._lock:
+                for key, data in zip(missing, stored):
+                    if data is None:
+                        continue
+                    vector = np.frombuffer(data, dtype=np.float16)
+                    self._put(key, vector)
+                    vectors[key] = vector
+                    self.store_hits += 1
+            missing = [key for key in missing if key not in vectors]
+
+        # encode unseen texts (once per distinct text)
+        if missing:
+            text_by_key = dict(zip(keys, texts))
+            embeddings = model.encode([text_by_key[key] for key in missing])
+            embeddings = np.asarray(embeddings, dtype=np.float16)
+
+            new_items = {}
+            with self._lock:
+                for key, vector in zip(missing, embeddings):
+                    vector = np.ascontiguousarray(vector)
+                    self._put(key, vector)
+                    vectors[key] = vector
+                    new_items[key] = vector.tobytes()
+                self.misses += len(missing)
+
+            if self.store is not None:
+                self.store.set_many(new_items)
+
+        if not keys:
+            return np.empty((0, 0), dtype=np.float32)
+        return np.vstack([vectors[key] for key in keys]).astype(np.float32)
+
+    def stats(self) -> EmbeddingCacheStats:
+        """Getter method for cache counters
+
+        :return: hit/miss/eviction counters plus current in-process size
+        """
+        lookups = self.memory_hits + self.store_hits + self.misses
+        hits = self.memory_hits + self.store_hits
+        return {
+            "memory_hits": self.memory_hits,
+            "store_hits": self.store_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+        }
+
+    def clear(self) -> None:
+        """Method to drop the in-process tier (the shared tier and counters are kept)"""
+        with self._lock:
+            self._entries.clear()
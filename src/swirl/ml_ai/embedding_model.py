@@ -1,4 +1,9 @@
-from typing import Protocol
+import os
+from typing import List, Optional, Protocol
+
+import numpy as np
+
+EMBEDDING_BACKENDS = ["sentence_transformers", "onnx"]
 
 
 class EmbeddingModel(Protocol):
@@ -13,5 +18,203 @@ class EmbeddingModel(Protocol):
 
 def load_sentence_transformer(model_name: str, **kwargs) -> EmbeddingModel:
     from sentence_transformers import SentenceTransformer
+    from transformers import logging as transformers_logging
+
+    transformers_logging.set_verbosity_error()
 
     return SentenceTransformer(model_name, **kwargs)
+
+
+def onnx_model_dir(model_name: str, cache_folder: str = "./.models") -> str:
+    """Function to get the directory of an exported int8 ONNX model (see `export_onnx_model()`)
+
+    :param model_name: sentence transformer model name, e.g. "all-MiniLM-L6-v2"
+    :param cache_folder: model cache directory, defaults to "./.models"
+    :return: `<cache_folder>/<model_name>-onnx-int8`
+    """
+    return os.path.join(cache_folder, f"{model_name.split('/')[-1]}-onnx-int8")
+
+
+def _mean_pool(token_embeddings: np.ndarray, attention_mask: np.ndarray) -> np.ndarray:
+    """Helper function for sentence transformer style pooling: attention masked mean of the
+    token embeddings, L2 normalized
+
+    :param token_embeddings: last hidden state, shape (batch, seq_len, dim)
+    :param attention_mask: shape (batch, seq_len)
+    :return: float32 array of shape (batch, dim)
+    """
+    mask = attention_mask[..., None].astype(np.float32)
+    summed = (token_embeddings * mask).sum(axis=1)
+    pooled = summed / np.clip(mask.sum(axis=1), 1e-9, None)
+    norms = np.linalg.norm(pooled, axis=1, keepdims=True)
+    return (pooled / np.clip(norms, 1e-12, None)).astype(np.float32)
+
+
+class OnnxEmbeddingModel:
+    """`EmbeddingModel` running an int8 quantized sentence transformer export through
+    onnxruntime on CPU (no torch / sentence-transformers import at runtime)
+
+    Model Directory Structure (see `export_onnx_model()`):
+    ```
+    <model_dir>/model_quantized.onnx
+    <model_dir>/tokenizer.json
+    ```
+    """
+
+    def __init__(
+        self,
+        model_dir: str,
+        batch_size: int = 64,
+        max_length: int = 64,
+        num_threads: Optional[int] = None,
+    ) -> None:
+        """Init Method
+
+        :param model_dir: directory of the exported model
+        :param batch_size: texts per inference call, defaults to 64
+        :param max_length: token truncation length (field name strings are short), defaults to 64
+        :param num_threads: onnxruntime intra op threads, defaults to None (onnxruntime default)
+        :raises FileNotFoundError: if the model hasn't been exported to `model_dir`
+        """
+        model_fpath = os.path.join(model_dir, "model_quantized.onnx")
+        if not os.path.exists(model_fpath):
+            raise FileNotFoundError(
+                f"{model_fpath} not found, export it with `export_onnx_model()`"
+            )
+
+        import onnxruntime
+        from tokenizers import Tokenizer
+
+        self.model_dir = model_dir
+        self.batch_size = batch_size
+        self.max_length = max_length
+
+        self.tokenizer = Tokenizer.from_file(os.path.join(model_dir, "tokenizer.json"))
+        self.tokenizer.enable_truncation(max_length=max_length)
+        self.tokenizer.enable_padding()
+
+        options = onnxruntime.SessionOptions()
+        if num_threads is not None:
+            options.intra_op_num_threads = num_threads
+        self.session = onnxruntime.InferenceSession(
+            model_fpath,
+            sess_options=options,
+            providers=["CPUExecutionProvider"],
+        )
+        self.input_names = {i.name for i in self.session.get_inputs()}
+
+    def encode(
+        self,
+        sentences: str | List[str],
+        batch_size: Optional[int] = None,
+        **kwargs,
+    ) -> np.ndarray:
+        """Method to embed texts (drop-in for `SentenceTransformer.encode()` numpy output)
+
+        :param sentences: text or list of texts
+        :param batch_size: texts per inference call, defaults to None (`self.batch_size`)
+        :return: float32 array of shape (len(sentences), dim), 1-D for a single text
+        """
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        batch_size = batch_size or self.batch_size
+
+        batches = []
+        for start in range(0, len(texts), batch_size):
+            encodings = self.tokenizer.encode_batch(texts[start : start + batch_size])
+            feeds = {
+                "input_ids": np.array([e.ids for e in encodings], dtype=np.int64),
+                "attention_mask": np.array(
+                    [e.attention_mask for e in encodings], dtype=np.int64
+                ),
+                "token_type_ids": np.array(
+                    [e.type_ids for e in encodings], dtype=np.int64
+                ),
+            }
+            feeds = {k: v for k, v in feeds.items() if k in self.input_names}
+            token_embeddings = self.session.run(None, feeds)[0]
+            batches.append(_mean_pool(token_embeddings, feeds["attention_mask"]))
+
+        if not batches:
+            return np.empty((0, 0), dtype=np.float32)
+        embeddings = np.vstack(batches)
+        return embeddings[0] if single else embeddings
+
+
+def export_onnx_model(
+    model_name: str = "sentence-transformers/all-MiniLM-L6-v2",
+    cache_folder: str = "./.models",
+) -> str:
+    """Function to export a sentence transformer to an int8 quantized ONNX model (one-off build
+    step, needs torch + transformers + onnxruntime)
+
+    ```bash
+    python -c "from swirl.ml_ai.embedding_model import export_onnx_model; export_onnx_model()"
+    ```
+
+    :param model_name: huggingface model name, defaults to "sentence-transformers/all-MiniLM-L6-v2"
+    :param cache_folder: model cache directory, defaults to "./.models"
+    :return: directory of the exported model (see `onnx_model_dir()`)
+    """
+    import torch
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    from transformers import AutoModel, AutoTokenizer
+
+    output_dir = onnx_model_dir(model_name, cache_folder)
+    os.makedirs(output_dir, exist_ok=True)
+
+    tokenizer = AutoTokenizer.from_pretrained(model_name, cache_dir=cache_folder)
+    model = AutoModel.from_pretrained(model_name, cache_dir=cache_folder).eval()
+    tokenizer.save_pretrained(output_dir)
+
+    sample = tokenizer(["field:order_id field:total"], return_tensors="pt")
+    # graph inputs follow the model's forward() argument order
+    input_names = [
+        name
+        for name in ("input_ids", "attention_mask", "token_type_ids")
+        if name in sample
+    ]
+    fp32_fpath = os.path.join(output_dir, "model.onnx")
+    torch.onnx.export(
+        model,
+        (dict(sample),),
+        fp32_fpath,
+        input_names=input_names,
+        output_names=["last_hidden_state"],
+        dynamic_axes={
+            **{name: {0: "batch", 1: "sequence"} for name in input_names},
+            "last_hidden_state": {0: "batch", 1: "sequence"},
+        },
+        opset_version=17,
+    )
+
+    quantize_dynamic(
+        fp32_fpath,
+        os.path.join(output_dir, "model_quantized.onnx"),
+        weight_type=QuantType.QInt8,
+    )
+    os.remove(fp32_fpath)
+    return output_dir
+
+
+def load_embedding_model(
+    model_name: str = "all-MiniLM-L6-v2",
+    backend: str = "sentence_transformers",
+    cache_folder: str = "./.models",
+    **kwargs,
+) -> EmbeddingModel:
+    """Function to load an embedding model with the selected backend
+
+    :param model_name: sentence transformer model name, defaults to "all-MiniLM-L6-v2"
+    :param backend: one of `EMBEDDING_BACKENDS`, defaults to "sentence_transformers"
+    :param cache_folder: model cache directory, defaults to "./.models"
+    :raises ValueError: if the backend is unknown
+    :return: embedding model
+    """
+    if backend == "sentence_transformers":
+        return load_sentence_transformer(
+            model_name, cache_folder=cache_folder, **kwargs
+        )
+    if backend == "onnx":
+        return OnnxEmbeddingModel(onnx_model_dir(model_name, cache_folder), **kwargs)
+    raise ValueError(f"unknown embedding backend: {backend}")
@@ -0,0 +1,383 @@
+import argparse
+import json
+import os
+import queue
+import socket
+import socketserver
+import struct
+import threading
+import time
+from concurrent.futures import Future
+from typing import List, Optional, Tuple, TypedDict
+
+import numpy as np
+
+from swirl.ml_ai.embedding_model import (
+    EMBEDDING_BACKENDS,
+    EmbeddingModel,
+    load_embedding_model,
+)
+from swirl.utils.log_utils import get_custom_logger
+
+logger = get_custom_logger()
+
+#################################################################################
+########################### Shared Embedding Sidecar ############################
+#################################################################################
+
+# request frame: payload length + utf-8 JSON list of texts
+REQUEST_HEADER = struct.Struct("!I")
+# response frame: status + payload length, payload is dim + float32 rows or an error message
+RESPONSE_HEADER = struct.Struct("!BI")
+STATUS_OK = 0
+STATUS_ERROR = 1
+# stop marker of the encode thread queue
+_STOP = object()
+
+
+def _recv_exact(sock: socket.socket, n_bytes: int) -> bytes:
+    """Helper function to read exactly `n_bytes` from a stream socket
+
+    :raises ConnectionError: if the peer closes the connection mid frame
+    """
+    buffer = bytearray(n_bytes)
+    view = memoryview(buffer)
+    received = 0
+    while received < n_bytes:
+        n = sock.recv_into(view[received:], n_bytes - received)
+        if n == 0:
+            raise ConnectionError("embedding socket closed by peer")
+        received += n
+    return bytes(buffer)
+
+
+class EmbeddingServerStats(TypedDict):
+    requests: int
+    texts: int
+    batches: int
+    mean_batch_size: float
+
+
+class MicroBatcher:
+    """Single encode thread that coalesces concurrent requests into one `model.encode()` call
+
+    Requests queued while a batch is encoding, or arriving within `max_wait_ms` of the first
+    one, are encoded together (up to `max_batch_size` texts, a larger request is a batch on
+    its own).
+    """
+
+    def __init__(
+        self,
+        model: EmbeddingModel,
+        max_batch_size: int = 256,
+        max_wait_ms: float = 5.0,
+    ) -> None:
+        """Init Method
+
+        :param model: embedding model shared by every client
+        :param max_batch_size: max texts per `model.encode()` call, defaults to 256
+        :param max_wait_ms: max time a request waits for others to batch with, defaults to 5.0
+        """
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+
+        self.requests: queue.Queue = queue.Queue()
+        self.n_requests = 0
+        self.n_texts = 0
+        self.n_batches = 0
+
+        self.thread = threading.Thread(
+            target=self._run, name="embedding-batcher", daemon=True
+        )
+        self.thread.start()
+
+    def submit(self, texts: List[str]) -> "Future[np.ndarray]":
+        """Method to queue texts for encoding
+
+        :param texts: texts to embed
+        :return: future of the float32 array of shape (len(texts), dim)
+        """
+        future: Future = Future()
+        self.requests.put((texts, future))
+        return future
+
+    def _run(self) -> None:
+        pending = None
+        while True:
+            item = pending if pending is not None else self.requests.get()
+            pending = None
+            if item is _STOP:
+                return
+
+            batch = [item]
+            n_texts = len(item[0])
+            deadline = time.monotonic() + self.max_wait_ms / 1000
+            while n_texts < self.max_batch_size:
+                try:
+                    item = self.requests.get(
+                        timeout=max(deadline - time.monotonic(), 0.0)
+                    )
+                except queue.Empty:
+                    break
+                if item is _STOP or n_texts + len(item[0]) > self.max_batch_size:
+                    # stop marker / request that doesn't fit goes first next round
+                    pending = item
+                    break
+                batch.append(item)
+                n_texts += len(item[0])
+
+            self._encode(batch)
+
+    def _encode(self, batch: List[Tuple[List[str], Future]]) -> None:
+        texts = [text for request_texts, _ in batch for text in request_texts]
+        try:
+            embeddings = np.asarray(
+                self.model.encode(texts, batch_size=self.max_batch_size),
+                dtype=np.float32,
+            )
+        except Exception as e:
+            for _, future in batch:
+                future.set_exception(e)
+            return
+
+        start = 0
+        for request_texts, future in batch:
+            end = start + len(request_texts)
+            future.set_result(embeddings[start:end])
+            start = end
+
+        self.n_requests += len(batch)
+        self.n_texts += len(texts)
+        self.n_batches += 1
+
+    def stats(self) -> EmbeddingServerStats:
+        return {
+            "requests": self.n_requests,
+            "texts": self.n_texts,
+            "batches": self.n_batches,
+            "mean_batch_size": round(self.n_texts / self.n_batches, 2)
+            if self.n_batches
+            else 0.0,
+        }
+
+    def close(self) -> None:
+        """Method to stop the encode thread (after the queued requests)"""
+        self.requests.put(_STOP)
+        self.thread.join()
+
+
+class _EmbeddingRequestHandler(socketserver.StreamRequestHandler):
+    """One thread per client connection, a connection carries any number of requests"""
+
+    def handle(self) -> None:
+        batcher: MicroBatcher = self.server.batcher
+        while True:
+            try:
+                (length,) = REQUEST_HEADER.unpack(
+                    _recv_exact(self.request, REQUEST_HEADER.size)
+                )
+                texts = json.loads(_recv_exact(self.request, length))
+            except ConnectionError:
+                return
+
+            try:
+                embeddings = batcher.submit(texts).result()
+                dim = embeddings.shape[1] if embeddings.ndim == 2 else 0
+                payload = struct.pack("!I", dim) + embeddings.tobytes()
+                status = STATUS_OK
+            except Exception as e:
+                logger.error(f"[EmbeddingServer] encode failed: {e}")
+                payload = str(e).encode()
+                status = STATUS_ERROR
+
+            self.request.sendall(RESPONSE_HEADER.pack(status, len(payload)) + payload)
+
+
+class EmbeddingServer(socketserver.ThreadingUnixStreamServer):
+    """Host-local embedding sidecar: one model copy served over a Unix socket to every worker
+    process on the host (see `EmbeddingClient`), with requests micro-batched across clients
+
+    ```bash
+    python -m swirl.ml_ai.embedding_server --socket-path /tmp/swirl-embedding.sock
+    ```
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        model: EmbeddingModel,
+        socket_path: str,
+        max_batch_size: int = 256,
+        max_wait_ms: float = 5.0,
+    ) -> None:
+        """Init Method
+
+        :param model: embedding model shared by every client
+        :param socket_path: Unix socket path (a stale socket file is replaced)
+        :param max_batch_size: max texts per `model.encode()` call, defaults to 256
+        :param max_wait_ms: max time a request waits for others to batch with, defaults to 5.0
+        """
+        self.socket_path = socket_path
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        self.batcher = MicroBatcher(model, max_batch_size, max_wait_ms)
+        super().__init__(socket_path, _EmbeddingRequestHandler)
+
+    def start(self) -> threading.Thread:
+        """Method to serve on a background thread
+
+        :return: serving thread
+        """
+        thread = threading.Thread(
+            target=self.serve_forever, name="embedding-server", daemon=True
+        )
+        thread.start()
+        return thread
+
+    def stats(self) -> EmbeddingServerStats:
+        return self.batcher.stats()
+
+    def close(self) -> None:
+        """Method to stop serving, stop the encode thread and remove the socket file"""
+        self.shutdown()
+        self.server_close()
+        self.batcher.close()
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+
+
+class EmbeddingClient:
+    """`EmbeddingModel` backed by an `EmbeddingServer` on the same host
+
+    Each thread keeps its own connection (opened on first use and reopened once after a
+    broken connection), so a client can be shared by the jobs and threads of a worker.
+    """
+
+    def __init__(
+        self,
+        socket_path: str,
+        timeout: Optional[float] = 60.0,
+        connect_timeout: float = 30.0,
+    ) -> None:
+        """Init Method
+
+        :param socket_path: Unix socket path of the `EmbeddingServer`
+        :param timeout: socket timeout per request, defaults to 60.0 (None blocks)
+        :param connect_timeout: how long to wait for the server socket to appear, defaults to 30.0
+        """
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self.local = threading.local()
+
+    def _connect(self) -> socket.socket:
+        deadline = time.monotonic() + self.connect_timeout
+        while True:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            try:
+                sock.connect(self.socket_path)
+                return sock
+            except FileNotFoundError, ConnectionRefusedError:
+                sock.close()
+                # sidecar still starting (model load)
+                if time.monotonic() >= deadline:
+                    raise
+                time.sleep(0.5)
+
+    def _request(self, texts: List[str]) -> np.ndarray:
+        sock = getattr(self.local, "sock", None)
+        if sock is None:
+            sock = self.local.sock = self._connect()
+
+        payload = json.dumps(texts).encode()
+        try:
+            sock.sendall(REQUEST_HEADER.pack(len(payload)) + payload)
+            status, length = RESPONSE_HEADER.unpack(
+                _recv_exact(sock, RESPONSE_HEADER.size)
+            )
+            payload = _recv_exact(sock, length)
+        except BaseException:
+            # the unread response (e.g. after a timeout) would be read by the next request
+            self.close()
+            raise
+        if status != STATUS_OK:
+            raise RuntimeError(f"embedding server error: {payload.decode()}")
+
+        (dim,) = struct.unpack_from("!I", payload)
+        return np.frombuffer(payload, dtype=np.float32, offset=4).reshape(-1, dim)
+
+    def encode(
+        self,
+        sentences: str | List[str],
+        batch_size: Optional[int] = None,
+        **kwargs,
+    ) -> np.ndarray:
+        """Method to embed texts on the server (drop-in for `SentenceTransformer.encode()` numpy output)
+
+        :param sentences: text or list of texts
+        :param batch_size: unused, the server batches requests, defaults to None
+        :raises RuntimeError: if the server fails to encode the texts
+        :return: float32 array of shape (len(sentences), dim), 1-D for a single text
+        """
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        if not texts:
+            return np.empty((0, 0), dtype=np.float32)
+
+        try:
+            embeddings = self._request(texts)
+        except ConnectionError, FileNotFoundError:
+            # server restarted or connection dropped, retry once on a new connection
+            # (timeouts aren't retried, the server may still be encoding the request)
+            embeddings = self._request(texts)
+        return embeddings[0] if single else embeddings
+
+    def close(self) -> None:
+        """Method to close the calling thread's connection"""
+        sock = getattr(self.local, "sock", None)
+        if sock is not None:
+            sock.close()
+            self.local.sock = None
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    arg_parser = argparse.ArgumentParser(description="Shared embedding model sidecar")
+    arg_parser.add_argument(
+        "--socket-path",
+        default=os.getenv("EMBEDDING_SOCKET_PATH", "/tmp/swirl-embedding.sock"),
+    )
+    arg_parser.add_argument("--model-name", default="all-MiniLM-L6-v2")
+    arg_parser.add_argument(
+        "--backend",
+        choices=EMBEDDING_BACKENDS,
+        default=os.getenv("EMBEDDING_BACKEND", "sentence_transformers"),
+    )
+    arg_parser.add_argument("--cache-folder", default="./.models")
+    arg_parser.add_argument("--max-batch-size", type=int, default=256)
+    arg_parser.add_argument("--max-wait-ms", type=float, default=5.0)
+    args = arg_parser.parse_args(argv)
+
+    model = load_embedding_model(
+        args.model_name, backend=args.backend, cache_folder=args.cache_folder
+    )
+    server = EmbeddingServer(
+        model,
+        args.socket_path,
+        max_batch_size=args.max_batch_size,
+        max_wait_ms=args.max_wait_ms,
+    )
+    logger.info(f"[EmbeddingServer] serving {args.model_name} on {args.socket_path}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        logger.info(f"[EmbeddingServer] Stats: {server.stats()}")
+        server.close()
+
+
+if __name__ == "__main__":
+    main()
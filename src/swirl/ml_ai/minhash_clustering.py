@@ -0,0 +1,370 @@
+import hashlib
+from itertools import chain
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+
+from swirl.ingestion.structure_analyzer import SignatureEntry
+from swirl.ml_ai.structure_clustering import (
+    StructClusterData,
+    build_struct_cluster_map,
+)
+
+#################################################################################
+############################ MinHash / LSH Clustering ###########################
+#################################################################################
+
+# universal hashing modulus, (a * x + b) stays below 2**63 for 31 bit inputs
+MERSENNE_PRIME = (1 << 31) - 1
+# LSH bands whose candidate pairs are verified before the components are updated
+BANDS_PER_ROUND = 8
+
+
+class MinHashClusterer:
+    """Near linear structure clusterer over the Jaccard overlap of signature key sets
+
+    Every signature's key set is sketched into `num_perm` MinHash values, the sketch is
+    cut into `bands` bands and signatures sharing any band land in the same LSH bucket.
+    Within a bucket (in a random order per band) every signature is checked against the
+    `bucket_window` members before it, pairs whose estimated Jaccard similarity reaches
+    `threshold` are unioned (connected components over the verified pairs) and components
+    with fewer than `min_cluster_size` signatures are outliers (-1).
+
+    Same interface and output as `StructureClusterer`, selected with
+    `StructureClusterParams(engine="minhash")`.
+    """
+
+    def __init__(
+        self,
+        min_cluster_size: int = 2,
+        num_perm: int = 128,
+        bands: int = 32,
+        threshold: float = 0.5,
+        seed: int = 0,
+        chunk_size: int = 10_000,
+        bucket_window: int = 2,
+    ) -> None:
+        """Init Method
+
+        :param min_cluster_size: smallest group of signatures that is a cluster, defaults to 2
+        :param num_perm: number of MinHash permutations, defaults to 128
+        :param bands: number of LSH bands (`num_perm` must be divisible by it), defaults to 32
+        :param threshold: min estimated Jaccard similarity of a candidate pair, defaults to 0.5
+        :param seed: permutation / bucket order seed, defaults to 0
+        :param chunk_size: max number of signatures sketched / pairs verified at a time, defaults to 10_000
+        :param bucket_window: bucket members every signature is checked against per band, defaults to 2
+        :raises ValueError: if `num_perm` isn't divisible by `bands`
+        """
+        if num_perm % bands:
+            raise ValueError(f"num_perm={num_perm} is not divisible by bands={bands}")
+
+        self.min_cluster_size = min_cluster_size
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        self.seed = seed
+        self.chunk_size = chunk_size
+        self.bucket_window = bucket_window
+
+        # permutations h(x) = (a * x + b) mod p and odd band mixing multipliers
+        rng = np.random.default_rng(seed)
+        self.perm_a = rng.integers(1, MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+        self.perm_b = rng.integers(0, MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+        self.band_mult = rng.integers(1, 1 << 63, size=self.rows, dtype=np.uint64) | 1
+        # signature key -> token id, token id -> 31 bit key hash
+        self.token_ids: Dict[str, int] = {}
+        self.token_hashes: List[int] = []
+
+        # fitted state for incremental `assign()`
+        self.minhashes: Optional[np.ndarray] = None
+        self.labels: Optional[np.ndarray] = None
+        # per band: sorted bucket keys, bucket start offsets and members in bucket order
+        self.bucket_keys: List[np.ndarray] = []
+        self.bucket_starts: List[np.ndarray] = []
+        self.bucket_members: List[np.ndarray] = []
+        self.labels_by_hash: Dict[str, int] = {}
+        self.is_fitted = False
+
+    def _token_ids(
+        self, signatures: List[Dict[str, Any]]
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Helper method to map the keys of signatures to token ids (new keys are hashed once)
+
+        :param signatures: signature dicts (their keys are the token sets)
+        :return: tuple of (token id of every key in signature order, number of keys per signature)
+        """
+        # empty key sets share one sentinel token
+        keys = list(chain.from_iterable(signature or ("",) for signature in signatures))
+        lengths = np.fromiter(
+            map(len, signatures), dtype=np.int64, count=len(signatures)
+        )
+        np.maximum(lengths, 1, out=lengths)
+
+        for key in set(keys).difference(self.token_ids):
+            digest = hashlib.blake2b(key.encode(), digest_size=8).digest()
+            self.token_ids[key] = len(self.token_hashes)
+            self.token_hashes.append(int.from_bytes(digest, "little") % MERSENNE_PRIME)
+
+        ids = np.fromiter(
+            map(self.token_ids.__getitem__, keys), dtype=np.int64, count=len(keys)
+        )
+        return ids, lengths
+
+    def _sketch(
+        self, signatures: List[Dict[str, Any]]
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Helper method to compute MinHash sketches and LSH band keys of signatures
+
+        Permutations are only computed once per distinct key, signatures are then grouped
+        by key count so every group gathers its key rows as one (n, n_keys, num_perm)
+        array and takes the minimum over the keys.
+
+        :param signatures: signature dicts (their keys are the token sets)
+        :return: tuple of (uint32 sketches (n, num_perm), uint64 band keys (n, bands))
+        """
+        n = len(signatures)
+        minhashes = np.empty((n, self.num_perm), dtype=np.uint32)
+        band_keys = np.empty((n, self.bands), dtype=np.uint64)
+        if n == 0:
+            return minhashes, band_keys
+
+        ids, lengths = self._token_ids(signatures)
+        offsets = np.concatenate([[0], np.cumsum(lengths)[:-1]])
+
+        # permutation table of the distinct keys
+        token_ids, token_rows = np.unique(ids, return_inverse=True)
+        tokens = np.asarray(self.token_hashes, dtype=np.uint64)[token_ids]
+        table = np.empty((len(tokens), self.num_perm), dtype=np.uint32)
+        for start in range(0, len(tokens), self.chunk_size):
+            chunk = tokens[start : start + self.chunk_size, None]
+            table[start : start + self.chunk_size] = (
+                chunk * self.perm_a + self.perm_b
+            ) % MERSENNE_PRIME
+
+        # column wise minimum per key count group
+        order = np.argsort(lengths, kind="stable")
+        group_lengths, group_starts = np.unique(lengths[order], return_index=True)
+        group_ends = np.append(group_starts[1:], n)
+        for length, group_start, group_end in zip(
+            group_lengths.tolist(), group_starts, group_ends
+        ):
+            step = max(self.chunk_size // length, 1)
+            for start in range(group_start, group_end, step):
+                batch = order[start : min(start + step, group_end)]
+                rows = token_rows[offsets[batch, None] + np.arange(length)]
+                minhashes[batch] = table[rows].min(axis=1)
+
+        # band key = wrapping dot product of the band's rows with odd multipliers
+        for start in range(0, n, self.chunk_size):
+            banded = minhashes[start : start + self.chunk_size].reshape(
+                -1, self.bands, self.rows
+            )
+            band_keys[start : start + self.chunk_size] = (
+                banded.astype(np.uint64) * self.band_mult
+            ).sum(axis=2)
+
+        return minhashes, band_keys
+
+    def _similarity(
+        self,
+        left: np.ndarray,
+        right: np.ndarray,
+        right_minhashes: Optional[np.ndarray] = None,
+    ) -> np.ndarray:
+        """Helper method to estimate the Jaccard similarity of sketch pairs
+
+        :param left: row indices into the fitted sketches
+        :param right: row indices into `right_minhashes`
+        :param right_minhashes: sketches of `right`, defaults to None (the fitted sketches)
+        :return: estimated similarity per pair
+        """
+        if right_minhashes is None:
+            right_minhashes = self.minhashes
+        sims = np.empty(len(left), dtype=np.float64)
+        for start in range(0, len(left), self.chunk_size):
+            end = start + self.chunk_size
+            sims[start:end] = (
+                self.minhashes[left[start:end]] == right_minhashes[right[start:end]]
+            ).mean(axis=1)
+        return sims
+
+    def _components(self, n_samples: int) -> np.ndarray:
+        """Helper method to union the verified candidate pairs of the fitted LSH buckets
+
+        Candidate pairs are every signature with the `bucket_window` members before it in
+        its bucket. Bands are processed in rounds of `BANDS_PER_ROUND`, pairs already
+        connected by an earlier round aren't verified again.
+
+        :param n_samples: number of fitted signatures
+        :return: connected component id per signature
+        """
+        components = np.arange(n_samples)
+        src, dst = np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        for first_band in range(0, self.bands, BANDS_PER_ROUND):
+            pairs = []
+            for band in range(
+                first_band, min(first_band + BANDS_PER_ROUND, self.bands)
+            ):
+                members = self.bucket_members[band]
+                starts = self.bucket_starts[band]
+                bucket_ids = np.repeat(np.arange(len(starts) - 1), np.diff(starts))
+                for offset in range(1, self.bucket_window + 1):
+                    same = bucket_ids[offset:] == bucket_ids[:-offset]
+                    left, right = members[offset:][same], members[:-offset][same]
+                    pairs.append(
+                        np.minimum(left, right) * n_samples + np.maximum(left, right)
+                    )
+
+            pairs = np.concatenate(pairs)
+            pairs.sort()
+            pairs = pairs[np.append(True, pairs[1:] != pairs[:-1])]
+            left, right = np.divmod(pairs, n_samples)
+            unconnected = components[left] != components[right]
+            left, right = left[unconnected], right[unconnected]
+            verified = self._similarity(left, right) >= self.threshold
+            src = np.concatenate([src, left[verified]])
+            dst = np.concatenate([dst, right[verified]])
+
+            # union-find of the verified pairs
+            graph = coo_matrix(
+                (np.ones(len(src), dtype=np.int8), (src, dst)),
+                shape=(n_samples, n_samples),
+            )
+            _, components = connected_components(graph, directed=False)
+
+        return components
+
+    def fit_predict(
+        self,
+        registry_map: Dict[str, SignatureEntry],
+    ) -> Dict[str, StructClusterData]:
+        """Method to cluster signatures by the Jaccard overlap of their key sets
+
+        :param registry_map: output of `StructuralAnalyzer.get_signature_map()`
+        :return: signature hash -> cluster data (same output as `StructureClusterer`)
+        """
+        hashes = list(registry_map.keys())
+        n_samples = len(hashes)
+
+        if n_samples < self.min_cluster_size:
+            labels = np.zeros(n_samples, dtype=np.int64)
+            self.is_fitted = False
+        else:
+            minhashes, band_keys = self._sketch(
+                [registry_map[h]["signature"] for h in hashes]
+            )
+            self.minhashes = minhashes
+
+            # LSH buckets (kept for `assign()`), members in a random order per band
+            rng = np.random.default_rng(self.seed)
+            self.bucket_keys, self.bucket_starts, self.bucket_members = [], [], []
+            for band in range(self.bands):
+                order = rng.permutation(n_samples)
+                members = order[np.argsort(band_keys[order, band], kind="stable")]
+                keys = band_keys[members, band]
+                starts = np.flatnonzero(keys[1:] != keys[:-1]) + 1
+                self.bucket_keys.append(keys[np.append(0, starts)])
+                self.bucket_starts.append(np.concatenate([[0], starts, [n_samples]]))
+                self.bucket_members.append(members)
+
+            components = self._components(n_samples)
+            n_components = components.max() + 1
+
+            # components below min_cluster_size are outliers, the rest get consecutive ids
+            counts = np.bincount(components, minlength=n_components)
+            cluster_ids = np.flatnonzero(counts >= self.min_cluster_size)
+            remap = np.full(n_components, -1, dtype=np.int64)
+            remap[cluster_ids] = np.arange(len(cluster_ids))
+            labels = remap[components]
+
+            self.labels = labels
+            self.is_fitted = True
+
+        labels = labels.tolist()
+        self.labels_by_hash = dict(zip(hashes, labels))
+        return build_struct_cluster_map(hashes, labels, registry_map)
+
+    def assign(
+        self,
+        registry_map: Dict[str, SignatureEntry],
+    ) -> Dict[str, StructClusterData]:
+        """Method to place signatures into the clusters of the last fit, without refitting.
+
+        Known signatures keep their label, new ones take the label of the most similar
+        of the (first `bucket_window`) bucket members they collide with (if it reaches
+        `threshold`) or become outliers.
+
+        :param registry_map: output of `StructuralAnalyzer.get_signature_map()`
+        :raises RuntimeError: if there is no fitted state to assign against
+        :return: same output as `fit_predict()`
+        """
+        if not self.is_fitted:
+            raise RuntimeError("MinHashClusterer has not been fitted")
+
+        hashes = list(registry_map.keys())
+        new_hashes = [h for h in hashes if h not in self.labels_by_hash]
+        if new_hashes:
+            minhashes, band_keys = self._sketch(
+                [registry_map[h]["signature"] for h in new_hashes]
+            )
+
+            new_idx = np.arange(len(new_hashes))
+            best = np.full(len(new_hashes), -1, dtype=np.int64)
+            best_sim = np.zeros(len(new_hashes), dtype=np.float64)
+            for band in range(self.bands):
+                keys = self.bucket_keys[band]
+                starts = self.bucket_starts[band]
+                pos = np.minimum(
+                    np.searchsorted(keys, band_keys[:, band]), len(keys) - 1
+                )
+                hit = keys[pos] == band_keys[:, band]
+                for offset in range(self.bucket_window):
+                    valid = hit & (starts[pos] + offset < starts[pos + 1])
+                    candidates = self.bucket_members[band][
+                        np.where(valid, starts[pos] + offset, 0)
+                    ]
+                    sims = np.where(
+                        valid, self._similarity(candidates, new_idx, minhashes), 0.0
+                    )
+                    better = sims > best_sim
+                    best[better] = candidates[better]
+                    best_sim[better] = sims[better]
+
+            labels = np.where(
+                (best >= 0) & (best_sim >= self.threshold), self.labels[best], -1
+            )
+            self.labels_by_hash.update(zip(new_hashes, labels.tolist()))
+
+        labels = [self.labels_by_hash[h] for h in hashes]
+        return build_struct_cluster_map(hashes, labels, registry_map)
+
+    def get_state(self) -> Dict[str, Any]:
+        """Getter method for the fitted state (picklable)
+
+        :return: sketches, labels and LSH buckets of the fit plus known signature labels
+        """
+        return {
+            "minhashes": self.minhashes,
+            "labels": self.labels,
+            "bucket_keys": self.bucket_keys,
+            "bucket_starts": self.bucket_starts,
+            "bucket_members": self.bucket_members,
+            "labels_by_hash": self.labels_by_hash,
+            "is_fitted": self.is_fitted,
+        }
+
+    def set_state(self, state: Dict[str, Any]) -> None:
+        """Setter method for a fitted state from `get_state()` (same `seed` / `num_perm` / `bands`)
+
+        :param state: fitted state
+        """
+        self.minhashes = state["minhashes"]
+        self.labels = state["labels"]
+        self.bucket_keys = state["bucket_keys"]
+        self.bucket_starts = state["bucket_starts"]
+        self.bucket_members = state["bucket_members"]
+        self.labels_by_hash = state["labels_by_hash"]
+        self.is_fitted = state["is_fitted"]
@@ -1,13 +1,16 @@
-from typing import Dict, List, TypedDict
+import re
+from typing import Any, Dict, List, Optional, TypedDict
 
 import numpy as np
 from sklearn.cluster import HDBSCAN
-from transformers import logging as transformers_logging
 
 from swirl.ingestion.structure_analyzer import SignatureEntry
-from swirl.ml_ai.embedding_model import EmbeddingModel, load_sentence_transformer
+from swirl.ml_ai.cluster_assignment import ExemplarIndex
+from swirl.ml_ai.embedding_cache import EmbeddingCache
+from swirl.ml_ai.embedding_model import EmbeddingModel, load_embedding_model
 
-transformers_logging.set_verbosity_error()
+# camelCase word boundaries, e.g. "lastLoginIp" -> "last_login_ip"
+CAMEL_BOUNDARY_PATTERN = re.compile(r"(?<=[a-z0-9])(?=[A-Z])")
 
 #################################################################################
 ############################## Semantic Clustering ##############################
@@ -32,6 +35,10 @@ class SemanticClusterer:
         cluster_selection_epsilon: float = 0.08,
         cluster_selection_method: str = "eom",
         allow_single_cluster: bool = True,
+        embedding_cache: Optional[EmbeddingCache] = None,
+        assign_tolerance: float = 1.0,
+        embedding_backend: str = "sentence_transformers",
+        embedding_mode: str = "signature",
     ) -> None:
         """_summary_
 
@@ -43,6 +50,13 @@ class SemanticClusterer:
         :param cluster_selection_epsilon: _description_, defaults to 0.08
         :param cluster_selection_method: _description_, defaults to "eom"
         :param allow_single_cluster: _description_, defaults to True
+        :param embedding_cache: signature text embedding cache, defaults to None (encode every run)
+        :param assign_tolerance: cluster radius multiplier for `assign()`, defaults to 1.0
+        :param embedding_backend: backend used when `embedding_model` is a name, "sentence_transformers"
+            or "onnx" (int8 export in `model_cache_dir`), defaults to "sentence_transformers"
+        :param embedding_mode: "signature" embeds every signature text, "field_tokens" embeds every
+            unique normalized field name once and mean pools them per signature, defaults to "signature"
+        :raises ValueError: if the embedding mode is unknown
         """
         self.embedding_model = embedding_model
         self.model_cache_dir = model_cache_dir
@@ -53,10 +67,23 @@ class SemanticClusterer:
         self.cluster_selection_epsilon = cluster_selection_epsilon
         self.cluster_selection_method = cluster_selection_method
         self.allow_single_cluster = allow_single_cluster
+        self.embedding_cache = embedding_cache
+        self.embedding_backend = embedding_backend
+        self.embedding_mode = embedding_mode
+
+        if self.embedding_mode not in ("signature", "field_tokens"):
+            raise ValueError(f"unknown embedding mode: {self.embedding_mode}")
+        # field tokens repeat across runs, so they are always cached (in process by default)
+        if self.embedding_mode == "field_tokens" and self.embedding_cache is None:
+            self.embedding_cache = EmbeddingCache(model_name="field_tokens")
 
         # init embedding model if not passed in
         if isinstance(embedding_model, str):
-            self.embedding_model = load_sentence_transformer(self.embedding_model)
+            self.embedding_model = load_embedding_model(
+                self.embedding_model,
+                backend=self.embedding_backend,
+                cache_folder=self.model_cache_dir,
+            )
 
         # init clusterer
         self.clusterer = HDBSCAN(
@@ -69,52 +96,113 @@ class SemanticClusterer:
             copy=True,
         )
 
-    def fit_predict(
-        self,
-        registry_map: Dict[str, SignatureEntry],
-    ) -> Dict[str, List[SemanticClusterData]]:
-        """_summary_
+        # fitted state for incremental `assign()`
+        self.index = ExemplarIndex(
+            metric=self.distance_metric, tolerance=assign_tolerance
+        )
+        self.labels_by_hash: Dict[str, int] = {}
+        self.is_fitted = False
 
-        :param registry_map: _description_
-        :return: _description_
-        """
-        hashes = list(registry_map.keys())
-        n_samples = len(hashes)
+    def _to_text(self, signature_dict: Dict[str, Any]) -> str:
+        """Utility method to convert a single signature dict to a string of 'field:' prefixed keys
 
-        signatures_as_text = []
-        for h in hashes:
-            h_dict = dict(registry_map[h]["signature"])
-            # remove the 'black hole' field that swallows everything
-            # h_dict = {k: v for k, v in h_dict.items() if k != "_unparsed"}
-            h_dict.pop("_unparsed", None)
+        :param signature_dict: input signature structure dict
+        :return: string representation of structure
+        """
+        h_dict = dict(signature_dict)
+        # remove the 'black hole' field that swallows everything
+        h_dict.pop("_unparsed", None)
 
-            # sort keys to ensure structural identity regardless of log order
-            sorted_keys = sorted(h_dict.keys())
+        # sort keys to ensure structural identity regardless of log order
+        sorted_keys = sorted(h_dict.keys())
 
-            if not sorted_keys:
-                text_rep = "schema:empty_blob"
-            else:
-                # 'field:' prefix to define the role of the tokens
-                text_rep = " ".join([f"field:{k}" for k in sorted_keys])
+        if not sorted_keys:
+            return "schema:empty_blob"
+        # 'field:' prefix to define the role of the tokens
+        return " ".join([f"field:{k}" for k in sorted_keys])
 
-            signatures_as_text.append(text_rep)
+    def _embed(self, texts: List[str]) -> np.ndarray:
+        """Helper method to embed signature texts (only unseen texts when cached)
 
-        if n_samples < self.min_cluster_size:
-            labels = [0] * n_samples
+        :param texts: signature texts
+        :return: float64 array of shape (len(texts), embedding dim)
+        """
+        if self.embedding_cache is not None:
+            embeddings = self.embedding_cache.encode(self.embedding_model, texts)
         else:
-            # run embedding
-            embeddings = self.embedding_model.encode(signatures_as_text)
-            X = np.ascontiguousarray(embeddings, dtype=np.float64)
+            embeddings = self.embedding_model.encode(texts)
+        return np.ascontiguousarray(embeddings, dtype=np.float64)
 
-            # fit_predict()
-            labels = self.clusterer.fit_predict(X)
+    def _field_tokens(self, signature_dict: Dict[str, Any]) -> List[str]:
+        """Utility method to convert a single signature dict to its normalized field token texts
 
+        Keys are snake_cased and lowercased (e.g. "lastLoginIp" -> "field:last_login_ip"),
+        `_unparsed` is dropped and duplicates after normalization are merged.
+
+        :param signature_dict: input signature structure dict
+        :return: sorted unique token texts
+        """
+        tokens = {
+            f"field:{CAMEL_BOUNDARY_PATTERN.sub('_', k).strip().lower()}"
+            for k in signature_dict.keys()
+            if k != "_unparsed"
+        }
+        return sorted(tokens) or ["schema:empty_blob"]
+
+    def _vectorize(self, signatures: List[Dict[str, Any]]) -> np.ndarray:
+        """Helper method to embed signatures with the configured `embedding_mode`
+
+        In "field_tokens" mode the model only sees the registry's token vocabulary, signature
+        vectors are the L2 normalized mean of their token vectors.
+
+        :param signatures: signature dicts
+        :return: float64 array of shape (len(signatures), embedding dim)
+        """
+        if self.embedding_mode == "signature":
+            return self._embed([self._to_text(s) for s in signatures])
+
+        token_lists = [self._field_tokens(s) for s in signatures]
+        vocab: Dict[str, int] = {}
+        token_idx = [vocab.setdefault(t, len(vocab)) for li in token_lists for t in li]
+        token_vectors = self._embed(list(vocab))
+
+        # per signature sums over its slice of token rows, then mean + L2 normalize
+        lengths = np.array([len(li) for li in token_lists])
+        offsets = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+        pooled = np.add.reduceat(token_vectors[token_idx], offsets, axis=0)
+        pooled /= lengths[:, None]
+        norms = np.linalg.norm(pooled, axis=1, keepdims=True)
+        return pooled / np.clip(norms, 1e-12, None)
+
+    def embed(self, signatures: List[Dict[str, Any]]) -> np.ndarray:
+        """Method to embed signatures the way they are clustered (e.g. for a persisted
+        nearest signature index)
+
+        :param signatures: signature dicts
+        :return: L2 normalized float32 array of shape (len(signatures), embedding dim)
+        """
+        X = self._vectorize(signatures)
+        norms = np.linalg.norm(X, axis=1, keepdims=True)
+        return (X / np.clip(norms, 1e-12, None)).astype(np.float32)
+
+    def _build_map(
+        self,
+        hashes: List[str],
+        labels: List[int],
+        registry_map: Dict[str, SignatureEntry],
+    ) -> Dict[str, List[SemanticClusterData]]:
+        """Helper method to build the output map of `fit_predict()` / `assign()`
+
+        :param hashes: signature hashes
+        :param labels: cluster labels aligned with `hashes`
+        :param registry_map: output of `StructuralAnalyzer.get_signature_map()`
+        :return: cluster id -> cluster data of its signatures
+        """
         conjoined_map = {}
-        for i, cluster_id in enumerate(labels):
-            h = hashes[i]
-            # unique IDs to outliers so they don't group into one '-1' bucket
-            final_id = int(cluster_id) if cluster_id != -1 else (400 + i)
-            final_id = f"{final_id}"
+        for h, cluster_id in zip(hashes, labels):
+            # unique IDs to outliers so they don't group into one '-1' bucket, derived from
+            # the signature hash so they are the same in every `assign()` call
+            final_id = f"{int(cluster_id)}" if cluster_id != -1 else f"outlier_{h}"
 
             record = {
                 "cluster_id": final_id,
@@ -126,3 +214,75 @@ class SemanticClusterer:
             conjoined_map[final_id].append(record)
 
         return conjoined_map
+
+    def fit_predict(
+        self,
+        registry_map: Dict[str, SignatureEntry],
+    ) -> Dict[str, List[SemanticClusterData]]:
+        """_summary_
+
+        :param registry_map: _description_
+        :return: _description_
+        """
+        hashes = list(registry_map.keys())
+        n_samples = len(hashes)
+
+        if n_samples < self.min_cluster_size:
+            labels = [0] * n_samples
+            self.is_fitted = False
+        else:
+            X = self._vectorize([registry_map[h]["signature"] for h in hashes])
+
+            # fit_predict()
+            labels = self.clusterer.fit_predict(X)
+            self.index.fit(X, labels)
+            self.is_fitted = True
+
+        self.labels_by_hash = {h: int(label) for h, label in zip(hashes, labels)}
+        return self._build_map(hashes, labels, registry_map)
+
+    def assign(
+        self,
+        registry_map: Dict[str, SignatureEntry],
+    ) -> Dict[str, List[SemanticClusterData]]:
+        """Method to place signatures into the clusters of the last fit, without refitting.
+
+        Known signatures keep their label, only new ones are embedded and go to their
+        nearest exemplar's cluster (see `ExemplarIndex`) or become outliers.
+
+        :param registry_map: output of `StructuralAnalyzer.get_signature_map()`
+        :raises RuntimeError: if there is no fitted state to assign against
+        :return: same output as `fit_predict()`
+        """
+        if not self.is_fitted:
+            raise RuntimeError("SemanticClusterer has not been fitted")
+
+        hashes = list(registry_map.keys())
+        new_hashes = [h for h in hashes if h not in self.labels_by_hash]
+        if new_hashes:
+            X = self._vectorize([registry_map[h]["signature"] for h in new_hashes])
+            for h, label in zip(new_hashes, self.index.assign(X)):
+                self.labels_by_hash[h] = int(label)
+
+        labels = [self.labels_by_hash[h] for h in hashes]
+        return self._build_map(hashes, labels, registry_map)
+
+    def get_state(self) -> Dict[str, Any]:
+        """Getter method for the fitted state (picklable, the embedding model is not included)
+
+        :return: exemplar index and known signature labels
+        """
+        return {
+            "index": self.index,
+            "labels_by_hash": self.labels_by_hash,
+            "is_fitted": self.is_fitted,
+        }
+
+    def set_state(self, state: Dict[str, Any]) -> None:
+        """Setter method for a fitted state from `get_state()`
+
+        :param state: fitted state
+        """
+        self.index = state["index"]
+        self.labels_by_hash = state["labels_by_hash"]
+        self.is_fitted = state["is_fitted"]
@@ -1,9 +1,14 @@
-from typing import Any, Dict, List, Tuple, TypedDict
+from typing import Any, Dict, List, Optional, Tuple, TypedDict
 
+import numpy as np
+from scipy.sparse import spmatrix
 from sklearn.cluster import HDBSCAN
+from sklearn.decomposition import TruncatedSVD
 from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.preprocessing import normalize
 
 from swirl.ingestion.structure_analyzer import SignatureEntry
+from swirl.ml_ai.cluster_assignment import ExemplarIndex
 
 #################################################################################
 ############################# Structural Clustering #############################
@@ -17,6 +22,32 @@ class StructClusterData(TypedDict):
     is_outlier: bool
 
 
+def build_struct_cluster_map(
+    hashes: List[str],
+    labels: List[int],
+    registry_map: Dict[str, SignatureEntry],
+) -> Dict[str, StructClusterData]:
+    """Function to build the output map of the structure clusterers' `fit_predict()` / `assign()`
+
+    :param hashes: signature hashes
+    :param labels: cluster labels aligned with `hashes`
+    :param registry_map: output of `StructuralAnalyzer.get_signature_map()`
+    :return: signature hash -> cluster data
+    """
+    labels = np.asarray(labels, dtype=np.int64).tolist()
+    # one id string per cluster instead of per signature
+    cluster_ids = {label: str(label) for label in set(labels)}
+    return {
+        h: {
+            "cluster_id": cluster_ids[label],
+            "fields": list(registry_map[h]["signature"]),
+            "signature_hash": h,
+            "is_outlier": label == -1,
+        }
+        for h, label in zip(hashes, labels)
+    }
+
+
 class StructureClusterer:
     def __init__(
         self,
@@ -24,6 +55,8 @@ class StructureClusterer:
         distance_metric: str = "euclidean",
         tfidf_analyzer: str = "char",
         tfidf_ngram_range: Tuple[int, int] = (3, 5),
+        assign_tolerance: float = 1.0,
+        svd_components: Optional[int] = 64,
     ) -> None:
         """_summary_
 
@@ -31,11 +64,15 @@ class StructureClusterer:
         :param distance_metric: _description_, defaults to "euclidean"
         :param tfidf_analyzer: _description_, defaults to "char"
         :param tfidf_ngram_range: _description_, defaults to (3, 5)
+        :param assign_tolerance: cluster radius multiplier for `assign()`, defaults to 1.0
+        :param svd_components: dimension the sparse TF-IDF matrix is reduced to (TruncatedSVD) before
+            clustering, defaults to 64 (None densifies the full matrix)
         """
         self.min_cluster_size = min_cluster_size
         self.distance_metric = distance_metric
         self.tfidf_analyzer = tfidf_analyzer
         self.tfidf_ngram_range = tfidf_ngram_range
+        self.svd_components = svd_components
 
         # init vectorizer
         self.vectorizer = TfidfVectorizer(
@@ -49,6 +86,16 @@ class StructureClusterer:
             copy=True,
         )
 
+        # fitted reducer (None when the TF-IDF matrix is small enough to densify)
+        self.reducer: Optional[TruncatedSVD] = None
+
+        # fitted state for incremental `assign()`
+        self.index = ExemplarIndex(
+            metric=self.distance_metric, tolerance=assign_tolerance
+        )
+        self.labels_by_hash: Dict[str, int] = {}
+        self.is_fitted = False
+
     def _to_text(self, signature_dict: Dict[str, Any]) -> str:
         """Utility method to convert a single signature dict to a space-separated string of keys
 
@@ -57,6 +104,33 @@ class StructureClusterer:
         """
         return " ".join(signature_dict.keys())
 
+    def _to_dense(self, matrix: spmatrix, fit: bool = False) -> np.ndarray:
+        """Helper method to turn a sparse TF-IDF matrix into the dense points that get clustered
+
+        The full matrix is only densified while it is at most `svd_components` wide or tall,
+        larger ones are reduced with TruncatedSVD (straight from the sparse matrix) and
+        re-normalized, so euclidean distances stay cosine-like as for raw TF-IDF rows.
+
+        :param matrix: sparse TF-IDF matrix
+        :param fit: fit a new reducer on `matrix`, defaults to False (use the fitted one)
+        :return: dense matrix of shape (n_samples, <= svd_components or vocabulary size)
+        """
+        if fit:
+            n_samples, n_features = matrix.shape
+            self.reducer = None
+            if (
+                self.svd_components is not None
+                and min(n_samples, n_features) > self.svd_components
+            ):
+                self.reducer = TruncatedSVD(
+                    n_components=self.svd_components, random_state=0
+                )
+                return normalize(self.reducer.fit_transform(matrix))
+
+        if self.reducer is None:
+            return matrix.toarray()
+        return normalize(self.reducer.transform(matrix))
+
     def fit_predict(
         self,
         registry_map: Dict[str, SignatureEntry],
@@ -76,18 +150,68 @@ class StructureClusterer:
         # fit_predict()
         if n_samples < self.min_cluster_size:
             labels = [0] * n_samples
+            self.is_fitted = False
         else:
-            matrix = self.vectorizer.fit_transform(signatures_as_text)
-            labels = self.clusterer.fit_predict(matrix.toarray())
-
-        conjoined_map = {}
-        for i, cluster_id in enumerate(labels):
-            h = hashes[i]
-            conjoined_map[h] = {
-                "cluster_id": str(cluster_id),
-                "fields": list(registry_map[h]["signature"].keys()),
-                "signature_hash": h,
-                "is_outlier": bool(cluster_id == -1),
-            }
-
-        return conjoined_map
+            matrix = self._to_dense(
+                self.vectorizer.fit_transform(signatures_as_text), fit=True
+            )
+            labels = self.clusterer.fit_predict(matrix)
+            self.index.fit(matrix, labels)
+            self.is_fitted = True
+
+        self.labels_by_hash = {h: int(label) for h, label in zip(hashes, labels)}
+        return build_struct_cluster_map(hashes, labels, registry_map)
+
+    def assign(
+        self,
+        registry_map: Dict[str, SignatureEntry],
+    ) -> Dict[str, StructClusterData]:
+        """Method to place signatures into the clusters of the last fit, without refitting.
+
+        Known signatures keep their label, new ones go to their nearest exemplar's cluster
+        (see `ExemplarIndex`) or become outliers.
+
+        :param registry_map: output of `StructuralAnalyzer.get_signature_map()`
+        :raises RuntimeError: if there is no fitted state to assign against
+        :return: same output as `fit_predict()`
+        """
+        if not self.is_fitted:
+            raise RuntimeError("StructureClusterer has not been fitted")
+
+        hashes = list(registry_map.keys())
+        new_hashes = [h for h in hashes if h not in self.labels_by_hash]
+        if new_hashes:
+            matrix = self._to_dense(
+                self.vectorizer.transform(
+                    [self._to_text(registry_map[h]["signature"]) for h in new_hashes]
+                )
+            )
+            for h, label in zip(new_hashes, self.index.assign(matrix)):
+                self.labels_by_hash[h] = int(label)
+
+        labels = [self.labels_by_hash[h] for h in hashes]
+        return build_struct_cluster_map(hashes, labels, registry_map)
+
+    def get_state(self) -> Dict[str, Any]:
+        """Getter method for the fitted state (picklable)
+
+        :return: fitted vectorizer and reducer, exemplar index and known signature labels
+        """
+        return {
+            "vectorizer": self.vectorizer,
+            "reducer": self.reducer,
+            "index": self.index,
+            "labels_by_hash": self.labels_by_hash,
+            "is_fitted": self.is_fitted,
+        }
+
+    def set_state(self, state: Dict[str, Any]) -> None:
+        """Setter method for a fitted state from `get_state()`
+
+        :param state: fitted state
+        """
+        self.vectorizer = state["vectorizer"]
+        self.reducer = state["reducer"]
+        self.index = state["index"]
+        self.labels_by_hash = state["labels_by_hash"]
+        self.is_fitted = state["is_fitted"]
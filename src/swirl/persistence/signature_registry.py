@@ -104,12 +104,15 @@ class SignatureRegistry:
         etl_lookup_map: Dict[str, ETLMap],
         clusters: Dict[str, List[str]],
         ttl_seconds: int = 86400,
+        replace_clusters: bool = True,
     ) -> None:
         """_summary_
 
         :param etl_lookup_map: _description_
         :param clusters: _description_
         :param ttl_seconds: _description_, defaults to 86400
+        :param replace_clusters: replace the stored cluster sets, defaults to True (False adds
+            the signatures to them, e.g. for signatures assigned to existing clusters)
         :return: _description_
         """
         if not self.redis:
@@ -140,7 +143,8 @@ class SignatureRegistry:
             for sig, hashes in clusters.items():
                 cluster_key = f"{self.cluster_prefix}{sig}"
                 # remove old sets if exist
-                pipe.delete(cluster_key)
+                if replace_clusters:
+                    pipe.delete(cluster_key)
                 # add hash signatures
                 pipe.sadd(cluster_key, *hashes)
                 pipe.expire(cluster_key, ttl_seconds)
@@ -149,6 +153,32 @@ class SignatureRegistry:
 
         return len(metadata_to_store)
 
+    async def register_signature(
+        self,
+        signature_hash: str,
+        metadata: SignatureMetadata,
+        ttl_seconds: int = 86400,
+    ) -> None:
+        """Method to add a single signature to an existing structure cluster (e.g. matched by
+        nearest signature lookup instead of a reclustering run)
+
+        :param signature_hash: signature hash
+        :param metadata: ETL metadata of the signature (cluster ids, base model and parser)
+        :param ttl_seconds: TTL of the metadata hash / cluster set if they don't exist yet,
+            defaults to 86400 (existing keys keep the TTL of their `store_etl_lookup()` run)
+        """
+        if not self.redis:
+            raise RuntimeError("No redis connection!")
+
+        cluster_key = f"{self.cluster_prefix}{metadata.structure_cluster_id}"
+        async with self.redis.pipeline(transaction=True) as pipe:
+            # NX: the keys are shared, a match doesn't extend their expiry
+            pipe.hset(self.meta_key, signature_hash, metadata.model_dump_json())
+            pipe.expire(self.meta_key, ttl_seconds, nx=True)
+            pipe.sadd(cluster_key, signature_hash)
+            pipe.expire(cluster_key, ttl_seconds, nx=True)
+            await pipe.execute()
+
     async def lookup_hash_signature(
         self,
         signature_hash: str,
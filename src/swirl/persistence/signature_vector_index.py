@@ -0,0 +1,227 @@
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Generator, List, Optional
+
+import numpy as np
+import psycopg
+from pgvector.psycopg import register_vector
+from psycopg import sql
+from psycopg.types.json import Jsonb
+
+from swirl.clients.pg_duckdb_client import PGDuckDBClient
+from swirl.utils.log_utils import get_custom_logger
+
+logger = get_custom_logger()
+
+
+def register_vector_types(conn: psycopg.Connection) -> None:
+    """Function to create the pgvector extension and register its types on a new connection,
+    pass it as `PGDuckDBClient(config, configure=register_vector_types)`
+
+    :param conn: new pooled connection
+    """
+    old_autocommit = conn.autocommit
+    try:
+        conn.autocommit = True
+        conn.execute("CREATE EXTENSION IF NOT EXISTS vector")
+        register_vector(conn)
+    finally:
+        conn.autocommit = old_autocommit
+
+
+@dataclass(slots=True)
+class SignatureVector:
+    signature_hash: str
+    semantic_cluster_id: str
+    structure_cluster_id: str
+    fields: List[str]
+    embedding: np.ndarray
+
+
+@dataclass(slots=True)
+class SignatureNeighbor:
+    signature_hash: str
+    semantic_cluster_id: str
+    structure_cluster_id: str
+    fields: List[str]
+    # cosine distance to the query embedding
+    distance: float
+
+
+class SignatureVectorIndex:
+    """pgvector table of the semantic embeddings of every registered signature, keyed by
+    signature hash with its cluster ids, and an HNSW (cosine) index for nearest signature
+    lookups of unseen structures
+
+    Table Structure:
+    ```
+    <schema>.<table>(signature_hash PK, semantic_cluster_id, structure_cluster_id, fields, embedding vector(dim))
+    ```
+    """
+
+    def __init__(
+        self,
+        pg_client: PGDuckDBClient,
+        dim: int = 384,
+        table_name: str = "signature_embeddings",
+        schema_name: str = "public",
+        hnsw_m: int = 16,
+        hnsw_ef_construction: int = 64,
+        ef_search: int = 40,
+    ) -> None:
+        """Init Method
+
+        :param pg_client: postgres client (its pool is reused), created with
+            `configure=register_vector_types`
+        :param dim: embedding dimension, defaults to 384 (all-MiniLM-L6-v2)
+        :param table_name: embedding table name, defaults to "signature_embeddings"
+        :param schema_name: embedding table schema, defaults to "public"
+        :param hnsw_m: HNSW max connections per node, defaults to 16
+        :param hnsw_ef_construction: HNSW build candidate list size, defaults to 64
+        :param ef_search: HNSW query candidate list size (recall vs latency), defaults to 40
+        """
+        self.pg_client = pg_client
+        self.dim = dim
+        self.table_name = table_name
+        self.schema_name = schema_name
+        self.hnsw_m = hnsw_m
+        self.hnsw_ef_construction = hnsw_ef_construction
+        self.ef_search = ef_search
+        self.table = sql.Identifier(schema_name, table_name)
+
+    @contextmanager
+    def _connection(self) -> Generator[psycopg.Connection, None, None]:
+        """Helper context manager for a pooled connection inside a transaction, with DuckDB
+        execution off (vector operators are postgres only)
+        """
+        with self.pg_client.pool.connection() as conn:
+            with conn.transaction():
+                conn.execute("SET LOCAL duckdb.force_execution = false")
+                yield conn
+
+    def create_table(self) -> None:
+        """Method to create the embedding table and HNSW index (if missing), the pgvector
+        extension is created by `register_vector_types()`
+        """
+        with self._connection() as conn:
+            conn.execute(
+                sql.SQL("CREATE SCHEMA IF NOT EXISTS {}").format(
+                    sql.Identifier(self.schema_name)
+                )
+            )
+            conn.execute(
+                sql.SQL("""
+                    CREATE TABLE IF NOT EXISTS {table} (
+                        signature_hash TEXT PRIMARY KEY,
+                        semantic_cluster_id TEXT NOT NULL,
+                        structure_cluster_id TEXT NOT NULL,
+                        fields JSONB NOT NULL,
+                        embedding vector({dim}) NOT NULL,
+                        updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+                    )
+                """).format(table=self.table, dim=sql.Literal(self.dim))
+            )
+            conn.execute(
+                sql.SQL("""
+                    CREATE INDEX IF NOT EXISTS {index} ON {table}
+                    USING hnsw (embedding vector_cosine_ops)
+                    WITH (m = {m}, ef_construction = {ef_construction})
+                """).format(
+                    index=sql.Identifier(f"{self.table_name}_embedding_hnsw"),
+                    table=self.table,
+                    m=sql.Literal(self.hnsw_m),
+                    ef_construction=sql.Literal(self.hnsw_ef_construction),
+                )
+            )
+        logger.info(
+            f"Successfully verified/created table: {self.schema_name}.{self.table_name}"
+        )
+
+    def upsert(self, vectors: List[SignatureVector]) -> None:
+        """Method to insert signature embeddings, known signatures get the new clusters / embedding
+
+        :param vectors: signature embeddings with their cluster ids
+        """
+        if not vectors:
+            return
+
+        query = sql.SQL("""
+            INSERT INTO {table}
+                (signature_hash, semantic_cluster_id, structure_cluster_id, fields, embedding)
+            VALUES (%s, %s, %s, %s, %s)
+            ON CONFLICT (signature_hash) DO UPDATE SET
+                semantic_cluster_id = EXCLUDED.semantic_cluster_id,
+                structure_cluster_id = EXCLUDED.structure_cluster_id,
+                fields = EXCLUDED.fields,
+                embedding = EXCLUDED.embedding,
+                updated_at = now()
+        """).format(table=self.table)
+
+        with self._connection() as conn:
+            with conn.cursor() as cur:
+                cur.executemany(
+                    query,
+                    [
+                        (
+                            v.signature_hash,
+                            v.semantic_cluster_id,
+                            v.structure_cluster_id,
+                            Jsonb(v.fields),
+                            np.asarray(v.embedding, dtype=np.float32),
+                        )
+                        for v in vectors
+                    ],
+                )
+
+    def nearest(
+        self,
+        embeddings: np.ndarray,
+        max_distance: Optional[float] = None,
+    ) -> List[Optional[SignatureNeighbor]]:
+        """Method to find the closest known signature of every embedding (HNSW ANN lookups,
+        one round trip per embedding over a single connection)
+
+        :param embeddings: array of shape (n, dim)
+        :param max_distance: max cosine distance of a match, defaults to None (no limit)
+        :return: closest signature per embedding, None where nothing is within `max_distance`
+        """
+        query = sql.SQL("""
+            SELECT signature_hash, semantic_cluster_id, structure_cluster_id, fields,
+                embedding <=> %(embedding)s AS distance
+            FROM {table}
+            ORDER BY embedding <=> %(embedding)s
+            LIMIT 1
+        """).format(table=self.table)
+
+        neighbors: List[Optional[SignatureNeighbor]] = []
+        with self._connection() as conn:
+            conn.execute(
+                sql.SQL("SET LOCAL hnsw.ef_search = {}").format(
+                    sql.Literal(self.ef_search)
+                )
+            )
+            for embedding in np.asarray(embeddings, dtype=np.float32):
+                row = conn.execute(query, {"embedding": embedding}).fetchone()
+                if row is None or (max_distance is not None and row[4] > max_distance):
+                    neighbors.append(None)
+                    continue
+                neighbors.append(
+                    SignatureNeighbor(
+                        signature_hash=row[0],
+                        semantic_cluster_id=row[1],
+                        structure_cluster_id=row[2],
+                        fields=row[3],
+                        distance=float(row[4]),
+                    )
+                )
+        return neighbors
+
+    def count(self) -> int:
+        """Method to count the indexed signatures"""
+        with self._connection() as conn:
+            query = sql.SQL("SELECT count(*) FROM {table}").format(table=self.table)
+            return conn.execute(query).fetchone()[0]
+
+    def drop_table(self) -> None:
+        """Method to drop the embedding table (and its index)"""
+        self.pg_client.drop_table(self.table_name, schema_name=self.schema_name)
@@ -43,11 +43,21 @@ async def run_dq_agent_task(ctx: Dict[str, Any], data: Dict[str, Any]):
 
         ## do work
         embedding_model = ctx["embedding_model"]
+        parse_cache = ctx.get("parse_cache")
+        embedding_cache = ctx.get("embedding_cache")
+        cluster_orchestrator = ctx.get("cluster_orchestrator")
+        signature_index = ctx.get("signature_index")
+        nearest_max_distance = os.getenv("NEAREST_SIGNATURE_MAX_DISTANCE", "0.1")
 
         orchestrator = DQAgentOrchestrator(
             client=llm_client,
             redis=redis,
             embedding_model=embedding_model,
+            parse_cache=parse_cache,
+            embedding_cache=embedding_cache,
+            cluster_orchestrator=cluster_orchestrator,
+            signature_index=signature_index,
+            nearest_max_distance=float(nearest_max_distance),
         )
 
         # TODO: make this a dataclass
@@ -4,6 +4,9 @@ from dataclasses import asdict, is_dataclass
 
 class DataclassEncoder(json.JSONEncoder):
     def default(self, obj):
+        # reference types (`ClusterRecord`, `ClusterIndex`...) resolve payloads in `to_dict()`
+        if hasattr(obj, "to_dict"):
+            return obj.to_dict()
         if is_dataclass(obj):
             return asdict(obj)
         return super().default(obj)
@@ -0,0 +1,184 @@
+"""Structure clustering scaling benchmark
+
+Every (path, size) pair runs in a fresh spawned process, so peak RSS is per run.
+The "svd" path is the default sparse path, "dense" densifies the full TF-IDF matrix and
+"minhash" is the MinHash / LSH engine.
+
+```bash
+python -m tests.benchmarks.bench_clustering --sizes 1000 10000 100000 --output bench_clustering.json
+```
+"""
+
+import argparse
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from tests.benchmarks.bench_utils import (
+    collect_report,
+    peak_rss_mb,
+    rss_mb,
+    spawn_run,
+    write_report,
+)
+from tests.benchmarks.data_generator import GeneratorConfig, MessyRecordGenerator
+
+PATHS = ["svd", "dense", "minhash"]
+DEFAULT_SIZES = [1_000, 10_000, 50_000, 100_000, 1_000_000]
+# the dense path needs signatures x vocabulary x 8 bytes, larger runs are skipped
+DEFAULT_MAX_DENSE = 20_000
+# HDBSCAN paths above this many signatures are skipped (only the minhash engine runs)
+DEFAULT_MAX_HDBSCAN = 100_000
+
+
+@dataclass(slots=True)
+class ClusteringBenchmarkResult:
+    path: str
+    n_signatures: int
+    n_features: int
+    fit_sec: float
+    assign_ms_per_signature: float
+    n_clusters: int
+    n_outliers: int
+    peak_rss_mb: float
+    input_rss_mb: float
+    skipped: Optional[str] = None
+
+
+def run_benchmark(
+    path: str,
+    n_signatures: int,
+    svd_components: int = 64,
+    n_assign: int = 1_000,
+    seed: int = 42,
+) -> ClusteringBenchmarkResult:
+    """Function to benchmark `StructureClusterer` over a generated signature map (in the current process)
+
+    :param path: one of `PATHS`
+    :param n_signatures: number of distinct signatures to fit
+    :param svd_components: TruncatedSVD dimension of the "svd" path, defaults to 64
+    :param n_assign: number of unseen signatures timed through `assign()`, defaults to 1_000
+    :param seed: signature generator seed, defaults to 42
+    :return: fit time, assign latency and memory figures of the run
+    """
+    try:
+        from swirl.ml_ai.minhash_clustering import MinHashClusterer
+        from swirl.ml_ai.structure_clustering import StructureClusterer
+    except ImportError as e:
+        return ClusteringBenchmarkResult(
+            path, n_signatures, 0, 0.0, 0.0, 0, 0, 0.0, 0.0, skipped=str(e)
+        )
+
+    generator = MessyRecordGenerator(GeneratorConfig(seed=seed))
+    registry_map = generator.signature_map(n_signatures + n_assign)
+    hashes = list(registry_map.keys())
+    fit_map = {h: registry_map[h] for h in hashes[:n_signatures]}
+    input_rss_mb = rss_mb()
+
+    if path == "minhash":
+        clusterer = MinHashClusterer()
+    else:
+        clusterer = StructureClusterer(
+            svd_components=svd_components if path == "svd" else None
+        )
+
+    start = time.perf_counter()
+    fitted = clusterer.fit_predict(fit_map)
+    fit_sec = time.perf_counter() - start
+
+    start = time.perf_counter()
+    clusterer.assign(registry_map)
+    assign_sec = time.perf_counter() - start
+
+    labels = {rec["cluster_id"] for rec in fitted.values()}
+    if path == "minhash":
+        n_features = clusterer.num_perm
+    else:
+        n_features = len(clusterer.vectorizer.vocabulary_)
+    return ClusteringBenchmarkResult(
+        path=path,
+        n_signatures=n_signatures,
+        n_features=n_features,
+        fit_sec=round(fit_sec, 4),
+        assign_ms_per_signature=round(assign_sec / max(n_assign, 1) * 1000, 4),
+        n_clusters=len(labels - {"-1"}),
+        n_outliers=sum(rec["is_outlier"] for rec in fitted.values()),
+        peak_rss_mb=round(peak_rss_mb(), 1),
+        input_rss_mb=round(input_rss_mb, 1),
+    )
+
+
+def run_suite(
+    paths: List[str] = PATHS,
+    sizes: List[int] = DEFAULT_SIZES,
+    svd_components: int = 64,
+    max_dense: int = DEFAULT_MAX_DENSE,
+    max_hdbscan: int = DEFAULT_MAX_HDBSCAN,
+    seed: int = 42,
+) -> Dict[str, Any]:
+    """Function to run every (path, size) pair, each one in a fresh spawned process
+
+    :param paths: clustering paths, defaults to PATHS
+    :param sizes: signature counts, defaults to DEFAULT_SIZES
+    :param svd_components: TruncatedSVD dimension of the "svd" path, defaults to 64
+    :param max_dense: largest signature count run on the "dense" path, defaults to DEFAULT_MAX_DENSE
+    :param max_hdbscan: largest signature count run on the HDBSCAN paths, defaults to DEFAULT_MAX_HDBSCAN
+    :param seed: signature generator seed, defaults to 42
+    :return: JSON serializable report with run metadata and one result per run
+    """
+
+    def runs() -> Iterator[Tuple[str, ClusteringBenchmarkResult]]:
+        for path in paths:
+            for n_signatures in sizes:
+                skipped = None
+                if path == "dense" and n_signatures > max_dense:
+                    skipped = f"more than max_dense={max_dense} signatures"
+                elif path != "minhash" and n_signatures > max_hdbscan:
+                    skipped = f"more than max_hdbscan={max_hdbscan} signatures"
+
+                if skipped:
+                    result = ClusteringBenchmarkResult(
+                        path, n_signatures, 0, 0.0, 0.0, 0, 0, 0.0, 0.0, skipped=skipped
+                    )
+                else:
+                    result = spawn_run(
+                        run_benchmark, path, n_signatures, svd_components, 1_000, seed
+                    )
+                yield f"{path} n={n_signatures}", result
+
+    return collect_report(
+        runs(),
+        lambda result: (
+            f"fit={result.fit_sec}s, "
+            f"assign={result.assign_ms_per_signature}ms/sig, "
+            f"peak_rss={result.peak_rss_mb}MB"
+        ),
+        svd_components=svd_components,
+        seed=seed,
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--paths", nargs="+", choices=PATHS, default=PATHS)
+    arg_parser.add_argument("--sizes", nargs="+", type=int, default=DEFAULT_SIZES)
+    arg_parser.add_argument("--svd-components", type=int, default=64)
+    arg_parser.add_argument("--max-dense", type=int, default=DEFAULT_MAX_DENSE)
+    arg_parser.add_argument("--max-hdbscan", type=int, default=DEFAULT_MAX_HDBSCAN)
+    arg_parser.add_argument("--seed", type=int, default=42)
+    arg_parser.add_argument("--output", default="bench_clustering.json")
+    args = arg_parser.parse_args(argv)
+
+    report = run_suite(
+        paths=args.paths,
+        sizes=args.sizes,
+        svd_components=args.svd_components,
+        max_dense=args.max_dense,
+        max_hdbscan=args.max_hdbscan,
+        seed=args.seed,
+    )
+    write_report(report, args.output)
+
+
+if __name__ == "__main__":
+    main()
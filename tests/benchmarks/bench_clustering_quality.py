@@ -0,0 +1,289 @@
+"""Clustering speed / quality benchmark
+
+Every (config, size) pair runs in a fresh spawned process over a generated signature map
+with a known grouping (see `MessyRecordGenerator.labelled_signature_map()`), and reports
+fit time, peak RSS and agreement with the ground truth (ARI and purity). Configs are named
+`StructureClusterParams` / `SemanticClusterParams` sets, see `CONFIGS`.
+
+```bash
+python -m tests.benchmarks.bench_clustering_quality --sizes 100 1000 10000 100000 \
+    --output bench_clustering_quality.json
+```
+"""
+
+import argparse
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from tests.benchmarks.bench_clustering import DEFAULT_MAX_DENSE, DEFAULT_MAX_HDBSCAN
+from tests.benchmarks.bench_utils import (
+    collect_report,
+    peak_rss_mb,
+    rss_mb,
+    spawn_run,
+    write_report,
+)
+from tests.benchmarks.data_generator import GeneratorConfig, MessyRecordGenerator
+
+DEFAULT_SIZES = [100, 1_000, 10_000, 100_000]
+# semantic HDBSCAN (cosine) computes all pairwise distances, larger runs are skipped
+DEFAULT_MAX_SEMANTIC = 10_000
+
+# config name -> (clusterer kind, params kwargs)
+CONFIGS: Dict[str, Tuple[str, Dict[str, Any]]] = {
+    "structure_svd": ("structure", {}),
+    "structure_dense": ("structure", {"svd_components": None}),
+    "structure_word_tfidf": (
+        "structure",
+        {"tfidf_analyzer": "word", "tfidf_ngram_range": (1, 1)},
+    ),
+    "structure_minhash": ("structure", {"engine": "minhash"}),
+    "structure_minhash_loose": (
+        "structure",
+        {"engine": "minhash", "minhash_threshold": 0.3},
+    ),
+    "semantic_signature": ("semantic", {}),
+    "semantic_field_tokens": ("semantic", {"embedding_mode": "field_tokens"}),
+    "semantic_signature_onnx": ("semantic", {"embedding_backend": "onnx"}),
+    "semantic_field_tokens_onnx": (
+        "semantic",
+        {"embedding_mode": "field_tokens", "embedding_backend": "onnx"},
+    ),
+}
+
+
+@dataclass(slots=True)
+class ClusteringQualityResult:
+    config: str
+    n_signatures: int
+    n_groups: int
+    fit_sec: float
+    n_clusters: int
+    outlier_rate: float
+    ari: float
+    purity: float
+    peak_rss_mb: float
+    input_rss_mb: float
+    skipped: Optional[str] = None
+
+
+def _skipped(config: str, n_signatures: int, reason: str) -> ClusteringQualityResult:
+    return ClusteringQualityResult(
+        config, n_signatures, 0, 0.0, 0, 0.0, 0.0, 0.0, 0.0, 0.0, skipped=reason
+    )
+
+
+def purity(labels_true: np.ndarray, labels_pred: np.ndarray) -> float:
+    """Function to compute the share of signatures that belong to the majority ground truth
+    group of their predicted cluster
+
+    :param labels_true: ground truth group ids
+    :param labels_pred: predicted cluster ids (outliers as singleton clusters)
+    :return: purity between 0.0 and 1.0
+    """
+    if len(labels_true) == 0:
+        return 0.0
+    _, true_idx = np.unique(labels_true, return_inverse=True)
+    _, pred_idx = np.unique(labels_pred, return_inverse=True)
+    # majority count per predicted cluster over the sparse contingency table
+    pairs, counts = np.unique(
+        np.stack([pred_idx, true_idx], axis=1), axis=0, return_counts=True
+    )
+    majority = np.zeros(pred_idx.max() + 1, dtype=np.int64)
+    np.maximum.at(majority, pairs[:, 0], counts)
+    return float(majority.sum() / len(labels_true))
+
+
+def predicted_labels(
+    kind: str, cluster_map: Dict[str, Any], hashes: List[str]
+) -> Tuple[np.ndarray, int, int]:
+    """Function to align a clusterer's output with the signature hashes, every outlier
+    becomes its own singleton cluster
+
+    :param kind: "structure" or "semantic"
+    :param cluster_map: output of the clusterer's `fit_predict()`
+    :param hashes: signature hashes
+    :return: tuple of (predicted labels, number of clusters, number of outliers)
+    """
+    by_hash: Dict[str, Tuple[str, bool]] = {}
+    if kind == "structure":
+        for h, rec in cluster_map.items():
+            by_hash[h] = (rec["cluster_id"], rec["is_outlier"])
+    else:
+        for cluster_id, records in cluster_map.items():
+            for rec in records:
+                by_hash[rec["signature_hash"]] = (cluster_id, rec["is_outlier"])
+
+    label_ids: Dict[str, int] = {}
+    labels = np.empty(len(hashes), dtype=np.int64)
+    n_outliers = 0
+    for i, h in enumerate(hashes):
+        cluster_id, is_outlier = by_hash[h]
+        if is_outlier:
+            n_outliers += 1
+            cluster_id = f"outlier:{h}"
+        labels[i] = label_ids.setdefault(cluster_id, len(label_ids))
+
+    return labels, len(label_ids) - n_outliers, n_outliers
+
+
+def run_benchmark(
+    config: str,
+    n_signatures: int,
+    n_groups: Optional[int] = None,
+    seed: int = 42,
+    model_cache_dir: str = "./.models",
+) -> ClusteringQualityResult:
+    """Function to benchmark one clustering config over a labelled signature map (in the current process)
+
+    :param config: one of `CONFIGS`
+    :param n_signatures: number of distinct signatures
+    :param n_groups: number of ground truth groups, defaults to None (generator default)
+    :param seed: signature generator seed, defaults to 42
+    :param model_cache_dir: embedding model cache directory, defaults to "./.models"
+    :return: fit time, memory and quality figures of the run
+    """
+    kind, params = CONFIGS[config]
+    try:
+        from sklearn.metrics import adjusted_rand_score
+
+        from swirl.ml_ai.clustering import SemanticClusterParams, StructureClusterParams
+        from swirl.ml_ai.semantic_clustering import SemanticClusterer
+    except ImportError as e:
+        return _skipped(config, n_signatures, str(e))
+
+    generator = MessyRecordGenerator(GeneratorConfig(seed=seed))
+    registry_map, groups = generator.labelled_signature_map(n_signatures, n_groups)
+    hashes = list(registry_map.keys())
+    labels_true = np.array([groups[h] for h in hashes])
+    input_rss_mb = rss_mb()
+
+    try:
+        if kind == "structure":
+            clusterer = StructureClusterParams(**params).build_clusterer()
+        else:
+            semantic_params = SemanticClusterParams(
+                model_cache_dir=model_cache_dir, **params
+            )
+            clusterer = SemanticClusterer(**semantic_params.to_dict())
+    except (ImportError, OSError) as e:
+        return _skipped(config, n_signatures, str(e))
+
+    start = time.perf_counter()
+    cluster_map = clusterer.fit_predict(registry_map)
+    fit_sec = time.perf_counter() - start
+
+    labels_pred, n_clusters, n_outliers = predicted_labels(kind, cluster_map, hashes)
+    return ClusteringQualityResult(
+        config=config,
+        n_signatures=n_signatures,
+        n_groups=len(set(groups.values())),
+        fit_sec=round(fit_sec, 4),
+        n_clusters=n_clusters,
+        outlier_rate=round(n_outliers / max(n_signatures, 1), 4),
+        ari=round(float(adjusted_rand_score(labels_true, labels_pred)), 4),
+        purity=round(purity(labels_true, labels_pred), 4),
+        peak_rss_mb=round(peak_rss_mb(), 1),
+        input_rss_mb=round(input_rss_mb, 1),
+    )
+
+
+def run_suite(
+    configs: Optional[List[str]] = None,
+    sizes: List[int] = DEFAULT_SIZES,
+    n_groups: Optional[int] = None,
+    max_dense: int = DEFAULT_MAX_DENSE,
+    max_hdbscan: int = DEFAULT_MAX_HDBSCAN,
+    max_semantic: int = DEFAULT_MAX_SEMANTIC,
+    seed: int = 42,
+    model_cache_dir: str = "./.models",
+) -> Dict[str, Any]:
+    """Function to run every (config, size) pair, each one in a fresh spawned process
+
+    :param configs: config names, defaults to None (every one of `CONFIGS`)
+    :param sizes: signature counts, defaults to DEFAULT_SIZES
+    :param n_groups: number of ground truth groups, defaults to None (generator default)
+    :param max_dense: largest signature count run with `svd_components=None`, defaults to DEFAULT_MAX_DENSE
+    :param max_hdbscan: largest signature count run on the structure HDBSCAN engine, defaults to DEFAULT_MAX_HDBSCAN
+    :param max_semantic: largest signature count run on the semantic configs, defaults to DEFAULT_MAX_SEMANTIC
+    :param seed: signature generator seed, defaults to 42
+    :param model_cache_dir: embedding model cache directory, defaults to "./.models"
+    :return: JSON serializable report with run metadata and one result per run
+    """
+    if configs is None:
+        configs = list(CONFIGS)
+
+    def runs() -> Iterator[Tuple[str, ClusteringQualityResult]]:
+        for config in configs:
+            kind, params = CONFIGS[config]
+            for n_signatures in sizes:
+                skipped = None
+                if kind == "semantic" and n_signatures > max_semantic:
+                    skipped = f"more than max_semantic={max_semantic} signatures"
+                elif (
+                    kind == "structure" and params.get("engine", "hdbscan") == "hdbscan"
+                ):
+                    dense = params.get("svd_components", 64) is None
+                    if dense and n_signatures > max_dense:
+                        skipped = f"more than max_dense={max_dense} signatures"
+                    elif n_signatures > max_hdbscan:
+                        skipped = f"more than max_hdbscan={max_hdbscan} signatures"
+
+                if skipped:
+                    result = _skipped(config, n_signatures, skipped)
+                else:
+                    result = spawn_run(
+                        run_benchmark,
+                        config,
+                        n_signatures,
+                        n_groups,
+                        seed,
+                        model_cache_dir,
+                    )
+                yield f"{config} n={n_signatures}", result
+
+    return collect_report(
+        runs(),
+        lambda result: (
+            f"fit={result.fit_sec}s, ari={result.ari}, purity={result.purity}, "
+            f"peak_rss={result.peak_rss_mb}MB"
+        ),
+        configs={name: CONFIGS[name] for name in configs},
+        n_groups=n_groups,
+        seed=seed,
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument(
+        "--configs", nargs="+", choices=list(CONFIGS), default=list(CONFIGS)
+    )
+    arg_parser.add_argument("--sizes", nargs="+", type=int, default=DEFAULT_SIZES)
+    arg_parser.add_argument("--n-groups", type=int, default=None)
+    arg_parser.add_argument("--max-dense", type=int, default=DEFAULT_MAX_DENSE)
+    arg_parser.add_argument("--max-hdbscan", type=int, default=DEFAULT_MAX_HDBSCAN)
+    arg_parser.add_argument("--max-semantic", type=int, default=DEFAULT_MAX_SEMANTIC)
+    arg_parser.add_argument("--seed", type=int, default=42)
+    arg_parser.add_argument("--model-cache-dir", default="./.models")
+    arg_parser.add_argument("--output", default="bench_clustering_quality.json")
+    args = arg_parser.parse_args(argv)
+
+    report = run_suite(
+        configs=args.configs,
+        sizes=args.sizes,
+        n_groups=args.n_groups,
+        max_dense=args.max_dense,
+        max_hdbscan=args.max_hdbscan,
+        max_semantic=args.max_semantic,
+        seed=args.seed,
+        model_cache_dir=args.model_cache_dir,
+    )
+    write_report(report, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""Embedding backend benchmark
+
+Every backend runs in a fresh spawned process, so startup time (imports + model load)
+and RSS are per backend. The onnx backend needs an export (see `export_onnx_model()`).
+
+```bash
+python -m tests.benchmarks.bench_embedding --n-texts 10000 --output bench_embedding.json
+```
+"""
+
+import argparse
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from tests.benchmarks.bench_utils import (
+    collect_report,
+    peak_rss_mb,
+    rss_mb,
+    spawn_run,
+    write_report,
+)
+from tests.benchmarks.data_generator import GeneratorConfig, MessyRecordGenerator
+
+BACKENDS = ["sentence_transformers", "onnx"]
+
+
+@dataclass(slots=True)
+class EmbeddingBenchmarkResult:
+    backend: str
+    n_texts: int
+    batch_size: int
+    startup_sec: float
+    texts_per_sec: float
+    model_rss_mb: float
+    peak_rss_mb: float
+    skipped: Optional[str] = None
+
+
+def signature_texts(n_texts: int, seed: int = 42) -> List[str]:
+    """Function to generate semantic clustering inputs ("field:<key> ..." strings)
+
+    :param n_texts: number of texts
+    :param seed: signature generator seed, defaults to 42
+    :return: signature texts
+    """
+    generator = MessyRecordGenerator(GeneratorConfig(seed=seed))
+    registry_map = generator.signature_map(n_texts)
+    return [
+        " ".join(f"field:{k}" for k in sorted(entry["signature"]))
+        for entry in registry_map.values()
+    ]
+
+
+def run_benchmark(
+    backend: str,
+    n_texts: int,
+    batch_size: int = 64,
+    model_name: str = "all-MiniLM-L6-v2",
+    cache_folder: str = "./.models",
+) -> EmbeddingBenchmarkResult:
+    """Function to benchmark a single embedding backend (in the current process)
+
+    :param backend: one of `BACKENDS`
+    :param n_texts: number of texts to encode
+    :param batch_size: texts per encode batch, defaults to 64
+    :param model_name: sentence transformer model name, defaults to "all-MiniLM-L6-v2"
+    :param cache_folder: model cache directory, defaults to "./.models"
+    :return: startup time, encode throughput and memory figures of the run
+    """
+    texts = signature_texts(n_texts)
+    base_rss_mb = rss_mb()
+
+    start = time.perf_counter()
+    try:
+        from swirl.ml_ai.embedding_model import load_embedding_model
+
+        model = load_embedding_model(
+            model_name, backend=backend, cache_folder=cache_folder
+        )
+    except (ImportError, OSError) as e:
+        return EmbeddingBenchmarkResult(
+            backend, n_texts, batch_size, 0.0, 0.0, 0.0, 0.0, skipped=str(e)
+        )
+    startup_sec = time.perf_counter() - start
+    model_rss_mb = rss_mb() - base_rss_mb
+
+    # warm up (first call allocates the session / graph buffers)
+    model.encode(texts[:batch_size], batch_size=batch_size)
+
+    start = time.perf_counter()
+    model.encode(texts, batch_size=batch_size)
+    encode_sec = time.perf_counter() - start
+
+    return EmbeddingBenchmarkResult(
+        backend=backend,
+        n_texts=n_texts,
+        batch_size=batch_size,
+        startup_sec=round(startup_sec, 3),
+        texts_per_sec=round(n_texts / encode_sec, 1) if encode_sec else 0.0,
+        model_rss_mb=round(model_rss_mb, 1),
+        peak_rss_mb=round(peak_rss_mb(), 1),
+    )
+
+
+def run_suite(
+    backends: List[str] = BACKENDS,
+    n_texts: int = 10_000,
+    batch_size: int = 64,
+    cache_folder: str = "./.models",
+) -> Dict[str, Any]:
+    """Function to run every backend, each one in a fresh spawned process
+
+    :param backends: embedding backends, defaults to BACKENDS
+    :param n_texts: number of texts to encode, defaults to 10_000
+    :param batch_size: texts per encode batch, defaults to 64
+    :param cache_folder: model cache directory, defaults to "./.models"
+    :return: JSON serializable report with run metadata and one result per backend
+    """
+    runs = (
+        (
+            backend,
+            spawn_run(
+                run_benchmark, backend, n_texts, batch_size, cache_folder=cache_folder
+            ),
+        )
+        for backend in backends
+    )
+    return collect_report(
+        runs,
+        lambda result: (
+            f"startup={result.startup_sec}s, {result.texts_per_sec} texts/s, "
+            f"model_rss={result.model_rss_mb}MB"
+        ),
+        n_texts=n_texts,
+        batch_size=batch_size,
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--backends", nargs="+", choices=BACKENDS, default=BACKENDS)
+    arg_parser.add_argument("--n-texts", type=int, default=10_000)
+    arg_parser.add_argument("--batch-size", type=int, default=64)
+    arg_parser.add_argument("--cache-folder", default="./.models")
+    arg_parser.add_argument("--output", default="bench_embedding.json")
+    args = arg_parser.parse_args(argv)
+
+    report = run_suite(
+        backends=args.backends,
+        n_texts=args.n_texts,
+        batch_size=args.batch_size,
+        cache_folder=args.cache_folder,
+    )
+    write_report(report, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+"""Ingestion layer benchmark suite
+
+Every (target, size) pair runs in a fresh spawned process, so peak RSS is per run.
+
+```bash
+python -m tests.benchmarks.bench_ingestion --sizes 1000 100000 --output bench_results.json
+```
+"""
+
+import argparse
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from tests.benchmarks.bench_utils import (
+    collect_report,
+    peak_rss_mb,
+    rss_mb,
+    spawn_run,
+    write_report,
+)
+from tests.benchmarks.data_generator import GeneratorConfig, MessyRecordGenerator
+
+TARGETS = ["grammar_parser", "rust_smart_parse_batch", "generate_fingerprint"]
+DEFAULT_SIZES = [1_000, 10_000, 100_000, 1_000_000, 10_000_000]
+
+
+@dataclass(slots=True)
+class BenchmarkResult:
+    target: str
+    n_records: int
+    batch_size: int
+    total_sec: float
+    records_per_sec: float
+    p50_batch_ms: float
+    p99_batch_ms: float
+    peak_rss_mb: float
+    corpus_rss_mb: float
+    skipped: Optional[str] = None
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[idx]
+
+
+def _make_batch_fns(
+    target: str,
+) -> Tuple[Optional[Callable[[List[str]], Any]], Callable[[Any], Any]]:
+    """Function to build the per-batch callables of a benchmark target
+
+    :param target: one of `TARGETS`
+    :raises ImportError: if the target's dependencies aren't installed / built
+    :return: tuple of (untimed batch preparation or None, timed batch callable)
+    """
+    if target == "grammar_parser":
+        from swirl.ingestion.grammar_parser import GrammarParser
+
+        parser = GrammarParser()
+        return None, lambda batch: [parser.smart_parse(rec) for rec in batch]
+
+    if target == "rust_smart_parse_batch":
+        from swirl.ingestion.rust_ingestion import smart_parse_batch
+
+        return None, smart_parse_batch
+
+    if target == "generate_fingerprint":
+        from swirl.ingestion.structure_analyzer import StructuralAnalyzer
+
+        try:
+            from swirl.ingestion.rust_ingestion import smart_parse_batch
+        except ImportError:
+            from swirl.ingestion.py_ingestion import smart_parse_batch
+
+        analyzer = StructuralAnalyzer()
+
+        def fingerprint_batch(batch: List[Tuple[str, Dict[str, Any]]]) -> List[Any]:
+            return [
+                analyzer.generate_fingerprint(raw, parsed, store_in_map=False)
+                for raw, parsed in batch
+            ]
+
+        # parsing isn't part of this target, it runs before the timer starts
+        return smart_parse_batch, fingerprint_batch
+
+    raise ValueError(f"unknown benchmark target: {target}")
+
+
+def run_benchmark(
+    target: str,
+    n_records: int,
+    batch_size: int = 10_000,
+    config: GeneratorConfig = GeneratorConfig(),
+) -> BenchmarkResult:
+    """Function to benchmark a single target over a generated corpus (in the current process)
+
+    :param target: one of `TARGETS`
+    :param n_records: corpus size
+    :param batch_size: number of records per timed batch, defaults to 10_000
+    :param config: corpus generator config, defaults to GeneratorConfig()
+    :return: throughput, batch latency and memory figures of the run
+    """
+    try:
+        prepare, batch_fn = _make_batch_fns(target)
+    except ImportError as e:
+        return BenchmarkResult(
+            target, n_records, batch_size, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, skipped=str(e)
+        )
+
+    corpus = list(MessyRecordGenerator(config).generate(n_records))
+    batches = [corpus[i : i + batch_size] for i in range(0, n_records, batch_size)]
+    if prepare is not None:
+        batches = [prepare(batch) for batch in batches]
+    corpus_rss_mb = rss_mb()
+
+    latencies = []
+    for batch in batches:
+        start = time.perf_counter()
+        batch_fn(batch)
+        latencies.append(time.perf_counter() - start)
+
+    total_sec = sum(latencies)
+    return BenchmarkResult(
+        target=target,
+        n_records=n_records,
+        batch_size=batch_size,
+        total_sec=round(total_sec, 4),
+        records_per_sec=round(n_records / total_sec, 1) if total_sec else 0.0,
+        p50_batch_ms=round(_percentile(latencies, 50) * 1000, 3),
+        p99_batch_ms=round(_percentile(latencies, 99) * 1000, 3),
+        peak_rss_mb=round(peak_rss_mb(), 1),
+        corpus_rss_mb=round(corpus_rss_mb, 1),
+    )
+
+
+def run_suite(
+    targets: List[str] = TARGETS,
+    sizes: List[int] = DEFAULT_SIZES,
+    batch_size: int = 10_000,
+    config: GeneratorConfig = GeneratorConfig(),
+) -> Dict[str, Any]:
+    """Function to run every (target, size) pair, each one in a fresh spawned process
+
+    :param targets: benchmark targets, defaults to TARGETS
+    :param sizes: corpus sizes, defaults to DEFAULT_SIZES
+    :param batch_size: number of records per timed batch, defaults to 10_000
+    :param config: corpus generator config, defaults to GeneratorConfig()
+    :return: JSON serializable report with run metadata and one result per run
+    """
+    runs = (
+        (
+            f"{target} n={n_records}",
+            spawn_run(run_benchmark, target, n_records, batch_size, config),
+        )
+        for target in targets
+        for n_records in sizes
+    )
+    return collect_report(
+        runs,
+        lambda result: (
+            f"{result.records_per_sec} rec/s, p99={result.p99_batch_ms}ms, "
+            f"peak_rss={result.peak_rss_mb}MB"
+        ),
+        batch_size=batch_size,
+        generator=asdict(config),
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--targets", nargs="+", choices=TARGETS, default=TARGETS)
+    arg_parser.add_argument("--sizes", nargs="+", type=int, default=DEFAULT_SIZES)
+    arg_parser.add_argument("--batch-size", type=int, default=10_000)
+    arg_parser.add_argument("--seed", type=int, default=42)
+    arg_parser.add_argument("--output", default="bench_results.json")
+    args = arg_parser.parse_args(argv)
+
+    report = run_suite(
+        targets=args.targets,
+        sizes=args.sizes,
+        batch_size=args.batch_size,
+        config=GeneratorConfig(seed=args.seed),
+    )
+    write_report(report, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Shared harness of the benchmark suites
+
+Every run goes through `spawn_run()` in a fresh spawned process (so peak RSS and import
+costs are per run), `collect_report()` logs the results and adds the run metadata, and
+`write_report()` dumps the JSON report.
+"""
+
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, Tuple, TypeVar
+
+from swirl.utils.log_utils import get_custom_logger
+
+logger = get_custom_logger()
+
+T = TypeVar("T")
+
+
+def rss_mb() -> float:
+    """current resident set size in MB (linux), falls back to the peak RSS"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024**2
+    except OSError:
+        return peak_rss_mb()
+
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # bytes on macOS, kilobytes on linux
+    return peak / 1024**2 if sys.platform == "darwin" else peak / 1024
+
+
+def spawn_run(fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Function to run one benchmark in a fresh spawned process
+
+    :param fn: module level benchmark function (picklable), with picklable arguments
+    :return: return value of `fn(*args, **kwargs)`
+    """
+    ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as executor:
+        return executor.submit(fn, *args, **kwargs).result()
+
+
+def collect_report(
+    runs: Iterable[Tuple[str, Any]],
+    summarize: Callable[[Any], str],
+    **meta: Any,
+) -> Dict[str, Any]:
+    """Function to log every benchmark result and build the JSON report of a suite
+
+    :param runs: (label, result) pairs, results are dataclasses with a `skipped` reason
+    :param summarize: one line summary of a result that wasn't skipped
+    :param meta: suite parameters, added to the run metadata
+    :return: JSON serializable report with run metadata and one result per run
+    """
+    results = []
+    for label, result in runs:
+        if result.skipped:
+            logger.warning(f"[Benchmark] {label} skipped: {result.skipped}")
+        else:
+            logger.info(f"[Benchmark] {label}: {summarize(result)}")
+        results.append(asdict(result))
+
+    return {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            **meta,
+        },
+        "results": results,
+    }
+
+
+def write_report(report: Dict[str, Any], output: str) -> None:
+    """Function to write a suite report as JSON
+
+    :param report: output of `collect_report()`
+    :param output: JSON file path
+    """
+    with open(output, "w") as f:
+        json.dump(report, f, indent=4)
+    logger.info(f"[Benchmark] results written to {output}")
@@ -0,0 +1,356 @@
+import hashlib
+import json
+import random
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+FIRST_NAMES = ["John", "Sarah", "Raj", "Elena", "Chris", "Amanda", "Mike", "Chen"]
+LAST_NAMES = ["Davis", "Liu", "Patel", "Rossi", "Myers", "Smith", "Turner", "Wei"]
+CITIES = [
+    ("Columbus", "OH"),
+    ("Seattle", "WA"),
+    ("Miami", "FL"),
+    ("Denver", "CO"),
+    ("Portland", "OR"),
+    ("Austin", "TX"),
+    ("Cleveland", "OH"),
+]
+PRODUCTS = ["laptop", "hdmi cable", "monitor", "stand", "desk lamp", "keyboard"]
+ROLES = ["admin", "editor", "viewer"]
+KV_DELIMITERS = ["=", ": ", "= ", " : "]
+# flattened field paths of the three record families
+FIELD_FAMILIES = [
+    ["Order", "Buyer", "Location", "Total", "Items"],
+    ["id", "name", "email", "role", "isActive", "createdAt", "lastLoginIp"],
+    [
+        "order_id",
+        "buyer.name",
+        "buyer.address.city",
+        "buyer.address.state",
+        "buyer.tier",
+        "items",
+        "total",
+    ],
+]
+EXTRA_FIELDS = ["note", "tag", "source", "ref", "meta", "flag", "code", "region"]
+# word pools of the synthetic schemas of `labelled_signature_map()`
+ENTITY_WORDS = [
+    "order",
+    "buyer",
+    "user",
+    "account",
+    "invoice",
+    "payment",
+    "shipment",
+    "address",
+    "product",
+    "customer",
+    "session",
+    "device",
+    "event",
+    "ticket",
+    "employee",
+    "vendor",
+    "contract",
+    "asset",
+]
+ATTRIBUTE_WORDS = [
+    "id",
+    "name",
+    "email",
+    "status",
+    "type",
+    "total",
+    "amount",
+    "currency",
+    "city",
+    "state",
+    "country",
+    "created",
+    "updated",
+    "count",
+    "price",
+    "code",
+    "date",
+    "phone",
+    "score",
+    "tier",
+    "url",
+    "ip",
+]
+NAMING_STYLES = ["snake", "camel", "pascal", "dotted"]
+
+
+@dataclass(slots=True)
+class GeneratorConfig:
+    """Knobs for `MessyRecordGenerator`
+
+    * kind weights pick the record family: KV orders (like `MESSY_SAMPLE_DATA`),
+      flat JSON users and nested JSON orders
+    * rates are per field (`typo_rate`, `missing_rate`) or per record (`drift_rate`),
+      key order drift ramps up linearly over the corpus
+    """
+
+    kv_weight: float = 0.6
+    json_user_weight: float = 0.3
+    nested_json_weight: float = 0.1
+    typo_rate: float = 0.02
+    missing_rate: float = 0.05
+    drift_rate: float = 0.2
+    seed: int = 42
+
+
+class MessyRecordGenerator:
+    """Reproducible generator of synthetic messy records for the ingestion benchmarks"""
+
+    def __init__(self, config: GeneratorConfig = GeneratorConfig()) -> None:
+        """Init Method
+
+        :param config: variation knobs, defaults to GeneratorConfig()
+        """
+        self.config = config
+        self.rng = random.Random(config.seed)
+
+    def _typo(self, key: str) -> str:
+        """Method to misspell a key (insert, drop or swap a character), e.g. "Location" -> "Locadtion"
+
+        :param key: field name
+        :return: misspelled field name
+        """
+        if len(key) < 3 or self.rng.random() >= self.config.typo_rate:
+            return key
+        i = self.rng.randrange(1, len(key) - 1)
+        op = self.rng.randrange(3)
+        if op == 0:
+            return key[:i] + self.rng.choice("abcdefghijklmnopqrstuvwxyz") + key[i:]
+        if op == 1:
+            return key[:i] + key[i + 1 :]
+        return key[: i - 1] + key[i] + key[i - 1] + key[i + 1 :]
+
+    def _vary(
+        self,
+        fields: List[Tuple[str, Any]],
+        progress: float,
+    ) -> List[Tuple[str, Any]]:
+        """Method to apply missing fields, typos and key order drift to a record's fields
+
+        :param fields: ordered (key, value) pairs, the first one is always kept
+        :param progress: position of the record in the corpus (0.0 to 1.0)
+        :return: varied (key, value) pairs
+        """
+        head, rest = fields[0], fields[1:]
+        rest = [
+            (self._typo(k), v)
+            for k, v in rest
+            if self.rng.random() >= self.config.missing_rate
+        ]
+        if self.rng.random() < self.config.drift_rate * progress:
+            self.rng.shuffle(rest)
+        return [head] + rest
+
+    def _name(self) -> str:
+        return f"{self.rng.choice(FIRST_NAMES)} {self.rng.choice(LAST_NAMES)}"
+
+    def kv_order(self, i: int, progress: float) -> str:
+        """Method to generate a key value order line, e.g.
+        "Order 1001: Buyer=John Davis, Location=Columbus, OH, Total=$742.10, Items: laptop"
+
+        :param i: record index
+        :param progress: position of the record in the corpus (0.0 to 1.0)
+        :return: raw record string
+        """
+        city, state = self.rng.choice(CITIES)
+        items = self.rng.sample(PRODUCTS, self.rng.randint(0, 3))
+        fields = self._vary(
+            [
+                ("Order", 1000 + i),
+                ("Buyer", self._name()),
+                ("Location", f"{city}, {state}"),
+                ("Total", f"${self.rng.uniform(0, 2000):,.2f}"),
+                ("Items", ", ".join(items)),
+            ],
+            progress,
+        )
+        (_, order_id), rest = fields[0], fields[1:]
+        body = ", ".join(f"{k}{self.rng.choice(KV_DELIMITERS)}{v}" for k, v in rest)
+        return f"Order {order_id}: {body}"
+
+    def json_user(self, i: int, progress: float) -> str:
+        """Method to generate a flat JSON user record
+
+        :param i: record index
+        :param progress: position of the record in the corpus (0.0 to 1.0)
+        :return: raw record string
+        """
+        name = self._name()
+        fields = self._vary(
+            [
+                ("id", f"usr_{i:07d}" if self.rng.random() < 0.9 else i),
+                ("name", name),
+                ("email", f"{name.lower().replace(' ', '.')}@example.com"),
+                ("role", self.rng.choice(ROLES)),
+                ("isActive", self.rng.choice([True, False, None])),
+                ("createdAt", f"2025-{self.rng.randint(1, 12):02d}-02T09:14:23Z"),
+                ("lastLoginIp", f"192.168.1.{self.rng.randint(1, 254)}"),
+            ],
+            progress,
+        )
+        return json.dumps(dict(fields))
+
+    def nested_json(self, i: int, progress: float) -> str:
+        """Method to generate a nested JSON order record
+
+        :param i: record index
+        :param progress: position of the record in the corpus (0.0 to 1.0)
+        :return: raw record string
+        """
+        city, state = self.rng.choice(CITIES)
+        buyer: Dict[str, Any] = dict(
+            self._vary(
+                [
+                    ("name", self._name()),
+                    ("address", {"city": city, "state": state}),
+                    ("tier", self.rng.choice(["gold", "silver", None])),
+                ],
+                progress,
+            )
+        )
+        items = [
+            {"sku": self.rng.choice(PRODUCTS), "qty": self.rng.randint(1, 5)}
+            for _ in range(self.rng.randint(0, 3))
+        ]
+        fields = self._vary(
+            [
+                ("order_id", 1000 + i),
+                ("buyer", buyer),
+                ("items", items),
+                ("total", round(self.rng.uniform(0, 2000), 2)),
+            ],
+            progress,
+        )
+        return json.dumps(dict(fields))
+
+    def generate(self, n_records: int) -> Iterator[str]:
+        """Method to lazily generate `n_records` raw record strings
+
+        :param n_records: number of records
+        :return: iterator of raw record strings
+        """
+        makers = [self.kv_order, self.json_user, self.nested_json]
+        weights = [
+            self.config.kv_weight,
+            self.config.json_user_weight,
+            self.config.nested_json_weight,
+        ]
+        for i in range(n_records):
+            maker = self.rng.choices(makers, weights)[0]
+            yield maker(i, i / n_records)
+
+    def _schema(self) -> List[Tuple[str, str]]:
+        """Method to draw a synthetic schema: 5 to 9 (entity, attribute) field name parts,
+        mostly of one primary entity
+
+        :return: field name parts, the first one is the primary entity's id
+        """
+        entity = self.rng.choice(ENTITY_WORDS)
+        parts = [(entity, "id")]
+        n_fields = self.rng.randint(5, 9)
+        while len(parts) < n_fields:
+            owner = entity if self.rng.random() < 0.6 else self.rng.choice(ENTITY_WORDS)
+            part = (owner, self.rng.choice(ATTRIBUTE_WORDS))
+            if part not in parts:
+                parts.append(part)
+        return parts
+
+    @staticmethod
+    def _render(part: Tuple[str, str], style: str) -> str:
+        """Helper method to render field name parts in a naming style, e.g. ("buyer", "id")
+        -> "buyer_id" / "buyerId" / "BuyerId" / "buyer.id"
+        """
+        entity, attribute = part
+        if style == "camel":
+            return entity + attribute.capitalize()
+        if style == "pascal":
+            return entity.capitalize() + attribute.capitalize()
+        if style == "dotted":
+            return f"{entity}.{attribute}"
+        return f"{entity}_{attribute}"
+
+    def labelled_signature_map(
+        self,
+        n_signatures: int,
+        n_groups: Optional[int] = None,
+        style_drift: float = 0.2,
+    ) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, int]]:
+        """Method to generate `n_signatures` distinct signatures with a known ground truth
+        grouping, for clustering quality benchmarks
+
+        Every group is a synthetic schema with its own naming style. Its signatures drop
+        fields, carry typos (see `_vary()`), add a numbered extra field and sometimes render
+        the schema in another naming style (same group for a semantic clusterer, far apart
+        for a character n-gram one).
+
+        :param n_signatures: number of distinct signatures
+        :param n_groups: number of ground truth groups, defaults to None (sqrt(n_signatures), min 3)
+        :param style_drift: share of signatures rendered in another naming style, defaults to 0.2
+        :return: tuple of (signature hash -> signature entry, signature hash -> group id)
+        """
+        if n_groups is None:
+            n_groups = max(3, round(n_signatures**0.5))
+        schemas = [
+            (self._schema(), self.rng.choice(NAMING_STYLES)) for _ in range(n_groups)
+        ]
+
+        registry_map: Dict[str, Dict[str, Any]] = {}
+        groups: Dict[str, int] = {}
+        while len(registry_map) < n_signatures:
+            group = self.rng.randrange(n_groups)
+            parts, style = schemas[group]
+            if self.rng.random() < style_drift:
+                style = self.rng.choice(NAMING_STYLES)
+            # `_vary()` only drops fields here (part tuples are too short for `_typo()`)
+            fields = [
+                self._render(part, style)
+                for part, _ in self._vary([(p, None) for p in parts], 1.0)
+            ]
+            fields = [fields[0]] + [self._typo(k) for k in fields[1:]]
+            if self.rng.random() < 0.5:
+                extra = self.rng.choice(EXTRA_FIELDS)
+                fields.append(f"{extra}_{self.rng.randrange(n_signatures)}")
+
+            h = hashlib.md5("|".join(fields).encode()).hexdigest()
+            if h in registry_map:
+                continue
+            registry_map[h] = {
+                "signature": {k: "str" for k in fields},
+                "records": [],
+                "count": 1,
+            }
+            groups[h] = group
+        return registry_map, groups
+
+    def signature_map(self, n_signatures: int) -> Dict[str, Dict[str, Any]]:
+        """Method to generate `n_signatures` distinct signatures shaped like
+        `StructuralAnalyzer.get_signature_map()` (no records), for clustering benchmarks
+
+        Each signature is a family's fields with missing fields and typos applied, plus an
+        optional numbered extra field so large maps stay distinct.
+
+        :param n_signatures: number of distinct signatures
+        :return: signature hash -> signature entry
+        """
+        registry_map: Dict[str, Dict[str, Any]] = {}
+        while len(registry_map) < n_signatures:
+            family = self.rng.choice(FIELD_FAMILIES)
+            fields = [k for k, _ in self._vary([(k, None) for k in family], 1.0)]
+            if self.rng.random() < 0.5:
+                extra = self.rng.choice(EXTRA_FIELDS)
+                fields.append(f"{extra}_{self.rng.randrange(n_signatures)}")
+
+            h = hashlib.md5("|".join(fields).encode()).hexdigest()
+            registry_map[h] = {
+                "signature": {k: "str" for k in fields},
+                "records": [],
+                "count": 1,
+            }
+        return registry_map
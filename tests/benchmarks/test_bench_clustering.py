@@ -0,0 +1,19 @@
+from tests.benchmarks.bench_clustering import run_benchmark, run_suite
+from tests.benchmarks.data_generator import GeneratorConfig, MessyRecordGenerator
+
+
+class TestBenchClustering:
+    def test_signature_map(self):
+        registry_map = MessyRecordGenerator(GeneratorConfig(seed=7)).signature_map(300)
+        assert len(registry_map) == 300
+        assert all(entry["signature"] for entry in registry_map.values())
+
+    def test_run_benchmark(self):
+        result = run_benchmark("svd", 500, n_assign=50)
+        assert result.skipped is None
+        assert result.n_features > 64
+        assert result.fit_sec > 0
+
+    def test_dense_skipped_above_max(self):
+        report = run_suite(paths=["dense"], sizes=[1_000], max_dense=100)
+        assert report["results"][0]["skipped"]
@@ -0,0 +1,49 @@
+import numpy as np
+
+from tests.benchmarks.bench_clustering_quality import (
+    predicted_labels,
+    purity,
+    run_benchmark,
+    run_suite,
+)
+from tests.benchmarks.data_generator import GeneratorConfig, MessyRecordGenerator
+
+
+class TestBenchClusteringQuality:
+    def test_labelled_signature_map(self):
+        generator = MessyRecordGenerator(GeneratorConfig(seed=7))
+        registry_map, groups = generator.labelled_signature_map(400, n_groups=8)
+        assert len(registry_map) == 400
+        assert groups.keys() == registry_map.keys()
+        assert set(groups.values()) <= set(range(8))
+
+    def test_purity(self):
+        labels_true = np.array([0, 0, 0, 1, 1, 2])
+        assert purity(labels_true, labels_true) == 1.0
+        # one cluster holding everything: only the largest group counts
+        assert purity(labels_true, np.zeros(6, dtype=np.int64)) == 0.5
+
+    def test_predicted_labels_outliers_are_singletons(self):
+        cluster_map = {
+            "a": {"cluster_id": "0", "is_outlier": False},
+            "b": {"cluster_id": "0", "is_outlier": False},
+            "c": {"cluster_id": "-1", "is_outlier": True},
+            "d": {"cluster_id": "-1", "is_outlier": True},
+        }
+        labels, n_clusters, n_outliers = predicted_labels(
+            "structure", cluster_map, ["a", "b", "c", "d"]
+        )
+        assert len(set(labels.tolist())) == 3
+        assert (n_clusters, n_outliers) == (1, 2)
+
+    def test_run_benchmark(self):
+        result = run_benchmark("structure_minhash", 500)
+        assert result.skipped is None
+        assert result.fit_sec > 0
+        assert 0.0 < result.purity <= 1.0
+
+    def test_semantic_skipped_above_max(self):
+        report = run_suite(
+            configs=["semantic_signature"], sizes=[1_000], max_semantic=100
+        )
+        assert report["results"][0]["skipped"]
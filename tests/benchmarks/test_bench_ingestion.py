@@ -0,0 +1,35 @@
+import json
+from pathlib import Path
+
+from tests.benchmarks.bench_ingestion import main, run_benchmark
+from tests.benchmarks.data_generator import GeneratorConfig, MessyRecordGenerator
+
+
+class TestBenchIngestion:
+    def test_generator_is_reproducible(self):
+        first = list(MessyRecordGenerator(GeneratorConfig(seed=7)).generate(500))
+        second = list(MessyRecordGenerator(GeneratorConfig(seed=7)).generate(500))
+        assert first == second
+        assert any(rec.startswith("Order ") for rec in first)
+        assert any(rec.startswith("{") for rec in first)
+
+    def test_run_benchmark(self):
+        result = run_benchmark("generate_fingerprint", 1_000, batch_size=100)
+        assert result.skipped is None
+        assert result.records_per_sec > 0
+        assert result.p99_batch_ms >= result.p50_batch_ms
+
+    def test_main_writes_json(self, tmp_path: Path):
+        output = tmp_path / "bench_results.json"
+        main(
+            [
+                "--targets",
+                "generate_fingerprint",
+                "--sizes",
+                "1000",
+                "--output",
+                str(output),
+            ]
+        )
+        report = json.loads(output.read_text())
+        assert [r["n_records"] for r in report["results"]] == [1_000]
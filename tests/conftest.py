@@ -1,7 +1,8 @@
 import os
-from typing import List
+from typing import Callable, List, Optional
 
 import litellm
+import numpy as np
 import pytest
 from dotenv import load_dotenv
 from redis.asyncio import ConnectionPool, Redis
@@ -138,6 +139,43 @@ CLUSTER_SETS = {
 }
 
 
+class CountingModel:
+    """Embedding model stub recording the texts / batch sizes it encodes, `fail` makes
+    every call raise"""
+
+    def __init__(self) -> None:
+        self.encoded: List[str] = []
+        self.calls: List[int] = []
+        self.fail = False
+
+    def encode(
+        self, texts: List[str], batch_size: Optional[int] = None, **kwargs
+    ) -> np.ndarray:
+        if self.fail:
+            raise ValueError("model failure")
+        self.encoded.extend(texts)
+        self.calls.append(len(texts))
+        # multiples of 1/64 round trip exactly through the float16 embedding cache
+        return np.array(
+            [[t.count("order"), t.count("name"), len(t) / 64] for t in texts],
+            dtype=np.float32,
+        )
+
+
+def _signature_entry(*fields: str) -> dict:
+    return {"signature": {f: "str" for f in fields}, "records": [], "count": 1}
+
+
+@pytest.fixture
+def counting_model() -> CountingModel:
+    return CountingModel()
+
+
+@pytest.fixture(scope="class")
+def signature_entry() -> Callable[..., dict]:
+    return _signature_entry
+
+
 @pytest.fixture(scope="class")
 def messy_data() -> List[str]:
     return MESSY_SAMPLE_DATA
@@ -26,3 +26,26 @@ class TestRedisSignatureRegistry:
         assert cand_hash not in similar
 
         await registry.close()
+
+    async def test_register_signature_keeps_ttl(
+        self,
+        redis_client,
+        etl_lookup_map,
+        cluster_sets,
+    ) -> None:
+        registry = SignatureRegistry(redis=redis_client, namespace="etl-ttl-test")
+        await registry.store_etl_lookup(etl_lookup_map, cluster_sets, ttl_seconds=600)
+
+        cand_hash = "50eb97a85647221ecc7f65f74d68d156"
+        metadata = await registry.lookup_hash_signature(cand_hash)
+        await registry.register_signature("new-signature", metadata, ttl_seconds=86400)
+
+        # the new signature joins the cluster without extending the shared keys
+        assert await registry.lookup_hash_signature("new-signature") == metadata
+        assert "new-signature" in await registry.get_similar_signatures(cand_hash)
+        assert 0 < await redis_client.ttl(registry.meta_key) <= 600
+
+        await redis_client.delete(
+            registry.meta_key,
+            *(f"{registry.cluster_prefix}{sig}" for sig in cluster_sets),
+        )
@@ -0,0 +1,46 @@
+import numpy as np
+
+from swirl.clients.pg_duckdb_client import PGConfig, PGDuckDBClient
+from swirl.persistence.signature_vector_index import (
+    SignatureVector,
+    SignatureVectorIndex,
+    register_vector_types,
+)
+
+
+def _unit(*values: float) -> np.ndarray:
+    v = np.array(values, dtype=np.float32)
+    return v / np.linalg.norm(v)
+
+
+class TestSignatureVectorIndex:
+    def test_nearest(self, pg_config: PGConfig):
+        index = SignatureVectorIndex(
+            PGDuckDBClient(config=pg_config, configure=register_vector_types),
+            dim=3,
+            table_name="test_signature_embeddings",
+        )
+        index.create_table()
+        try:
+            index.upsert(
+                [
+                    SignatureVector("a", "0", "0", ["order_id"], _unit(1, 0, 0)),
+                    SignatureVector("b", "1", "3", ["user_id"], _unit(0, 1, 0)),
+                ]
+            )
+            # upsert replaces known signatures
+            index.upsert([SignatureVector("b", "1", "4", ["user_id"], _unit(0, 1, 0))])
+            assert index.count() == 2
+
+            neighbors = index.nearest(
+                np.stack([_unit(0.9, 0.1, 0), _unit(0.1, 1, 0), _unit(0, 0, 1)]),
+                max_distance=0.1,
+            )
+            assert neighbors[0].signature_hash == "a"
+            assert neighbors[1].structure_cluster_id == "4"
+            assert neighbors[1].fields == ["user_id"]
+            # orthogonal to everything indexed
+            assert neighbors[2] is None
+        finally:
+            index.drop_table()
+            index.pg_client.close()
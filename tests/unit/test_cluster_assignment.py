@@ -0,0 +1,77 @@
+import numpy as np
+import pytest
+
+from swirl.ml_ai.cluster_assignment import ExemplarIndex
+from swirl.ml_ai.structure_clustering import StructureClusterer
+from tests.benchmarks.data_generator import MessyRecordGenerator
+
+
+class TestExemplarIndex:
+    def test_assign(self):
+        X = np.array([[0.0, 0.0], [0.0, 1.0], [10.0, 10.0], [10.0, 11.0], [50.0, 50.0]])
+        labels = np.array([0, 0, 1, 1, -1])
+        index = ExemplarIndex().fit(X, labels)
+        assert index.radius == {0: 1.0, 1: 1.0}
+
+        new = np.array([[0.0, 0.5], [10.0, 12.0], [5.0, 5.0], [50.0, 50.0]])
+        # near cluster 0, edge of cluster 1, between clusters, on the outlier
+        assert index.assign(new).tolist() == [0, 1, -1, -1]
+
+    def test_tolerance(self):
+        X = np.array([[0.0, 0.0], [0.0, 1.0]])
+        index = ExemplarIndex(tolerance=3.0).fit(X, np.array([0, 0]))
+        assert index.assign(np.array([[0.0, 3.5], [0.0, 4.5]])).tolist() == [0, -1]
+
+    def test_not_fitted(self):
+        with pytest.raises(RuntimeError):
+            ExemplarIndex().assign(np.zeros((1, 2)))
+
+
+class TestStructureClustererAssign:
+    def test_assign_matches_fit(self, signature_entry):
+        registry_map = {
+            "a": signature_entry("order_id", "buyer", "total"),
+            "b": signature_entry("order_id", "buyer", "total", "items"),
+            "c": signature_entry("id", "name", "email"),
+            "d": signature_entry("id", "name", "email", "role"),
+        }
+        clusterer = StructureClusterer()
+        fitted = clusterer.fit_predict(registry_map)
+        assert clusterer.is_fitted
+
+        # known signatures keep their labels without a refit
+        assigned = clusterer.assign(registry_map)
+        assert assigned == fitted
+
+        # a new signature joins the cluster of its nearest exemplar
+        registry_map["e"] = signature_entry("order_id", "buyer", "total", "items")
+        assigned = clusterer.assign(registry_map)
+        assert assigned["e"]["cluster_id"] == fitted["b"]["cluster_id"]
+
+    def test_assign_not_fitted(self, signature_entry):
+        clusterer = StructureClusterer(min_cluster_size=5)
+        clusterer.fit_predict({"a": signature_entry("id")})
+        with pytest.raises(RuntimeError):
+            clusterer.assign({"a": signature_entry("id")})
+
+    def test_svd_path(self):
+        registry_map = MessyRecordGenerator().signature_map(300)
+        hashes = list(registry_map.keys())
+
+        clusterer = StructureClusterer(svd_components=16)
+        fitted = clusterer.fit_predict({h: registry_map[h] for h in hashes[:250]})
+        assert clusterer.reducer is not None
+        assert clusterer.index.exemplars.shape == (250, 16)
+
+        assigned = clusterer.assign(registry_map)
+        assert len(assigned) == 300
+        assert all(assigned[h] == fitted[h] for h in hashes[:250])
+
+    def test_small_matrix_stays_dense(self, signature_entry):
+        registry_map = {
+            "a": signature_entry("id", "name"),
+            "b": signature_entry("id", "name", "email"),
+        }
+        clusterer = StructureClusterer(svd_components=16)
+        clusterer.fit_predict(registry_map)
+        assert clusterer.reducer is None
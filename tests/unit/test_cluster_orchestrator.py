@@ -0,0 +1,163 @@
+import json
+
+import pytest
+
+from swirl.ml_ai.clustering import ClusterOrchestrator
+from swirl.utils.dataclass_utils import DataclassEncoder
+
+
+def _registry_map() -> dict:
+    signatures = {
+        "a": ["order_id", "buyer", "total"],
+        "b": ["order_id", "buyer", "total", "items"],
+        "c": ["id", "name", "email"],
+        "d": ["id", "name", "email", "role"],
+    }
+    return {
+        h: {
+            "signature": {f: "str" for f in fields},
+            "records": [{"raw": h, "parsed": {f: h for f in fields}}],
+            "count": 1,
+        }
+        for h, fields in signatures.items()
+    }
+
+
+class TestClusterOrchestrator:
+    async def test_amake_clusters_matches_sequential(self, counting_model):
+        registry_map = _registry_map()
+        sequential = ClusterOrchestrator(
+            embedding_model=counting_model, concurrent=False
+        ).make_clusters(registry_map)
+
+        cluster_op = ClusterOrchestrator(embedding_model=counting_model)
+        try:
+            concurrent = await cluster_op.amake_clusters(registry_map)
+        finally:
+            cluster_op.close()
+
+        assert concurrent == sequential
+        assert sum(len(records) for records in concurrent.values()) == 4
+
+    def test_assigns_between_refits(self, counting_model):
+        registry_map = _registry_map()
+        cluster_op = ClusterOrchestrator(embedding_model=counting_model)
+        try:
+            first = cluster_op.make_clusters(registry_map)
+            second = cluster_op.make_clusters(registry_map)
+            cluster_op.make_clusters(registry_map, force_refit=True)
+        finally:
+            cluster_op.close()
+
+        assert first == second
+        assert (cluster_op.n_fits, cluster_op.n_assigns) == (2, 1)
+
+    def test_assigns_only_given_signatures(self, counting_model):
+        registry_map = _registry_map()
+        # outliers don't trigger a refit
+        cluster_op = ClusterOrchestrator(
+            embedding_model=counting_model, concurrent=False, drift_threshold=1.0
+        )
+        full = cluster_op.make_clusters(registry_map)
+        assert full.complete
+
+        registry_map["e"] = {
+            "signature": {"order_id": "str", "buyer": "str"},
+            "records": [{"raw": "e", "parsed": {"order_id": "e", "buyer": "e"}}],
+            "count": 1,
+        }
+        n_encoded = len(counting_model.encoded)
+        subset = cluster_op.make_clusters(registry_map, signature_hashes=["e"])
+
+        assert not subset.complete
+        assert [rec.raw for recs in subset.values() for rec in recs] == ["e"]
+        assert len(counting_model.encoded) == n_encoded + 1
+        assert (cluster_op.n_fits, cluster_op.n_assigns) == (1, 1)
+
+        # a refit clusters and returns the whole map
+        refit = cluster_op.make_clusters(
+            registry_map, force_refit=True, signature_hashes=["e"]
+        )
+        assert refit.complete
+        assert sum(len(records) for records in refit.values()) == 5
+
+    def test_records_reference_analyzer_store(self, counting_model):
+        registry_map = _registry_map()
+        registry_map["a"]["records"][0]["parsed"]["_unparsed"] = "tail"
+        registry_map["a"]["records"].append({"raw": "x", "parsed": {"_unparsed": "x"}})
+
+        cluster_op = ClusterOrchestrator(
+            embedding_model=counting_model, concurrent=False
+        )
+        cluster_map = cluster_op.make_clusters(registry_map)
+        records = {rec.raw: rec for recs in cluster_map.values() for rec in recs}
+
+        # records holding only `_unparsed` are skipped
+        assert sorted(records) == ["a", "b", "c", "d"]
+        rec = records["a"]
+        assert rec.record_idx == 0
+        assert rec.parsed == {"order_id": "a", "buyer": "a", "total": "a"}
+        assert rec.fields == ["order_id", "buyer", "total"]
+        assert rec.to_dict()["parsed"] == rec.parsed
+        dumped = json.loads(json.dumps(cluster_map, cls=DataclassEncoder))
+        assert dumped.keys() == cluster_map.keys()
+        assert rec.to_dict() in dumped[rec.semantic_cluster_id]
+        # the analyzer store is neither copied nor mutated
+        assert "_unparsed" in registry_map["a"]["records"][0]["parsed"]
+
+    def test_records_outlive_index(self, counting_model):
+        registry_map = _registry_map()
+        cluster_op = ClusterOrchestrator(
+            embedding_model=counting_model, concurrent=False
+        )
+        cluster_map = cluster_op.make_clusters(registry_map)
+        rec = next(r for recs in cluster_map.values() for r in recs if r.raw == "a")
+
+        del cluster_map
+        cluster_op.cluster_map = None
+        # the analyzer store resamples the record's slot
+        registry_map["a"]["records"][0] = {"raw": "z", "parsed": {"order_id": "z"}}
+
+        assert rec.raw == "a"
+        assert rec.parsed == {"order_id": "a", "buyer": "a", "total": "a"}
+        assert rec.to_dict()["fields"] == ["order_id", "buyer", "total"]
+
+    def test_cluster_ids_namespaced_by_fit(self, counting_model):
+        registry_map = _registry_map()
+        cluster_op = ClusterOrchestrator(
+            embedding_model=counting_model, concurrent=False, drift_threshold=1.0
+        )
+        first = cluster_op.make_clusters(registry_map)
+        fit_id = cluster_op.fit_id
+        assert all(cluster_id.startswith(f"{fit_id}_") for cluster_id in first)
+        assert all(
+            rec.structure_cluster_id.startswith(f"{fit_id}_")
+            for records in first.values()
+            for rec in records
+        )
+
+        # a refit over another job's signatures doesn't reuse the cluster ids
+        other_map = {h: registry_map[h] for h in ["c", "d"]}
+        refit = cluster_op.make_clusters(other_map, force_refit=True)
+        assert cluster_op.fit_id != fit_id
+        assert not set(refit) & set(first)
+
+    def test_outlier_ids_stable_across_assigns(self, counting_model):
+        registry_map = _registry_map()
+        cluster_op = ClusterOrchestrator(
+            embedding_model=counting_model, concurrent=False, drift_threshold=1.0
+        )
+        cluster_op.make_clusters(registry_map)
+
+        registry_map["e"] = {
+            "signature": {"zzz": "str"},
+            "records": [{"raw": "e", "parsed": {"zzz": "e"}}],
+            "count": 1,
+        }
+        alone = cluster_op.make_clusters(registry_map, signature_hashes=["e"])
+        with_others = cluster_op.make_clusters(
+            registry_map, signature_hashes=["a", "b", "c", "e"]
+        )
+        [outlier_id] = list(alone)
+        assert outlier_id == f"{cluster_op.fit_id}_outlier_e"
+        assert [rec.raw for rec in with_others[outlier_id]] == ["e"]
@@ -0,0 +1,65 @@
+import os
+import time
+from pathlib import Path
+
+import numpy as np
+
+from swirl.ml_ai.embedding_cache import DiskEmbeddingStore, EmbeddingCache
+
+
+class TestEmbeddingCache:
+    def test_encode_only_unseen(self, counting_model):
+        model = counting_model
+        cache = EmbeddingCache("test-model", max_size=2)
+        texts = ["field:buyer field:items", "field:id", "field:buyer field:items"]
+
+        expected = model.encode(texts)
+        model.encoded.clear()
+
+        np.testing.assert_array_equal(cache.encode(model, texts), expected)
+        assert model.encoded == ["field:buyer field:items", "field:id"]
+
+        np.testing.assert_array_equal(cache.encode(model, texts), expected)
+        assert len(model.encoded) == 2
+        assert cache.stats()["memory_hits"] == 2
+
+        cache.encode(model, ["field:name"])
+        assert cache.stats()["evictions"] == 1
+
+    def test_disk_store_is_shared(self, tmp_path: Path, counting_model):
+        model = counting_model
+        store = DiskEmbeddingStore(str(tmp_path))
+        texts = ["field:buyer field:items", "field:id"]
+
+        first = EmbeddingCache("test-model", store=store).encode(model, texts)
+        second_cache = EmbeddingCache("test-model", store=store)
+        np.testing.assert_array_equal(second_cache.encode(model, texts), first)
+        assert len(model.encoded) == 2
+        assert second_cache.stats()["store_hits"] == 2
+
+        # the model name is part of the key
+        EmbeddingCache("other-model", store=store).encode(model, texts)
+        assert len(model.encoded) == 4
+
+    def test_disk_store_prune(self, tmp_path: Path):
+        store = DiskEmbeddingStore(
+            str(tmp_path), max_files=2, ttl_seconds=3600, prune_every=1_000
+        )
+        keys = ["aa01", "aa02", "bb03", "bb04"]
+        store.set_many({key: b"\x00\x3c" for key in keys})
+
+        now = time.time()
+        for age, key in zip([7200, 300, 200, 100], keys):
+            os.utime(store._path(key), (now - age, now - age))
+        # a read makes "aa02" the most recently used vector
+        store.get_many(["aa02"])
+
+        # "aa01" expired, "bb03" is the least recently used one above max_files
+        assert store.prune() == 2
+        assert store.get_many(keys) == [None, b"\x00\x3c", None, b"\x00\x3c"]
+
+        # writes prune every `prune_every` vectors
+        store = DiskEmbeddingStore(str(tmp_path / "auto"), max_files=1, prune_every=2)
+        store.set_many({"aa01": b"\x00\x3c"})
+        store.set_many({"bb02": b"\x00\x3c"})
+        assert sum(data is not None for data in store.get_many(["aa01", "bb02"])) == 1
@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+
+from swirl.ml_ai.embedding_model import (
+    _mean_pool,
+    load_embedding_model,
+    onnx_model_dir,
+)
+
+
+class TestEmbeddingModel:
+    def test_mean_pool(self):
+        token_embeddings = np.array(
+            [
+                [[1.0, 0.0], [3.0, 0.0], [100.0, 100.0]],
+                [[0.0, 2.0], [0.0, 0.0], [0.0, 0.0]],
+            ]
+        )
+        attention_mask = np.array([[1, 1, 0], [1, 0, 0]])
+        pooled = _mean_pool(token_embeddings, attention_mask)
+
+        # padding tokens are ignored and rows are unit length
+        assert pooled.dtype == np.float32
+        np.testing.assert_allclose(pooled, [[1.0, 0.0], [0.0, 1.0]])
+
+    def test_onnx_model_dir(self):
+        assert onnx_model_dir("sentence-transformers/all-MiniLM-L6-v2", "m") == (
+            "m/all-MiniLM-L6-v2-onnx-int8"
+        )
+
+    def test_missing_onnx_export(self, tmp_path):
+        with pytest.raises(FileNotFoundError):
+            load_embedding_model(backend="onnx", cache_folder=str(tmp_path))
+
+    def test_unknown_backend(self):
+        with pytest.raises(ValueError):
+            load_embedding_model(backend="tensorflow")
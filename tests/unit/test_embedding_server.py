@@ -0,0 +1,100 @@
+import threading
+import time
+
+import pytest
+
+from swirl.ml_ai.embedding_server import EmbeddingClient, EmbeddingServer
+
+
+@pytest.fixture
+def socket_path(tmp_path):
+    return str(tmp_path / "embedding.sock")
+
+
+class TestEmbeddingServer:
+    def test_encode(self, socket_path, counting_model):
+        server = EmbeddingServer(counting_model, socket_path)
+        server.start()
+        client = EmbeddingClient(socket_path)
+        try:
+            embeddings = client.encode(["a", "bb", "aaa"])
+            single = client.encode("aa")
+        finally:
+            client.close()
+            server.close()
+
+        assert embeddings.tolist() == [
+            [0.0, 0.0, 0.015625],
+            [0.0, 0.0, 0.03125],
+            [0.0, 0.0, 0.046875],
+        ]
+        assert single.tolist() == [0.0, 0.0, 0.03125]
+
+    def test_micro_batching(self, socket_path, counting_model):
+        model = counting_model
+        server = EmbeddingServer(model, socket_path, max_wait_ms=200.0)
+        server.start()
+        client = EmbeddingClient(socket_path)
+        results = {}
+
+        def request(i: int) -> None:
+            results[i] = client.encode([f"text {i}"] * 4)
+            client.close()
+
+        threads = [threading.Thread(target=request, args=(i,)) for i in range(8)]
+        try:
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+        finally:
+            server.close()
+
+        assert all(results[i].shape == (4, 3) for i in range(8))
+        # 8 concurrent requests share fewer encode calls
+        assert sum(model.calls) == 32
+        assert len(model.calls) < 8
+        assert server.stats()["requests"] == 8
+
+    def test_model_error(self, socket_path, counting_model):
+        counting_model.fail = True
+        server = EmbeddingServer(counting_model, socket_path)
+        server.start()
+        client = EmbeddingClient(socket_path)
+        try:
+            with pytest.raises(RuntimeError, match="model failure"):
+                client.encode(["a"])
+        finally:
+            client.close()
+            server.close()
+
+    def test_timeout_not_retried(self, socket_path, counting_model, monkeypatch):
+        encode = counting_model.encode
+
+        def slow_encode(texts, **kwargs):
+            time.sleep(0.5)
+            return encode(texts, **kwargs)
+
+        monkeypatch.setattr(counting_model, "encode", slow_encode)
+        server = EmbeddingServer(counting_model, socket_path)
+        server.start()
+        client = EmbeddingClient(socket_path, timeout=0.1)
+        try:
+            with pytest.raises(TimeoutError):
+                client.encode(["a"])
+
+            # the next request gets its own response, not the late one of the timed out request
+            monkeypatch.setattr(counting_model, "encode", encode)
+            client.timeout = 5.0
+            assert client.encode(["name name"]).tolist() == [[0.0, 2.0, 0.140625]]
+        finally:
+            client.close()
+            server.close()
+
+        # the timed out request isn't sent a second time
+        assert counting_model.calls == [1, 1]
+
+    def test_no_server(self, socket_path):
+        client = EmbeddingClient(socket_path, connect_timeout=0.0)
+        with pytest.raises(FileNotFoundError):
+            client.encode(["a"])
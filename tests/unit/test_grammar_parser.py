@@ -1,6 +1,24 @@
+from collections.abc import Mapping
+from datetime import date, datetime
+from decimal import Decimal
+from pathlib import Path
 from typing import List
 
-from swirl.ingestion.rust_ingestion import smart_parse_batch
+from swirl.ingestion.columnar import parse_batch_columnar, parse_bytes_columnar
+from swirl.ingestion.rust_ingestion import (
+    SmartParser,
+    clear_templates,
+    configure_parallelism,
+    configure_templates,
+    fingerprint_batch,
+    parallelism_stats,
+    smart_parse_batch,
+    smart_parse_bytes,
+    smart_parse_fingerprint_batch,
+    template_stats,
+)
+from swirl.ingestion.structure_analyzer import StructuralAnalyzer
+from swirl.ingestion.type_inference import infer_record
 from swirl.utils.log_utils import get_custom_logger
 
 logger = get_custom_logger()
@@ -15,3 +33,181 @@ class TestGrammarParser:
             assert isinstance(raw, str)
             assert isinstance(parsed, dict)
             assert len(parsed) > 0
+
+    def test_parallelism(self, messy_data: List[str]):
+        expected = smart_parse_batch(messy_data)
+        try:
+            configure_parallelism(num_threads=2, sequential_cutoff=len(messy_data) + 1)
+            before = parallelism_stats()
+            assert before["dedicated_pool"] and before["num_threads"] == 2
+            assert smart_parse_batch(messy_data) == expected
+            after = parallelism_stats()
+            assert after["sequential_batches"] == before["sequential_batches"] + 1
+
+            configure_parallelism(num_threads=2, sequential_cutoff=0)
+            assert smart_parse_batch(messy_data) == expected
+            assert (
+                parallelism_stats()["parallel_batches"] == after["parallel_batches"] + 1
+            )
+        finally:
+            configure_parallelism()
+
+    def test_smart_parse_batch_lazy(self, messy_data: List[str]):
+        for infer_types in [False, True]:
+            expected = smart_parse_batch(messy_data, infer_types=infer_types)
+            res = smart_parse_batch(messy_data, infer_types=infer_types, lazy=True)
+            assert res == expected
+
+            for (_, parsed), (_, expected_parsed) in zip(res, expected):
+                assert isinstance(parsed, Mapping)
+                assert dict(parsed) == expected_parsed
+                assert list(parsed) == list(expected_parsed)
+                for k, v in expected_parsed.items():
+                    assert k in parsed
+                    assert parsed[k] == v
+                assert parsed.get("missing_key") is None
+
+    def test_smart_parser_streaming(self, messy_data: List[str]):
+        expected = smart_parse_batch(messy_data)
+
+        parser = SmartParser(iter(messy_data), chunk_size=4)
+        chunks = list(parser)
+        assert all(len(chunk) <= 4 for chunk in chunks)
+
+        streamed = [pair for chunk in chunks for pair in chunk]
+        assert streamed == expected
+
+        # feeding more records resumes iteration
+        parser.feed(messy_data[:3])
+        assert [pair for chunk in parser for pair in chunk] == expected[:3]
+
+    def test_smart_parse_batch_columnar(self, messy_data: List[str]):
+        str_data = [rec for rec in messy_data if isinstance(rec, str)]
+        batch = parse_batch_columnar(str_data)
+
+        assert len(batch) == len(str_data)
+        assert list(batch) == smart_parse_batch(str_data)
+
+    def test_smart_parse_fingerprint_batch(self, messy_data: List[str]):
+        analyzer = StructuralAnalyzer()
+        res = smart_parse_fingerprint_batch(messy_data)
+        assert len(res) == len(messy_data)
+
+        for raw, parsed, fingerprint in res:
+            expected = analyzer.generate_fingerprint(raw, parsed, store_in_map=False)
+            assert fingerprint == expected
+
+        pairs = [(raw, parsed) for raw, parsed, _ in res]
+        assert fingerprint_batch(pairs) == [fp for _, _, fp in res]
+
+        # signatures aren't shared between records of the same structure
+        signatures = [fp["signature"] for _, _, fp in res]
+        assert len({id(sig) for sig in signatures}) == len(signatures)
+
+    def test_fingerprint_python_type_names(self):
+        # values with no JSON equivalent keep their python type names
+        record = {
+            "id": 2**70,
+            "point": (1, 2),
+            "amount": Decimal("1.5"),
+            "meta": {"at": datetime(2024, 1, 1), "tags": [date(2024, 1, 1)]},
+        }
+        analyzer = StructuralAnalyzer()
+
+        [(raw, _, fingerprint)] = smart_parse_fingerprint_batch([record])
+        expected = analyzer.generate_fingerprint(raw, record, store_in_map=False)
+        assert fingerprint == expected
+        assert fingerprint["signature"]["id"] == "int"
+        assert fingerprint["signature"]["meta.tags"] == "list[date]"
+        assert fingerprint_batch([(raw, record)]) == [expected]
+
+    def test_template_fast_path_parity(self, messy_data: List[str]):
+        str_data = [rec for rec in messy_data if isinstance(rec, str)]
+        # same layouts with different values + records that must fall off the fast path
+        variants = [
+            "Order 2001: Buyer=Ann Lee, Location=Austin, TX, Total=$12.00, Items: mug",
+            "Order 2002: Buyer=Bo, Location=Reno, NV, Total=$5, Items: ",
+            "Order 2003: Buyer=Cy Young, Location=Ames, IA, Total=$7.25, Items: a, note: b",
+            "Order 2004: Buyer=Di, Location=Troy  , Total=$1, Items: pen",
+            "Order 2005: Buyer=Ed=Jr, Location=Waco, TX, Total=$3, Items: cup",
+        ]
+        batch = (str_data + variants) * 3
+
+        configure_templates(enabled=False)
+        expected = smart_parse_batch(batch)
+
+        clear_templates()
+        configure_templates(enabled=True, min_support=1)
+        try:
+            # first pass learns the layouts, second pass goes through the fast path
+            smart_parse_batch(batch)
+            hits_before = template_stats()["hits"]
+            assert smart_parse_batch(batch) == expected
+            assert template_stats()["templates"] > 0
+            assert template_stats()["hits"] > hits_before
+        finally:
+            clear_templates()
+            configure_templates()
+
+    def test_template_store_learns_when_full(self):
+        layouts = [
+            "Order 3001: Buyer=Ann, Location=Austin, Total=$12.00",
+            "Invoice 3002: Client=Bo, Region=Reno, Amount=$5",
+            "Ticket 3003: Owner=Cy, Queue=Ames, Priority=high",
+        ]
+
+        clear_templates()
+        configure_templates(enabled=True, min_support=1, max_templates=2)
+        try:
+            # fill the store, then learn a new layout with every slot taken
+            for record in layouts:
+                smart_parse_batch([record])
+            assert template_stats()["templates"] == 2
+            assert template_stats()["evicted"] >= 1
+
+            # the newest layout is kept (the least recently used one is evicted)
+            hits_before = template_stats()["hits"]
+            smart_parse_batch([layouts[-1]])
+            assert template_stats()["hits"] == hits_before + 1
+        finally:
+            clear_templates()
+            configure_templates()
+
+    def test_smart_parse_infer_types(self, messy_data: List[str]):
+        analyzer = StructuralAnalyzer()
+        res = smart_parse_fingerprint_batch(messy_data, infer_types=True)
+
+        for raw, parsed, fingerprint in res:
+            expected = analyzer.generate_fingerprint(raw, parsed, store_in_map=False)
+            assert fingerprint == expected
+
+        # key value records: typed output == python inference over the string output
+        kv_data = [
+            rec
+            for rec in messy_data
+            if isinstance(rec, str) and not rec.strip().startswith(("{", "["))
+        ]
+        typed = smart_parse_batch(kv_data, infer_types=True)
+        assert typed == [
+            (raw, infer_record(parsed)) for raw, parsed in smart_parse_batch(kv_data)
+        ]
+
+    def test_smart_parse_bytes(self, messy_data: List[str], tmp_path: Path):
+        str_data = [rec for rec in messy_data if isinstance(rec, str)]
+        expected = smart_parse_batch(str_data)
+        payload = "\n".join(str_data).encode("utf-8") + b"\r\n\n"
+
+        assert smart_parse_bytes(payload) == expected
+        assert smart_parse_bytes(memoryview(payload)) == expected
+        # writable buffers are copied before parsing
+        assert smart_parse_bytes(bytearray(payload)) == expected
+
+        path = tmp_path / "records.jsonl"
+        path.write_bytes(payload)
+        assert smart_parse_bytes(path) == expected
+        assert smart_parse_bytes(str(path), infer_types=True) == smart_parse_batch(
+            str_data, infer_types=True
+        )
+
+        batch = parse_bytes_columnar(path)
+        assert list(batch) == expected
@@ -0,0 +1,75 @@
+from typing import List
+
+import pytest
+from lark.exceptions import LarkError
+
+from swirl.ingestion.grammar_parser import DEFAULT_GRAMMAR, GrammarParser
+
+# delimiter / value edge cases of DEFAULT_GRAMMAR's `pair` rule
+PAIR_EDGE_CASES = [
+    "key value",
+    "key  value",
+    "key\tvalue",
+    "key\u00a0value",
+    "key : value",
+    "key:",
+    "key=",
+    "key :",
+    "key = ",
+    "k:v",
+    "k\t=\tv",
+    "a  :  b",
+    "a:b:c",
+    "a = b = c",
+    "a: b,",
+    "a:,",
+    "a: b, c",
+    "a b: c",
+    "k v: w",
+    "k v, w",
+    "k: v w=x",
+    "k=v  w: x, y",
+    "key value more",
+    "_x y",
+    "1a: b",
+    "é: x",
+    "ké: x",
+    "a",
+    "a,",
+    "a\nb",
+    "a\r\nb",
+    "a: b\nc: d",
+    "Order 12: a=b",
+]
+
+
+class TestGrammarParserRegex:
+    @pytest.mark.parametrize("infer_types", [False, True])
+    def test_default_pattern_matches_earley(
+        self, messy_data: List[str], infer_types: bool
+    ):
+        # the default grammar runs as a regex, the override path builds the Earley parser
+        regex_parser = GrammarParser(infer_types=infer_types)
+        earley_parser = GrammarParser(
+            grammar_override=DEFAULT_GRAMMAR, infer_types=infer_types
+        )
+        assert regex_parser.pair_parser is None
+        assert earley_parser.pair_parser is not None
+
+        records = [rec for rec in messy_data if isinstance(rec, str)]
+        for raw in records + PAIR_EDGE_CASES:
+            assert regex_parser.smart_parse(raw) == earley_parser.smart_parse(raw), raw
+
+    def test_default_pattern_segments_match_earley(self):
+        regex_parser = GrammarParser()
+        earley_parser = GrammarParser(grammar_override=DEFAULT_GRAMMAR)
+
+        for seg in PAIR_EDGE_CASES:
+            seg = seg.strip()
+            try:
+                expected = earley_parser._parse_pair(seg)
+            except LarkError:
+                with pytest.raises(ValueError):
+                    regex_parser._parse_pair(seg)
+                continue
+            assert regex_parser._parse_pair(seg) == expected, seg
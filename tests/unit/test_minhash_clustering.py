@@ -0,0 +1,95 @@
+import pickle
+
+import numpy as np
+import pytest
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import connected_components
+
+from swirl.ml_ai.minhash_clustering import MinHashClusterer
+from tests.benchmarks.data_generator import GeneratorConfig, MessyRecordGenerator
+
+ORDER_FIELDS = ["order_id", "buyer", "total", "items", "location", "currency"]
+USER_FIELDS = ["id", "name", "email", "role", "created_at", "last_login_ip"]
+
+
+class TestMinHashClusterer:
+    def test_fit_predict(self, signature_entry):
+        registry_map = {
+            "a": signature_entry(*ORDER_FIELDS),
+            "b": signature_entry(*ORDER_FIELDS[:-1]),
+            "c": signature_entry(*USER_FIELDS),
+            "d": signature_entry(*USER_FIELDS[:-1]),
+            "e": signature_entry("sku", "qty"),
+        }
+        cluster_map = MinHashClusterer().fit_predict(registry_map)
+
+        assert cluster_map["a"]["cluster_id"] == cluster_map["b"]["cluster_id"]
+        assert cluster_map["c"]["cluster_id"] == cluster_map["d"]["cluster_id"]
+        assert cluster_map["a"]["cluster_id"] != cluster_map["c"]["cluster_id"]
+        assert cluster_map["e"]["is_outlier"]
+        assert cluster_map["e"]["cluster_id"] == "-1"
+
+    def test_assign(self, signature_entry):
+        registry_map = {
+            "a": signature_entry(*ORDER_FIELDS),
+            "b": signature_entry(*ORDER_FIELDS[:-1]),
+            "c": signature_entry(*USER_FIELDS),
+            "d": signature_entry(*USER_FIELDS[:-1]),
+        }
+        clusterer = MinHashClusterer()
+        fitted = clusterer.fit_predict(registry_map)
+        assert clusterer.assign(registry_map) == fitted
+
+        # a pickled state assigns the same way
+        restored = MinHashClusterer()
+        restored.set_state(pickle.loads(pickle.dumps(clusterer.get_state())))
+
+        registry_map["f"] = signature_entry(*USER_FIELDS[1:])
+        registry_map["g"] = signature_entry("sku", "qty")
+        for c in (clusterer, restored):
+            assigned = c.assign(registry_map)
+            assert assigned["f"]["cluster_id"] == fitted["c"]["cluster_id"]
+            assert assigned["g"]["is_outlier"]
+
+    def test_large_signature_map(self):
+        registry_map = MessyRecordGenerator().signature_map(20_000)
+        cluster_map = MinHashClusterer().fit_predict(registry_map)
+        assert len(cluster_map) == 20_000
+
+        # three record families with few fields each, so most signatures cluster
+        n_outliers = sum(rec["is_outlier"] for rec in cluster_map.values())
+        assert n_outliers < len(cluster_map) // 2
+
+    def test_checks_every_bucket_member(self):
+        # a map where checking only part of a bucket misses links
+        registry_map, _ = MessyRecordGenerator(
+            GeneratorConfig(seed=0)
+        ).labelled_signature_map(200)
+        hashes = list(registry_map)
+        n = len(hashes)
+        clusterer = MinHashClusterer(bucket_window=n)
+        cluster_map = clusterer.fit_predict(registry_map)
+
+        # brute force: every pair sharing a band with a similar enough sketch
+        minhashes, band_keys = clusterer._sketch(
+            [registry_map[h]["signature"] for h in hashes]
+        )
+        shares_band = (band_keys[:, None, :] == band_keys[None, :, :]).any(axis=2)
+        sims = (minhashes[:, None, :] == minhashes[None, :, :]).mean(axis=2)
+        graph = csr_matrix(shares_band & (sims >= clusterer.threshold))
+        _, components = connected_components(graph, directed=False)
+
+        # singleton components are outliers, the rest map one to one onto the clusters
+        sizes = np.bincount(components)
+        pairs = set()
+        for i, h in enumerate(hashes):
+            assert cluster_map[h]["is_outlier"] == (sizes[components[i]] < 2)
+            if not cluster_map[h]["is_outlier"]:
+                pairs.add((components[i], cluster_map[h]["cluster_id"]))
+        assert (
+            len({c for c, _ in pairs}) == len({cid for _, cid in pairs}) == len(pairs)
+        )
+
+    def test_invalid_bands(self):
+        with pytest.raises(ValueError):
+            MinHashClusterer(num_perm=100, bands=32)
@@ -0,0 +1,46 @@
+from typing import List
+
+from swirl.ingestion.parse_cache import ParseCache
+from swirl.ingestion.rust_ingestion import smart_parse_fingerprint_batch
+
+
+class TestParseCache:
+    def test_parse_fingerprint_batch(self, messy_data: List[str]):
+        cache = ParseCache()
+        expected = smart_parse_fingerprint_batch(messy_data)
+
+        assert cache.parse_fingerprint_batch(messy_data) == expected
+        stats = cache.stats()
+        assert stats["hits"] == 0
+        assert stats["misses"] == len(messy_data)
+
+        # every string record is served from the cache the second time around
+        assert cache.parse_fingerprint_batch(messy_data) == expected
+        n_str = sum(isinstance(rec, str) for rec in messy_data)
+        assert cache.stats()["hits"] == n_str
+
+    def test_cached_dicts_are_copies(self, messy_data: List[str]):
+        cache = ParseCache()
+        str_data = [rec for rec in messy_data if isinstance(rec, str)]
+        _, _, fingerprint = cache.parse_fingerprint_batch(str_data)[0]
+        fingerprint["signature"].clear()
+
+        _, parsed, fingerprint = cache.parse_fingerprint_batch(str_data)[0]
+        assert len(fingerprint["signature"]) > 0
+        parsed.clear()
+        fingerprint["signature"].clear()
+        fingerprint["hash"] = ""
+
+        _, parsed_again, fingerprint_again = cache.parse_fingerprint_batch(str_data)[0]
+        assert len(parsed_again) > 0
+        assert len(fingerprint_again["signature"]) > 0
+        assert fingerprint_again["hash"]
+
+    def test_lru_eviction(self, messy_data: List[str]):
+        cache = ParseCache(max_size=2)
+        str_data = [rec for rec in messy_data if isinstance(rec, str)]
+        cache.parse_fingerprint_batch(str_data)
+
+        stats = cache.stats()
+        assert stats["size"] == 2
+        assert stats["evictions"] == len(set(str_data)) - 2
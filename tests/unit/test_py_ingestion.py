@@ -0,0 +1,99 @@
+import json
+import time
+from typing import List
+
+import pytest
+
+from swirl.ingestion.py_ingestion import (
+    extract_json_records,
+    parse_record,
+    smart_parse_batch,
+    smart_parse_fingerprint_batch,
+    smart_parse_json_bodies,
+)
+from swirl.ingestion.structure_analyzer import StructuralAnalyzer
+from swirl.utils.log_utils import get_custom_logger
+
+logger = get_custom_logger()
+
+
+class TestPyIngestion:
+    def test_parse_record(self):
+        assert parse_record("Order 1001: Buyer=John Davis, Total: $5, Items: ") == {
+            "buyer": "John Davis",
+            "total": "$5",
+            "items": "None",
+            "_unparsed": "Order-1001",
+        }
+        # pest grammar: whitespace only delimiters don't make a pair
+        assert parse_record("Items laptop") == {"_unparsed": "Items laptop"}
+        assert parse_record('{"ID": 4, "tags": ["a"], "name": "x"}') == {
+            "id": "4",
+            "tags": '["a"]',
+            "name": "x",
+        }
+        assert parse_record("[1, 2]") == {"json_data": "[1, 2]"}
+
+    def test_smart_parse_batch_workers(self, messy_data: List[str]):
+        expected = smart_parse_batch(messy_data, n_workers=1)
+        assert len(expected) == len(messy_data)
+        assert smart_parse_batch(messy_data, n_workers=2, chunk_size=3) == expected
+
+    def test_smart_parse_fingerprint_batch(self, messy_data: List[str]):
+        analyzer = StructuralAnalyzer()
+        for raw, parsed, fingerprint in smart_parse_fingerprint_batch(messy_data):
+            assert fingerprint == analyzer.generate_fingerprint(
+                raw, parsed, store_in_map=False
+            )
+
+    def test_extract_json_records(self):
+        bodies = [
+            b'{"data": {"items": ["id=1", {"id": 2}]}}',
+            b'{"data": {"items": ["id=1", "id=3"]}}',
+            b"not json",
+        ]
+        assert extract_json_records(bodies, "/data/items", strict=False) == [
+            "id=1",
+            '{"id":2}',
+            "id=3",
+        ]
+        assert extract_json_records(bodies[:1], "data", strict=False) == []
+        with pytest.raises(ValueError):
+            extract_json_records(bodies, "/data/items")
+
+        assert smart_parse_json_bodies(bodies[:2], "/data/items") == smart_parse_batch(
+            ["id=1", '{"id":2}', "id=3"]
+        )
+
+    @pytest.mark.parametrize("infer_types", [False, True])
+    def test_rust_parity(self, messy_data: List[str], infer_types: bool):
+        rust_ingestion = pytest.importorskip("swirl.ingestion.rust_ingestion")
+
+        assert smart_parse_batch(
+            messy_data, infer_types=infer_types
+        ) == rust_ingestion.smart_parse_batch(messy_data, infer_types=infer_types)
+
+        bodies = [json.dumps({"data": messy_data}).encode()] * 2
+        assert smart_parse_json_bodies(
+            bodies, "data", infer_types=infer_types
+        ) == rust_ingestion.smart_parse_json_bodies(
+            bodies, "data", infer_types=infer_types
+        )
+
+    def test_rust_benchmark(self, messy_data: List[str]):
+        rust_ingestion = pytest.importorskip("swirl.ingestion.rust_ingestion")
+        batch = messy_data * 2_000
+
+        start = time.perf_counter()
+        rust_results = rust_ingestion.smart_parse_batch(batch)
+        rust_runtime = time.perf_counter() - start
+
+        start = time.perf_counter()
+        py_results = smart_parse_batch(batch)
+        py_runtime = time.perf_counter() - start
+
+        logger.debug(
+            f"PARSE RUNTIME: rust={round(rust_runtime, 3)}s "
+            f"python={round(py_runtime, 3)}s for {len(batch)} samples"
+        )
+        assert py_results == rust_results
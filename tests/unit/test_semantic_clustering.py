@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+
+from swirl.ml_ai.semantic_clustering import SemanticClusterer
+
+
+class TestFieldTokenEmbedding:
+    def test_model_calls_scale_with_vocabulary(self, counting_model, signature_entry):
+        registry_map = {
+            "a": signature_entry("order_id", "buyer", "total"),
+            "b": signature_entry("order_id", "buyer", "total", "items"),
+            "c": signature_entry("orderId", "buyer", "items", "_unparsed"),
+            "d": signature_entry("id", "name", "email"),
+            "e": signature_entry("id", "name", "email", "role"),
+        }
+        model = counting_model
+        clusterer = SemanticClusterer(
+            embedding_model=model, embedding_mode="field_tokens"
+        )
+        cluster_map = clusterer.fit_predict(registry_map)
+
+        # one model call per unique normalized field token ("orderId" == "order_id")
+        vocab = ["order_id", "buyer", "total", "items", "id", "name", "email", "role"]
+        assert sorted(model.encoded) == sorted(f"field:{k}" for k in vocab)
+        assert sum(len(records) for records in cluster_map.values()) == 5
+
+        # new signatures made of known tokens don't call the model again
+        registry_map["f"] = signature_entry("buyer", "total", "role")
+        clusterer.assign(registry_map)
+        assert len(model.encoded) == 8
+
+    def test_pooling(self, counting_model):
+        model = counting_model
+        clusterer = SemanticClusterer(
+            embedding_model=model, embedding_mode="field_tokens"
+        )
+        X = clusterer._vectorize([{"buyer": "str", "items": "str"}, {}])
+
+        expected = model.encode(["field:buyer", "field:items"]).mean(axis=0)
+        # token vectors round trip through the float16 cache
+        np.testing.assert_allclose(X[0], expected / np.linalg.norm(expected), rtol=1e-3)
+        assert "schema:empty_blob" in model.encoded
+
+    def test_unknown_mode(self, counting_model):
+        with pytest.raises(ValueError):
+            SemanticClusterer(embedding_model=counting_model, embedding_mode="chars")
+
+    def test_embed(self, counting_model):
+        clusterer = SemanticClusterer(embedding_model=counting_model)
+        embeddings = clusterer.embed(
+            [{"order_id": "int"}, {"id": "str", "name": "str"}]
+        )
+        assert embeddings.dtype == np.float32
+        assert embeddings.shape == (2, 3)
+        assert np.allclose(np.linalg.norm(embeddings, axis=1), 1.0)
@@ -0,0 +1,155 @@
+import struct
+import time
+from typing import Dict, List, Tuple
+
+import pytest
+
+from swirl.ingestion.columnar import ColumnarBatch
+from swirl.ingestion.structure_analyzer import StructuralAnalyzer
+from swirl.utils.log_utils import get_custom_logger
+
+logger = get_custom_logger()
+
+PARSED_SAMPLES = [
+    (
+        "Order 1001: Buyer=John Davis, Total=$742.10",
+        {"buyer": "John Davis", "total": "$742.10", "_unparsed": "Order-1001"},
+    ),
+    (
+        "Order 1002: Buyer=Sarah Liu, Total=$156.55",
+        {"buyer": "Sarah Liu", "total": "$156.55", "_unparsed": "Order-1002"},
+    ),
+    (
+        '{"id": "usr_001", "name": "Alex Johnson"}',
+        {"id": "usr_001", "name": "Alex Johnson"},
+    ),
+]
+
+
+def make_columnar_batch(pairs: List[Tuple[str, Dict[str, str]]]) -> ColumnarBatch:
+    """Build the same buffers `smart_parse_batch_columnar` returns, in pure python"""
+    keys, key_table = [], {}
+    raw, raw_offsets, raw_lengths = b"", [0], []
+    record_offsets, key_ids = [0], []
+    values, value_offsets = b"", [0]
+    for raw_str, parsed in pairs:
+        raw += raw_str.encode()
+        raw_offsets.append(len(raw))
+        raw_lengths.append(len(raw_str))
+        for k, v in parsed.items():
+            if k not in key_table:
+                key_table[k] = len(keys)
+                keys.append(k)
+            key_ids.append(key_table[k])
+            values += v.encode()
+            value_offsets.append(len(values))
+        record_offsets.append(len(key_ids))
+
+    def pack(fmt: str, li: List[int]) -> bytes:
+        return struct.pack(f"<{len(li)}{fmt}", *li)
+
+    return ColumnarBatch.from_buffers(
+        {
+            "keys": keys,
+            "raw": raw,
+            "raw_offsets": pack("q", raw_offsets),
+            "raw_lengths": pack("q", raw_lengths),
+            "record_offsets": pack("q", record_offsets),
+            "key_ids": pack("I", key_ids),
+            "values": values,
+            "value_offsets": pack("q", value_offsets),
+        }
+    )
+
+
+class TestStructuralAnalyzer:
+    def test_columnar_batch_roundtrip(self):
+        batch = make_columnar_batch(PARSED_SAMPLES)
+        assert len(batch) == len(PARSED_SAMPLES)
+        assert list(batch) == PARSED_SAMPLES
+
+    def test_ingest_columnar_matches_fingerprint(self):
+        expected = StructuralAnalyzer()
+        hashes = [
+            expected.generate_fingerprint(raw, parsed)["hash"]
+            for raw, parsed in PARSED_SAMPLES
+        ]
+
+        analyzer = StructuralAnalyzer()
+        assert analyzer.ingest_columnar(make_columnar_batch(PARSED_SAMPLES)) == hashes
+        assert analyzer.get_signature_map() == expected.get_signature_map()
+
+    @pytest.mark.parametrize("sampling", ["uniform", "diverse"])
+    def test_bounded_reservoir(self, sampling: str):
+        analyzer = StructuralAnalyzer(max_records=5, sampling=sampling, seed=0)
+        for i in range(1_000):
+            analyzer.generate_fingerprint(f"id={i}", {"id": str(i)})
+
+        (entry,) = analyzer.get_signature_map().values()
+        assert entry["count"] == 1_000
+        assert len(entry["records"]) == 5
+        assert len({rec["raw"] for rec in entry["records"]}) == 5
+
+    def test_diverse_reservoir_keeps_rare_shapes(self):
+        analyzer = StructuralAnalyzer(max_records=3, sampling="diverse", seed=0)
+        for i in range(100):
+            analyzer.generate_fingerprint(f"total={i}", {"total": str(i)})
+        analyzer.generate_fingerprint("total=$5.00", {"total": "$5.00"})
+        analyzer.generate_fingerprint("total=N/A", {"total": "N/A"})
+
+        (entry,) = analyzer.get_signature_map().values()
+        raws = {rec["raw"] for rec in entry["records"]}
+        assert {"total=$5.00", "total=N/A"} <= raws
+        assert entry["count"] == 102
+
+    def test_blueprint_interning(self):
+        analyzer = StructuralAnalyzer(max_interned=2)
+        uncached = StructuralAnalyzer(max_interned=0)
+        typed_maps = [{"a": "str"}, {"b": "int", "a": "str"}, {"c": "map"}]
+        for typed_map in typed_maps * 2:
+            assert analyzer.build_blueprint(typed_map) == uncached.build_blueprint(
+                typed_map
+            )
+
+        assert len(analyzer.blueprint_table) == 2
+        assert len(uncached.blueprint_table) == 0
+
+    def test_fingerprint_interning(self):
+        samples = PARSED_SAMPLES * 10_000
+
+        runtimes, fingerprints = {}, {}
+        for max_interned in [0, 10_000]:
+            analyzer = StructuralAnalyzer(max_interned=max_interned)
+            start = time.perf_counter()
+            fingerprints[max_interned] = [
+                analyzer.generate_fingerprint(raw, parsed, store_in_map=False)
+                for raw, parsed in samples
+            ]
+            runtimes[max_interned] = time.perf_counter() - start
+
+            # one interned layout per distinct record shape (none without interning)
+            n_layouts = len({fp["hash"] for fp in fingerprints[max_interned]})
+            assert len(analyzer.layout_table) == min(n_layouts, max_interned)
+            assert len(analyzer.blueprint_table) == min(n_layouts, max_interned)
+
+        assert fingerprints[0] == fingerprints[10_000]
+        # repeat records skip `flatten_and_type()` but get their own copy of the typed map
+        interned = fingerprints[10_000]
+        assert (
+            interned[0]["signature"] is not interned[len(PARSED_SAMPLES)]["signature"]
+        )
+        interned[0]["signature"].clear()
+        repeat = analyzer.generate_fingerprint(*PARSED_SAMPLES[0], store_in_map=False)
+        assert repeat["signature"] == fingerprints[0][0]["signature"]
+
+        # nested records aren't interned per record layout
+        analyzer = StructuralAnalyzer()
+        analyzer.generate_fingerprint("{}", {"user": {"id": "1"}}, store_in_map=False)
+        assert len(analyzer.layout_table) == 0
+        assert len(analyzer.blueprint_table) == 1
+
+        logger.debug(
+            f"FINGERPRINT COST: {round(runtimes[0] / len(samples) * 1e6, 2)}us/record "
+            f"without interning, {round(runtimes[10_000] / len(samples) * 1e6, 2)}us/record "
+            f"with interning"
+        )
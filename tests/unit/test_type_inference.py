@@ -0,0 +1,60 @@
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+
+import pytest
+
+from swirl.ingestion.type_inference import infer_json_value, infer_record, infer_value
+
+
+class TestTypeInference:
+    @pytest.mark.parametrize(
+        "value, expected",
+        [
+            ("None", None),
+            ("", None),
+            ("TRUE", True),
+            ("false", False),
+            ("42", 42),
+            ("-7", -7),
+            ("00123", "00123"),
+            ("9223372036854775808", "9223372036854775808"),
+            ("3.14", 3.14),
+            (".5", 0.5),
+            ("1e3", 1000.0),
+            ("$1,249.99", Decimal("1249.99")),
+            ("-$5", Decimal("-5")),
+            ("$1,24", "$1,24"),
+            ("2023-01-15", date(2023, 1, 15)),
+            ("2023-02-30", "2023-02-30"),
+            ("2023-01-15 10:30", datetime(2023, 1, 15, 10, 30)),
+            (
+                "2023-01-15T10:30:00Z",
+                datetime(2023, 1, 15, 10, 30, tzinfo=timezone.utc),
+            ),
+            (
+                "2023-01-15T10:30:00+0530",
+                datetime(
+                    2023, 1, 15, 10, 30, tzinfo=timezone(timedelta(hours=5, minutes=30))
+                ),
+            ),
+            ("laptop, mouse", "laptop, mouse"),
+            ("١٢", "١٢"),
+        ],
+    )
+    def test_infer_value(self, value: str, expected):
+        inferred = infer_value(value)
+        assert inferred == expected
+        assert type(inferred) is type(expected)
+
+    def test_infer_json_value(self):
+        assert infer_json_value("12") == 12
+        assert infer_json_value([1, 2]) == [1, 2]
+        assert infer_json_value({"a": "1"}) == {"a": "1"}
+
+    def test_infer_record(self):
+        parsed = {"total": "$89.99", "items": "None", "_unparsed": "123"}
+        assert infer_record(parsed) == {
+            "total": Decimal("89.99"),
+            "items": None,
+            "_unparsed": "123",
+        }
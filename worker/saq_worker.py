@@ -8,10 +8,25 @@ from redis.asyncio import ConnectionPool, Redis
 from saq import CronJob, Queue
 
 from swirl.clients.async_httpx_client import create_async_httpx_client_pool
-from swirl.ml_ai.embedding_model import load_sentence_transformer
+from swirl.clients.pg_duckdb_client import PGConfig, PGDuckDBClient
+from swirl.ingestion.parse_cache import ParseCache
+from swirl.ml_ai.clustering import ClusterOrchestrator, SemanticClusterParams
+from swirl.ml_ai.embedding_cache import DiskEmbeddingStore, EmbeddingCache
+from swirl.ml_ai.embedding_model import load_embedding_model
+from swirl.ml_ai.embedding_server import EmbeddingClient
+from swirl.persistence.signature_vector_index import (
+    SignatureVectorIndex,
+    register_vector_types,
+)
 from swirl.tasks.agent_tasks import run_dq_agent_task
 from swirl.utils.log_utils import get_custom_logger
 
+try:
+    from swirl.ingestion.rust_ingestion import configure_parallelism, parallelism_stats
+except ImportError:
+    # maturin extension not built, the pure python parser runs in process
+    configure_parallelism = parallelism_stats = None
+
 logger = get_custom_logger()
 
 load_dotenv("secrets.env")
@@ -24,6 +39,8 @@ redis_url = f"redis://:{redis_pw}@{redis_host}:{redis_port}"
 
 
 queue = Queue.from_url(redis_url, name="ai-queue")
+# jobs run at once by this process
+concurrency = 10
 
 
 async def cron(ctx: Dict[str, Any]):
@@ -52,13 +69,108 @@ async def startup(ctx: Dict[str, Any]):
     # add redis pool to context dict
     ctx["redis_pool"] = redis_pool
 
-    # sentence transformer model
-    model = load_sentence_transformer("all-MiniLM-L6-v2", cache_folder="./.models")
+    # embedding model, "onnx" runs the int8 export without loading torch
+    # (with EMBEDDING_SOCKET_PATH set the model lives in the host's embedding sidecar, see
+    # `swirl.ml_ai.embedding_server`, which must run the same EMBEDDING_BACKEND)
+    embedding_backend = os.getenv("EMBEDDING_BACKEND", "sentence_transformers")
+    embedding_socket_path = os.getenv("EMBEDDING_SOCKET_PATH")
+    if embedding_socket_path:
+        model = EmbeddingClient(embedding_socket_path)
+    else:
+        model = load_embedding_model(
+            "all-MiniLM-L6-v2",
+            backend=embedding_backend,
+            cache_folder="./.models",
+        )
     ctx["embedding_model"] = model
 
+    # signature embedding cache, the disk tier is shared by every worker process
+    # (keyed per backend, int8 vectors differ slightly from the torch ones) and bounded by
+    # file count / time since last use
+    cache_ttl = os.getenv("EMBEDDING_CACHE_TTL_SECONDS")
+    ctx["embedding_cache"] = EmbeddingCache(
+        model_name=f"all-MiniLM-L6-v2:{embedding_backend}",
+        max_size=int(os.getenv("EMBEDDING_CACHE_MAX_SIZE", "50000")),
+        store=DiskEmbeddingStore(
+            os.getenv("EMBEDDING_CACHE_DIR", "./.embedding_cache"),
+            max_files=int(os.getenv("EMBEDDING_CACHE_MAX_FILES", "500000")),
+            ttl_seconds=float(cache_ttl) if cache_ttl else None,
+        ),
+    )
+
+    # clusterer shared by every job in this process, HDBSCAN is refit on schedule or on drift
+    # and new signatures are assigned to the fitted clusters in between
+    refit_interval = os.getenv("CLUSTER_REFIT_INTERVAL_SECONDS", "3600")
+    cluster_orchestrator = ClusterOrchestrator(
+        semantic_cluster_params=SemanticClusterParams(
+            embedding_mode=os.getenv("SEMANTIC_EMBEDDING_MODE", "signature"),
+        ),
+        embedding_model=model,
+        embedding_cache=ctx["embedding_cache"],
+        refit_interval_seconds=float(refit_interval) if refit_interval else None,
+        drift_threshold=float(os.getenv("CLUSTER_DRIFT_THRESHOLD", "0.2")),
+    )
+    # pickled state, the path must only be writable by the worker
+    cluster_state_fpath = os.getenv("CLUSTER_STATE_FPATH")
+    if cluster_state_fpath and os.path.exists(cluster_state_fpath):
+        cluster_orchestrator.load_state(cluster_state_fpath)
+    ctx["cluster_orchestrator"] = cluster_orchestrator
+
+    # pgvector nearest signature index, unseen signatures close to a registered one skip
+    # reclustering (needs the `vector` extension in postgres)
+    ctx["signature_index"] = None
+    if os.getenv("SIGNATURE_INDEX_ENABLED", "false").lower() in ("1", "true"):
+        try:
+            signature_index = SignatureVectorIndex(
+                PGDuckDBClient(PGConfig(), configure=register_vector_types)
+            )
+            signature_index.create_table()
+            ctx["signature_index"] = signature_index
+        except Exception as e:
+            logger.warning(f"[Startup] Signature index disabled: {e}")
+
+    # rust parser threads, shared by the `concurrency` jobs of this process, defaults to
+    # this process' share of the cores (keeps the host from being oversubscribed by rayon's
+    # all core global pool next to the embedding model threads)
+    if configure_parallelism is not None:
+        num_threads = os.getenv("PARSER_NUM_THREADS")
+        configure_parallelism(
+            num_threads=int(num_threads)
+            if num_threads
+            else max((os.cpu_count() or 1) // concurrency, 1),
+            sequential_cutoff=int(os.getenv("PARSER_SEQUENTIAL_CUTOFF", "64")),
+        )
+
+    # parse/fingerprint cache shared by every job in this process
+    ctx["parse_cache"] = ParseCache(
+        max_size=int(os.getenv("PARSE_CACHE_MAX_SIZE", "100000")),
+    )
+
 
 async def shutdown(ctx: Dict[str, Any]):
     logger.debug("[Shutdown] Closing connection pools")
+    if ctx.get("parse_cache"):
+        logger.info(f"[Shutdown] Parse Cache Stats: {ctx['parse_cache'].stats()}")
+    if isinstance(ctx.get("embedding_model"), EmbeddingClient):
+        ctx["embedding_model"].close()
+    if ctx.get("embedding_cache"):
+        logger.info(
+            f"[Shutdown] Embedding Cache Stats: {ctx['embedding_cache'].stats()}"
+        )
+    if ctx.get("cluster_orchestrator"):
+        cluster_orchestrator = ctx["cluster_orchestrator"]
+        logger.info(
+            f"[Shutdown] Cluster Stats: fits={cluster_orchestrator.n_fits}, "
+            f"assigns={cluster_orchestrator.n_assigns}"
+        )
+        cluster_state_fpath = os.getenv("CLUSTER_STATE_FPATH")
+        if cluster_state_fpath:
+            cluster_orchestrator.save_state(cluster_state_fpath)
+        cluster_orchestrator.close()
+    if ctx.get("signature_index"):
+        ctx["signature_index"].pg_client.close()
+    if parallelism_stats is not None:
+        logger.info(f"[Shutdown] Parser Parallelism Stats: {parallelism_stats()}")
     if ctx["httpx_pool"]:
         await ctx["httpx_pool"].aclose()
     if ctx["redis_pool"]:
@@ -81,7 +193,7 @@ async def after_process(ctx: Dict[str, Any]):
 settings = {
     "queue": queue,
     "functions": [run_dq_agent_task],
-    "concurrency": 10,
+    "concurrency": concurrency,
     "cron_jobs": [CronJob(cron, cron="* * * * * */60")],  # run every 1 min
     "startup": startup,
     "shutdown": shutdown,